@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Model Benchmark Script
+
+This script measures the load time and resident memory of the task models on a
+large synthetic tasks.json. The slotted, lazily parsed models in manager.py are
+compared with an equivalent plain-object representation that parses every
+timestamp eagerly, which is how the models used to be built.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Any
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.manager import Task, TaskManager
+from benchmark_storage import generate_data
+
+
+class PlainTask:
+    """Plain-object task with eagerly parsed timestamps, for comparison."""
+
+    def __init__(self, id, project_id, name, description, status, phase_id=None, parent_id=None,
+                 priority=None, progress=None, assignee_id=None, assignee_type=None, metadata=None,
+                 result=None, error=None, created_at=None, updated_at=None):
+        self.id = id
+        self.project_id = project_id
+        self.name = name
+        self.description = description
+        self.status = status
+        self.phase_id = phase_id
+        self.parent_id = parent_id
+        self.priority = priority
+        self.progress = progress
+        self.assignee_id = assignee_id
+        self.assignee_type = assignee_type
+        self.metadata = metadata or {}
+        self.result = result
+        self.error = error
+        self.created_at = created_at or datetime.now()
+        self.updated_at = updated_at or datetime.now()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlainTask":
+        created_at = data.get("created_at")
+        if created_at and isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        updated_at = data.get("updated_at")
+        if updated_at and isinstance(updated_at, str):
+            updated_at = datetime.fromisoformat(updated_at)
+        return cls(
+            id=data["id"],
+            project_id=data["project_id"],
+            name=data["name"],
+            description=data["description"],
+            status=data["status"],
+            phase_id=data.get("phase_id"),
+            parent_id=data.get("parent_id"),
+            priority=data.get("priority"),
+            progress=data.get("progress"),
+            assignee_id=data.get("assignee_id"),
+            assignee_type=data.get("assignee_type"),
+            metadata=data.get("metadata", {}),
+            result=data.get("result"),
+            error=data.get("error"),
+            created_at=created_at,
+            updated_at=updated_at,
+        )
+
+
+def measure(json_path: str, build: Callable[[Dict[str, Any]], Any]) -> Dict[str, float]:
+    """
+    Load a tasks.json file and build models from it.
+
+    Args:
+        json_path: Path to the tasks.json file
+        build: Callable building a model from a task dictionary
+
+    Returns:
+        Dictionary with the load time in seconds and retained memory in MB
+    """
+    # Time without tracing, which would dominate the measurement
+    gc.collect()
+    start = time.perf_counter()
+    with open(json_path, 'r') as f:
+        data = json.load(f)
+    models = [build(item) for item in data["tasks"]]
+    elapsed = time.perf_counter() - start
+    del data, models
+
+    gc.collect()
+    tracemalloc.start()
+    with open(json_path, 'r') as f:
+        data = json.load(f)
+    models = [build(item) for item in data["tasks"]]
+    del data
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    return {"seconds": elapsed, "mb": retained / (1024 * 1024)}
+
+
+def run(task_count: int, project_count: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run the benchmark.
+
+    Args:
+        task_count: Number of tasks in the generated file
+        project_count: Number of projects
+
+    Returns:
+        Results keyed by representation
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        json_path = os.path.join(data_dir, "tasks.json")
+        with open(json_path, 'w') as f:
+            json.dump(generate_data(task_count, project_count), f)
+        print(f"{task_count} tasks, {os.path.getsize(json_path) / (1024 * 1024):.1f} MB on disk\n")
+
+        results["plain"] = measure(json_path, PlainTask.from_dict)
+        results["slotted"] = measure(json_path, Task.from_dict)
+
+        start = time.perf_counter()
+        TaskManager(data_dir)
+        results["task_manager"] = {"seconds": time.perf_counter() - start}
+
+    print(f"{'models':<14}{'load (s)':>12}{'memory (MB)':>14}")
+    for name in ("plain", "slotted"):
+        print(f"{name:<14}{results[name]['seconds']:>12.2f}{results[name]['mb']:>14.1f}")
+    print(f"\nTaskManager load including indexes: {results['task_manager']['seconds']:.2f} s")
+    print(
+        f"Slotted/plain: {results['slotted']['seconds'] / results['plain']['seconds']:.2f}x time, "
+        f"{results['slotted']['mb'] / results['plain']['mb']:.2f}x memory"
+    )
+    return results
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark task model load time and memory")
+    parser.add_argument("--tasks", type=int, default=500000, help="Number of tasks")
+    parser.add_argument("--projects", type=int, default=20, help="Number of projects")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.tasks, args.projects)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Scheduling Benchmark Script
+
+This script simulates running randomly generated task graphs on a fixed number
+of execution slots and compares their makespan when ready executions of the
+same priority start in the order they became ready, as the scheduler used to
+run them, with starting the ones on the longest remaining path first, using
+the critical paths schedule_task_graph computes.
+"""
+
+import argparse
+import heapq
+import json
+import os
+import random
+import statistics
+import sys
+from typing import Callable, Dict, List, Tuple
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.task_execution_engine import critical_path_lengths
+
+
+def generate_graph(rng: random.Random, task_count: int, edge_probability: float) -> Dict[str, List[str]]:
+    """
+    Generate a random task graph.
+
+    Each task depends on each earlier task with the given probability, which
+    gives graphs with a mix of long chains and independent tasks.
+
+    Args:
+        rng: Random number generator
+        task_count: Number of tasks
+        edge_probability: Probability of a dependency between two tasks
+
+    Returns:
+        Dictionary mapping task IDs to the task IDs they depend on
+    """
+    task_ids = [f"task_{i}" for i in range(task_count)]
+    return {
+        task_id: [task_ids[j] for j in range(i) if rng.random() < edge_probability]
+        for i, task_id in enumerate(task_ids)
+    }
+
+
+def simulate(
+    graph: Dict[str, List[str]],
+    durations: Dict[str, float],
+    slots: int,
+    rank: Callable[[str], float]
+) -> float:
+    """
+    Run a task graph on a number of slots and return its makespan.
+
+    Ready tasks start highest rank first, then in the order they became
+    ready, like the executions of one project and priority level in the
+    engine's queue.
+
+    Args:
+        graph: Dictionary mapping task IDs to the task IDs they depend on
+        durations: Actual seconds each task takes
+        slots: Number of tasks that run at a time
+        rank: Rank of a task, higher first
+
+    Returns:
+        Seconds from the start of the first task to the end of the last one
+    """
+    dependents: Dict[str, List[str]] = {task_id: [] for task_id in graph}
+    waiting = {task_id: len(dependencies) for task_id, dependencies in graph.items()}
+    for task_id, dependencies in graph.items():
+        for dependency_id in dependencies:
+            dependents[dependency_id].append(task_id)
+
+    ready: List[Tuple[float, int, str]] = []
+    sequence = 0
+    for task_id, count in waiting.items():
+        if not count:
+            heapq.heappush(ready, (-rank(task_id), sequence, task_id))
+            sequence += 1
+
+    running: List[Tuple[float, str]] = []  # (finish time, task_id)
+    now = 0.0
+    while ready or running:
+        while ready and len(running) < slots:
+            _, _, task_id = heapq.heappop(ready)
+            heapq.heappush(running, (now + durations[task_id], task_id))
+
+        now, task_id = heapq.heappop(running)
+        for dependent_id in dependents[task_id]:
+            waiting[dependent_id] -= 1
+            if not waiting[dependent_id]:
+                heapq.heappush(ready, (-rank(dependent_id), sequence, dependent_id))
+                sequence += 1
+    return now
+
+
+def run(graph_count: int, task_count: int, edge_probability: float, slots: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """
+    Run the benchmark.
+
+    Args:
+        graph_count: Number of graphs to simulate
+        task_count: Number of tasks per graph
+        edge_probability: Probability of a dependency between two tasks
+        slots: Number of tasks that run at a time
+        seed: Random seed
+
+    Returns:
+        Mean makespan and mean ratio to the lower bound, keyed by ordering
+    """
+    rng = random.Random(seed)
+    makespans: Dict[str, List[float]] = {"ready_order": [], "uniform_estimates": [], "task_estimates": []}
+    ratios: Dict[str, List[float]] = {name: [] for name in makespans}
+
+    for _ in range(graph_count):
+        graph = generate_graph(rng, task_count, edge_probability)
+        durations = {task_id: rng.lognormvariate(0.0, 1.0) * 60 for task_id in graph}
+        # The engine knows the mean run time of the workflow type, and at
+        # best an estimate of each task's run time that is off by up to 2x
+        uniform_paths = critical_path_lengths(graph, {task_id: 60.0 for task_id in graph})
+        estimated_paths = critical_path_lengths(
+            graph, {task_id: seconds * rng.uniform(0.5, 2.0) for task_id, seconds in durations.items()}
+        )
+        # No ordering finishes before the longest chain or before the slots are full for the total work
+        lower_bound = max(max(critical_path_lengths(graph, durations).values()), sum(durations.values()) / slots)
+
+        results = {
+            "ready_order": simulate(graph, durations, slots, lambda task_id: 0.0),
+            "uniform_estimates": simulate(graph, durations, slots, uniform_paths.__getitem__),
+            "task_estimates": simulate(graph, durations, slots, estimated_paths.__getitem__),
+        }
+        for name, makespan in results.items():
+            makespans[name].append(makespan)
+            ratios[name].append(makespan / lower_bound)
+
+    summary = {
+        name: {"makespan": statistics.mean(makespans[name]), "ratio": statistics.mean(ratios[name])}
+        for name in makespans
+    }
+
+    print(f"{graph_count} graphs of {task_count} tasks, edge probability {edge_probability}, {slots} slots\n")
+    print(f"{'ordering':<20}{'makespan (s)':>14}{'vs bound':>10}{'vs ready':>10}")
+    baseline = summary["ready_order"]["makespan"]
+    for name, result in summary.items():
+        print(
+            f"{name:<20}{result['makespan']:>14.0f}{result['ratio']:>10.3f}"
+            f"{result['makespan'] / baseline:>10.3f}"
+        )
+    return summary
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Simulate task graph makespans with critical-path priorities")
+    parser.add_argument("--graphs", type=int, default=200, help="Number of graphs")
+    parser.add_argument("--tasks", type=int, default=100, help="Number of tasks per graph")
+    parser.add_argument("--edge-probability", type=float, default=0.04, help="Probability of a dependency")
+    parser.add_argument("--slots", type=int, default=8, help="Number of concurrent executions")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.graphs, args.tasks, args.edge_probability, args.slots, args.seed)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark Script
+
+This script measures the task search index on synthetic task names and
+descriptions drawn from a Zipf-distributed vocabulary: index build time, query
+latency percentiles for exact, multi-word and prefix queries, and the cost of
+re-indexing a task after an update.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import string
+import sys
+import time
+from typing import Dict, List, Any
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.search import TaskSearchIndex
+
+
+def generate_vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Generate distinct pseudo-words, in random order so frequency does not follow spelling."""
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Get a percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(task_count: int, vocabulary_size: int, query_count: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run the benchmark.
+
+    Args:
+        task_count: Number of indexed tasks
+        vocabulary_size: Number of distinct words
+        query_count: Number of queries per query kind
+        seed: Random seed
+
+    Returns:
+        Dictionary of results
+    """
+    rng = random.Random(seed)
+    vocabulary = generate_vocabulary(vocabulary_size, rng)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(k: int = 1) -> List[str]:
+        return rng.choices(vocabulary, cum_weights=cum_weights, k=k)
+
+    def text(k: int) -> str:
+        return " ".join(words(k))
+
+    tasks = [
+        (f"task-{i}", f"project-{i % 20}", text(rng.randint(3, 6)), text(rng.randint(8, 20)))
+        for i in range(task_count)
+    ]
+
+    index = TaskSearchIndex()
+    start = time.perf_counter()
+    for task in tasks:
+        index.add(*task)
+    results: Dict[str, Any] = {"tasks": task_count, "build_seconds": time.perf_counter() - start}
+
+    queries = {
+        "one word": lambda: words()[0],
+        "two words": lambda: " ".join(words(2)),
+        "prefix": lambda: words()[0][:3],
+        "word + prefix": lambda: f"{words()[0]} {words()[0][:3]}",
+    }
+    for kind, make_query in queries.items():
+        samples = []
+        for _ in range(query_count):
+            query = make_query()
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[kind] = {
+            "p50_ms": statistics.median(samples),
+            "p99_ms": percentile(samples, 0.99),
+            "max_ms": max(samples),
+        }
+
+    samples = []
+    for _ in range(query_count):
+        task_id, project_id, _, description = tasks[rng.randrange(task_count)]
+        start = time.perf_counter()
+        index.add(task_id, project_id, text(rng.randint(3, 6)), description)
+        samples.append((time.perf_counter() - start) * 1000)
+    results["update"] = {"p50_ms": statistics.median(samples), "p99_ms": percentile(samples, 0.99)}
+
+    print(f"{task_count} tasks, {len(index._terms)} terms, built in {results['build_seconds']:.1f} s\n")
+    print(f"{'operation':<16}{'p50 (ms)':>12}{'p99 (ms)':>12}")
+    for kind in list(queries) + ["update"]:
+        print(f"{kind:<16}{results[kind]['p50_ms']:>12.3f}{results[kind]['p99_ms']:>12.3f}")
+    return results
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Benchmark the task search index")
+    parser.add_argument("--tasks", type=int, default=1000000, help="Number of tasks")
+    parser.add_argument("--vocabulary", type=int, default=50000, help="Number of distinct words")
+    parser.add_argument("--queries", type=int, default=1000, help="Number of queries per query kind")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.tasks, args.vocabulary, args.queries)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
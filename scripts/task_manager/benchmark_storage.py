@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Storage Benchmark Script
+
+This script compares the JSON and SQLite task manager backends. For each task
+count it generates a synthetic tasks.json, then times loading, point lookups,
+filtered queries and a single update followed by a save on both backends.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.manager import TaskManager, TaskStatus
+from src.task_manager.sqlite_manager import SQLiteTaskManager
+
+
+STATUSES = [status.value for status in TaskStatus]
+
+
+def generate_data(task_count: int, project_count: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate synthetic task data in the tasks.json format.
+
+    Args:
+        task_count: Number of tasks
+        project_count: Number of projects the tasks are spread over
+        seed: Random seed
+
+    Returns:
+        Task data dictionary
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    projects, phases, tasks = [], [], []
+
+    for i in range(project_count):
+        timestamp = start.isoformat()
+        projects.append({
+            "id": f"project-{uuid.UUID(int=rng.getrandbits(128))}",
+            "name": f"Project {i}",
+            "description": "",
+            "metadata": {},
+            "created_at": timestamp,
+            "updated_at": timestamp,
+        })
+        for j in range(5):
+            phases.append({
+                "id": f"phase-{uuid.UUID(int=rng.getrandbits(128))}",
+                "project_id": projects[-1]["id"],
+                "name": f"Phase {j}",
+                "description": "",
+                "order": j,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            })
+
+    for i in range(task_count):
+        phase = phases[rng.randrange(len(phases))]
+        timestamp = (start + timedelta(seconds=i)).isoformat()
+        tasks.append({
+            "id": f"task-{uuid.UUID(int=rng.getrandbits(128))}",
+            "project_id": phase["project_id"],
+            "name": f"Task {i}",
+            "description": "Synthetic benchmark task",
+            "status": rng.choice(STATUSES),
+            "phase_id": phase["id"],
+            "parent_id": None,
+            "priority": "medium",
+            "progress": 0.0,
+            "assignee_id": f"agent-{rng.randrange(50)}",
+            "assignee_type": "agent",
+            "metadata": {},
+            "result": None,
+            "error": None,
+            "created_at": timestamp,
+            "updated_at": timestamp,
+        })
+
+    return {"projects": projects, "phases": phases, "tasks": tasks}
+
+
+def timed(func: Callable, repeat: int = 1) -> float:
+    """Return the mean wall time of func in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def benchmark_backend(name: str, open_manager: Callable, data: Dict[str, Any], lookups: int) -> Dict[str, float]:
+    """
+    Time the common operations on one backend.
+
+    Args:
+        name: Backend name
+        open_manager: Callable returning a loaded task manager
+        data: Task data the manager was loaded from
+        lookups: Number of point lookups and queries to average over
+
+    Returns:
+        Dictionary mapping operation names to milliseconds
+    """
+    results = {}
+    start = time.perf_counter()
+    task_manager = open_manager()
+    results["load"] = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(1)
+    task_ids = [task["id"] for task in rng.sample(data["tasks"], min(lookups, len(data["tasks"])))]
+    project_id = data["projects"][0]["id"]
+    task_iter = iter(task_ids * lookups)
+
+    results["get_task"] = timed(lambda: task_manager.get_task(next(task_iter)), lookups)
+    results["tasks_by_status"] = timed(
+        lambda: task_manager.get_tasks_by_status(project_id, TaskStatus.IN_PROGRESS.value), lookups
+    )
+    results["tasks_by_assignee"] = timed(lambda: task_manager.get_tasks_by_assignee("agent-7"), lookups)
+
+    def update_and_save():
+        task_manager.update_task(task_ids[0], status=TaskStatus.COMPLETED.value, progress=100.0)
+        task_manager.save_data()
+
+    results["update_and_save"] = timed(update_and_save, 3)
+
+    if hasattr(task_manager, "close"):
+        task_manager.close()
+    print(f"  {name:<8}" + "".join(f"{results[key]:>20.3f}" for key in results))
+    return results
+
+
+def run(sizes: List[int], project_count: int, lookups: int) -> Dict[int, Dict[str, Dict[str, float]]]:
+    """
+    Run the benchmark for each task count.
+
+    Args:
+        sizes: Task counts to benchmark
+        project_count: Number of projects
+        lookups: Number of point lookups and queries to average over
+
+    Returns:
+        Results keyed by task count and backend
+    """
+    all_results = {}
+    columns = ["load", "get_task", "tasks_by_status", "tasks_by_assignee", "update_and_save"]
+
+    for size in sizes:
+        print(f"\n{size} tasks (ms)")
+        print(f"  {'backend':<8}" + "".join(f"{column:>20}" for column in columns))
+        data = generate_data(size, project_count)
+
+        with tempfile.TemporaryDirectory() as json_dir, tempfile.TemporaryDirectory() as sqlite_dir:
+            for path in (json_dir, sqlite_dir):
+                with open(os.path.join(path, "tasks.json"), 'w') as f:
+                    json.dump(data, f)
+
+            # The first SQLite open imports tasks.json; time it separately
+            import_ms = timed(lambda: SQLiteTaskManager(sqlite_dir).close())
+
+            all_results[size] = {
+                "json": benchmark_backend("json", lambda: TaskManager(json_dir), data, lookups),
+                "sqlite": benchmark_backend("sqlite", lambda: SQLiteTaskManager(sqlite_dir), data, lookups),
+            }
+            all_results[size]["sqlite"]["import"] = import_ms
+            print(f"  sqlite one-time import of tasks.json: {import_ms:.1f} ms")
+
+    return all_results
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Compare the JSON and SQLite task manager backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000],
+                        help="Task counts to benchmark")
+    parser.add_argument("--projects", type=int, default=20, help="Number of projects")
+    parser.add_argument("--lookups", type=int, default=200, help="Lookups and queries to average over")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.projects, args.lookups)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -55,24 +55,24 @@ class DashboardStatsResponse(BaseModel):
 @router.get("/stats", response_model=DashboardStatsResponse)
 async def get_dashboard_stats(task_manager: TaskManager = Depends(get_task_manager)):
     """Get dashboard statistics."""
-    projects = list(task_manager.projects.values())
-    
-    # Count projects by status
-    total_projects = len(projects)
-    active_projects = sum(1 for p in projects if any(
-        t.status == TaskStatus.IN_PROGRESS for t in p.tasks.values()
-    ))
-    completed_projects = sum(1 for p in projects if all(
-        t.status == TaskStatus.COMPLETED for t in p.tasks.values()
-    ) and len(p.tasks) > 0)
+    # Count projects by status from the per-project status counts
+    total_projects = len(task_manager.projects)
+    active_projects = 0
+    completed_projects = 0
+    for project_id in task_manager.projects:
+        counts = task_manager.count_tasks_by_status(project_id)
+        if counts[TaskStatus.IN_PROGRESS.value] > 0:
+            active_projects += 1
+        if counts[TaskStatus.COMPLETED.value] == sum(counts.values()) > 0:
+            completed_projects += 1
     
     # Count tasks by status
-    all_tasks = [task for p in projects for task in p.tasks.values()]
-    total_tasks = len(all_tasks)
-    completed_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.COMPLETED)
-    in_progress_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.IN_PROGRESS)
-    planned_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.PLANNED)
-    blocked_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.BLOCKED)
+    counts = task_manager.count_tasks_by_status()
+    total_tasks = sum(counts.values())
+    completed_tasks = counts[TaskStatus.COMPLETED.value]
+    in_progress_tasks = counts[TaskStatus.IN_PROGRESS.value]
+    planned_tasks = counts[TaskStatus.PLANNED.value]
+    blocked_tasks = counts[TaskStatus.BLOCKED.value]
     
     return DashboardStatsResponse(
         total_projects=total_projects,
@@ -221,16 +221,17 @@ async def get_projects_summary(task_manager: TaskManager = Depends(get_task_mana
     summaries = []
     for project in projects:
         # Calculate project progress
-        total_tasks = len(project.tasks)
-        completed_tasks = sum(1 for t in project.tasks.values() if t.status == TaskStatus.COMPLETED)
+        counts = task_manager.count_tasks_by_status(project.id)
+        total_tasks = sum(counts.values())
+        completed_tasks = counts[TaskStatus.COMPLETED.value]
         progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
         # Get phase information
         phases = []
         for phase_id, phase in project.phases.items():
-            phase_tasks = [project.tasks[task_id] for task_id in phase.tasks if task_id in project.tasks]
-            phase_total = len(phase_tasks)
-            phase_completed = sum(1 for t in phase_tasks if t.status == TaskStatus.COMPLETED)
+            phase_counts = task_manager.count_tasks_by_status(project.id, phase_id)
+            phase_total = sum(phase_counts.values())
+            phase_completed = phase_counts[TaskStatus.COMPLETED.value]
             phase_progress = (phase_completed / phase_total * 100) if phase_total > 0 else 0
             
             phases.append({
@@ -4,16 +4,20 @@ Task Management API Routes for AI-Orchestration-Platform.
 This module provides FastAPI routes for the task management system.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime
+import base64
 import json
 import asyncio
 from enum import Enum
 
 from src.task_manager.manager import (
     get_task_manager,
+    ChangeLogTruncatedError,
     TaskManager,
     TaskStatus,
     TaskPriority,
@@ -22,6 +26,9 @@ from src.task_manager.manager import (
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Page size of task listings when a cursor is given without a limit
+DEFAULT_PAGE_SIZE = 100
+
 
 # Pydantic models for request/response validation
 class TaskBase(BaseModel):
@@ -56,6 +63,26 @@ class TaskUpdate(BaseModel):
     error: Optional[str] = None
 
 
+class TaskBatchCreate(BaseModel):
+    tasks: List[TaskCreate]
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    task_id: str
+
+
+class TaskBatchUpdate(BaseModel):
+    updates: List[TaskBatchUpdateItem]
+
+
+class TaskBatchDelete(BaseModel):
+    task_ids: List[str]
+
+
+class TaskBatchDeleteResponse(BaseModel):
+    deleted: int
+
+
 class TaskResponse(TaskBase):
     id: str
     project_id: str
@@ -122,12 +149,31 @@ class ProjectResponse(ProjectBase):
         orm_mode = True
 
 
+class ChangesResponse(BaseModel):
+    version: int
+    changes: List[Dict[str, Any]] = []
+
+
 class ProjectProgressResponse(BaseModel):
     project_id: str
     progress: float
     phase_progress: Dict[str, float] = {}
 
 
+class TaskSearchResult(BaseModel):
+    task: TaskResponse
+    score: float
+
+
+class TaskRollupResponse(BaseModel):
+    task_id: str
+    task_count: int
+    progress: float
+    status_counts: Dict[str, int]
+    earliest_created_at: datetime
+    latest_updated_at: datetime
+
+
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
@@ -160,29 +206,89 @@ def get_manager():
     return manager
 
 
+def get_changes_response(task_manager, since: int, project_id: Optional[str] = None) -> ChangesResponse:
+    """Build a ChangesResponse; raises ChangeLogTruncatedError if since is too old."""
+    # Read the version first so a change made meanwhile is not skipped by the
+    # next request
+    version = task_manager.version
+    changes = [
+        change for change in task_manager.get_changes_since(since, project_id)
+        if change["version"] <= version
+    ]
+    return ChangesResponse(version=version, changes=changes)
+
+
+def task_to_fields(task, fields: List[str]) -> Dict[str, Any]:
+    """Convert a task to a dict holding only the given TaskResponse fields."""
+    data = {}
+    for field in fields:
+        value = getattr(task, field, TaskResponse.model_fields[field].default)
+        data[field] = value.value if isinstance(value, Enum) else value
+    return data
+
+
 # Helper function to convert task to response model
 def task_to_response(task):
-    return TaskResponse(
-        id=task.id,
-        name=task.name,
-        description=task.description,
-        project_id=task.project_id,
-        phase_id=task.phase_id,
-        parent_id=task.parent_id,
-        status=task.status.value,
-        priority=task.priority.value,
-        progress=task.progress,
-        assignee_id=task.assignee_id,
-        assignee_type=task.assignee_type,
-        metadata=task.metadata,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        started_at=task.started_at,
-        completed_at=task.completed_at,
-        children=task.children,
-        status_history=task.status_history,
-        result=task.result,
-        error=task.error,
+    # Fields the Task model does not have, like started_at, take their defaults
+    return TaskResponse(**task_to_fields(task, list(TaskResponse.model_fields)))
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated fields parameter; the task ID is always included."""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TaskResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown task fields: {', '.join(unknown)}",
+        )
+    return ["id"] + [name for name in names if name != "id"]
+
+
+def encode_cursor(key: Tuple[str, str]) -> str:
+    """Encode an (updated_at, id) page key as an opaque cursor."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor made by encode_cursor; raises HTTP 400 if it is malformed."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        key = None
+    if not (isinstance(key, list) and len(key) == 2 and all(isinstance(part, str) for part in key)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return key[0], key[1]
+
+
+def get_tasks_page(
+    task_manager,
+    cursor: Optional[str],
+    limit: Optional[int],
+    descending: bool,
+    **filters: Any,
+) -> Tuple[List[Any], Dict[str, str]]:
+    """Get a page of tasks and the response headers linking to the next page."""
+    tasks, next_key = task_manager.get_tasks_page(
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit or DEFAULT_PAGE_SIZE,
+        descending=descending,
+        **filters,
+    )
+    return tasks, {"X-Next-Cursor": encode_cursor(next_key)} if next_key else {}
+
+
+def tasks_to_list_response(tasks, fields: Optional[List[str]], headers: Dict[str, str], response: Response):
+    """Build a task listing, projected to the given fields if any."""
+    if fields is None:
+        response.headers.update(headers)
+        return [task_to_response(task) for task in tasks]
+    # Projected tasks do not match TaskResponse, so bypass the response model
+    return JSONResponse(
+        content=jsonable_encoder([task_to_fields(task, fields) for task in tasks]),
+        headers=headers,
     )
 
 
@@ -282,7 +388,7 @@ async def update_project(
         project_id,
         {
             "type": "project_updated",
-            "data": project_to_response(updated_project).dict(),
+            "data": jsonable_encoder(project_to_response(updated_project)),
         },
     )
     
@@ -371,7 +477,7 @@ async def create_phase(
         project_id,
         {
             "type": "phase_created",
-            "data": phase_to_response(new_phase).dict(),
+            "data": jsonable_encoder(phase_to_response(new_phase)),
         },
     )
     
@@ -449,28 +555,149 @@ async def create_task(
         task.project_id,
         {
             "type": "task_created",
-            "data": task_to_response(new_task).dict(),
+            "data": jsonable_encoder(task_to_response(new_task)),
         },
     )
     
     return task_to_response(new_task)
 
 
+async def broadcast_by_project(
+    connection_manager: ConnectionManager,
+    message_type: str,
+    items_by_project: Dict[str, List[Any]],
+):
+    """Broadcast one batch message per project."""
+    for project_id, items in items_by_project.items():
+        await connection_manager.broadcast(
+            project_id,
+            {
+                "type": message_type,
+                "data": items,
+            },
+        )
+
+
+@router.post("/tasks/batch", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED)
+async def create_tasks_batch(
+    batch: TaskBatchCreate,
+    task_manager: TaskManager = Depends(get_task_manager),
+    connection_manager: ConnectionManager = Depends(get_manager),
+):
+    """Create many tasks in one request. Either all tasks are created or none are."""
+    try:
+        new_tasks = task_manager.create_tasks_bulk([task.dict() for task in batch.tasks])
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    responses = [task_to_response(task) for task in new_tasks]
+    
+    # Broadcast creation
+    created_by_project: Dict[str, List[Any]] = {}
+    for response in responses:
+        created_by_project.setdefault(response.project_id, []).append(jsonable_encoder(response))
+    await broadcast_by_project(connection_manager, "tasks_created", created_by_project)
+    
+    return responses
+
+
+@router.put("/tasks/batch", response_model=List[TaskResponse])
+async def update_tasks_batch(
+    batch: TaskBatchUpdate,
+    task_manager: TaskManager = Depends(get_task_manager),
+    connection_manager: ConnectionManager = Depends(get_manager),
+):
+    """Update many tasks in one request. Either all tasks are updated or none are."""
+    try:
+        updated_tasks = task_manager.update_tasks_bulk(
+            [update.dict(exclude_none=True) for update in batch.updates]
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    responses = [task_to_response(task) for task in updated_tasks]
+    
+    # Broadcast update
+    updated_by_project: Dict[str, List[Any]] = {}
+    for response in responses:
+        updated_by_project.setdefault(response.project_id, []).append(jsonable_encoder(response))
+    await broadcast_by_project(connection_manager, "tasks_updated", updated_by_project)
+    
+    return responses
+
+
+@router.post("/tasks/batch/delete", response_model=TaskBatchDeleteResponse)
+async def delete_tasks_batch(
+    batch: TaskBatchDelete,
+    task_manager: TaskManager = Depends(get_task_manager),
+    connection_manager: ConnectionManager = Depends(get_manager),
+):
+    """Delete many tasks in one request. Either all tasks are deleted or none are."""
+    deleted_by_project: Dict[str, List[Any]] = {}
+    for task_id in batch.task_ids:
+        task = task_manager.get_task(task_id)
+        if task:
+            deleted_by_project.setdefault(task.project_id, []).append(task_id)
+    
+    try:
+        deleted = task_manager.delete_tasks_bulk(batch.task_ids)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    # Broadcast deletion
+    await broadcast_by_project(
+        connection_manager,
+        "tasks_deleted",
+        {project_id: [{"task_id": task_id} for task_id in task_ids] for project_id, task_ids in deleted_by_project.items()},
+    )
+    
+    return TaskBatchDeleteResponse(deleted=deleted)
+
+
 @router.get("/projects/{project_id}/tasks", response_model=List[TaskResponse])
 async def get_tasks(
     project_id: str,
+    response: Response,
     phase_id: Optional[str] = None,
     status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    descending: bool = False,
     task_manager: TaskManager = Depends(get_task_manager),
 ):
-    """Get tasks in a project, optionally filtered by phase or status."""
+    """
+    Get tasks in a project, optionally filtered by phase or status.
+    
+    With limit or cursor, tasks are paged in (updated_at, id) order and the
+    X-Next-Cursor header holds the cursor of the next page. fields is a
+    comma-separated list of task fields to return instead of whole tasks.
+    """
     project = task_manager.get_project(project_id)
     if not project:
+        # The status query parameter shadows fastapi.status here
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
+            status_code=404,
             detail=f"Project with ID {project_id} not found",
         )
     
+    projection = parse_fields(fields)
+    if limit is not None or cursor is not None:
+        tasks, headers = get_tasks_page(
+            task_manager, cursor, limit, descending,
+            project_id=project_id, phase_id=phase_id, status=status,
+        )
+        return tasks_to_list_response(tasks, projection, headers, response)
+    
     if phase_id:
         tasks = task_manager.get_tasks_by_phase(project_id, phase_id)
     elif status:
@@ -478,7 +705,7 @@ async def get_tasks(
     else:
         tasks = list(project.tasks.values())
     
-    return [task_to_response(task) for task in tasks]
+    return tasks_to_list_response(tasks, projection, {}, response)
 
 
 @router.get("/tasks/{task_id}", response_model=TaskResponse)
@@ -496,6 +723,36 @@ async def get_task(
     return task_to_response(task)
 
 
+@router.get("/tasks/{task_id}/subtree", response_model=List[TaskResponse])
+async def get_task_subtree(
+    task_id: str, task_manager: TaskManager = Depends(get_task_manager)
+):
+    """Get a task and all its descendants, depth first."""
+    tasks = task_manager.get_subtree(task_id)
+    if not tasks:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found",
+        )
+    
+    return [task_to_response(task) for task in tasks]
+
+
+@router.get("/tasks/{task_id}/rollup", response_model=TaskRollupResponse)
+async def get_task_rollup(
+    task_id: str, task_manager: TaskManager = Depends(get_task_manager)
+):
+    """Get the progress, status counts and timestamps rolled up over a task's subtree."""
+    rollup = task_manager.get_task_rollup(task_id)
+    if rollup is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found",
+        )
+    
+    return TaskRollupResponse(**rollup)
+
+
 @router.put("/tasks/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: str,
@@ -531,7 +788,7 @@ async def update_task(
         updated_task.project_id,
         {
             "type": "task_updated",
-            "data": task_to_response(updated_task).dict(),
+            "data": jsonable_encoder(task_to_response(updated_task)),
         },
     )
     
@@ -558,7 +815,7 @@ async def update_task_status(
         updated_task.project_id,
         {
             "type": "task_updated",
-            "data": task_to_response(updated_task).dict(),
+            "data": jsonable_encoder(task_to_response(updated_task)),
         },
     )
     
@@ -585,7 +842,7 @@ async def update_task_progress(
         updated_task.project_id,
         {
             "type": "task_updated",
-            "data": task_to_response(updated_task).dict(),
+            "data": jsonable_encoder(task_to_response(updated_task)),
         },
     )
     
@@ -626,15 +883,68 @@ async def delete_task(
     return None
 
 
+@router.get("/changes", response_model=ChangesResponse)
+async def get_changes(
+    since: int,
+    project_id: Optional[str] = None,
+    task_manager: TaskManager = Depends(get_task_manager),
+):
+    """
+    Get the changes made after a version, optionally for one project.
+    
+    Pass the returned version as `since` on the next request. A 410 response
+    means the changes are no longer available and the data must be re-read.
+    """
+    try:
+        return get_changes_response(task_manager, since, project_id)
+    except ChangeLogTruncatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=str(e),
+        )
+
+
+@router.get("/search", response_model=List[TaskSearchResult])
+async def search_tasks(
+    q: str = Query(..., min_length=1),
+    project_id: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=200),
+    task_manager: TaskManager = Depends(get_task_manager),
+):
+    """Search task names and descriptions by keyword, best match first."""
+    results = task_manager.search_tasks(q, project_id=project_id, limit=limit)
+    return [
+        TaskSearchResult(task=task_to_response(task), score=score)
+        for task, score in results
+    ]
+
+
 @router.get("/assignee/{assignee_id}/tasks", response_model=List[TaskResponse])
 async def get_tasks_by_assignee(
     assignee_id: str,
+    response: Response,
     assignee_type: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    descending: bool = False,
     task_manager: TaskManager = Depends(get_task_manager),
 ):
-    """Get all tasks assigned to a specific assignee."""
+    """
+    Get all tasks assigned to a specific assignee.
+    
+    Supports the same paging and field projection as the project task listing.
+    """
+    projection = parse_fields(fields)
+    if limit is not None or cursor is not None:
+        tasks, headers = get_tasks_page(
+            task_manager, cursor, limit, descending,
+            assignee_id=assignee_id, assignee_type=assignee_type,
+        )
+        return tasks_to_list_response(tasks, projection, headers, response)
+    
     tasks = task_manager.get_tasks_by_assignee(assignee_id, assignee_type)
-    return [task_to_response(task) for task in tasks]
+    return tasks_to_list_response(tasks, projection, {}, response)
 
 
 # WebSocket endpoint for real-time updates
@@ -657,13 +967,36 @@ async def websocket_endpoint(
         # Send initial project data
         await websocket.send_json({
             "type": "initial_data",
-            "data": project_to_response(project).dict(),
+            "version": task_manager.version,
+            "data": jsonable_encoder(project_to_response(project)),
         })
         
         # Keep connection alive
         while True:
-            # Wait for any message (ping)
-            await websocket.receive_text()
+            # Wait for any message (ping, or a sync request after reconnecting)
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                message = None
+            
+            if isinstance(message, dict) and message.get("type") == "sync":
+                try:
+                    changes = get_changes_response(task_manager, int(message.get("since")), project_id)
+                    await websocket.send_json({
+                        "type": "changes",
+                        "version": changes.version,
+                        "data": changes.changes,
+                    })
+                except (ChangeLogTruncatedError, TypeError, ValueError):
+                    # Too far behind or no usable version; resend the whole project
+                    await websocket.send_json({
+                        "type": "initial_data",
+                        "version": task_manager.version,
+                        "data": jsonable_encoder(project_to_response(task_manager.get_project(project_id))),
+                    })
+                continue
+            
             # Send a pong message
             await websocket.send_json({"type": "pong"})
     except WebSocketDisconnect:
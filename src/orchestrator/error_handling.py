@@ -791,14 +791,19 @@ class ErrorHandlingMiddleware:
                 status_code = e.http_status
             else:
                 status_code = 500
+            headers = [
+                (b"content-type", b"application/json"),
+            ]
+            
+            # Tell rate limited clients when to come back
+            if isinstance(e, BaseError) and e.details.get("retry_after") is not None:
+                headers.append((b"retry-after", str(e.details["retry_after"]).encode("ascii")))
             
             # Send the response headers
             await send({
                 "type": "http.response.start",
                 "status": status_code,
-                "headers": [
-                    (b"content-type", b"application/json"),
-                ],
+                "headers": headers,
             })
             
             # Send the response body
@@ -0,0 +1,140 @@
+"""
+Task Change Log Module
+
+This module provides a versioned, bounded in-memory log of task data changes.
+Every mutation gets a monotonically increasing version, so consumers can ask
+for the changes since the last version they saw, or subscribe to new changes,
+instead of re-reading whole projects.
+"""
+
+import asyncio
+import itertools
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+
+
+class ChangeLogTruncatedError(Exception):
+    """Raised when the changes after a version are no longer in the log."""
+    pass
+
+
+class TaskChangeLog:
+    """Task Change Log class recording versioned task data changes."""
+
+    def __init__(self, max_changes: int = 10000):
+        """
+        Initialize a TaskChangeLog.
+
+        Args:
+            max_changes: Number of most recent changes kept in memory
+        """
+        self.version = 0
+        self._changes: deque = deque(maxlen=max_changes)
+        self._lock = threading.RLock()
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+
+    def record(self, op: str, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Record a change and notify subscribers.
+
+        Args:
+            op: Operation ("put" or "delete")
+            kind: Entity kind ("project", "phase" or "task")
+            data: Entity data; delete records only carry the IDs
+
+        Returns:
+            The recorded change
+        """
+        with self._lock:
+            self.version += 1
+            change = {
+                "version": self.version,
+                "op": op,
+                "kind": kind,
+                "id": data["id"],
+                "project_id": data["id"] if kind == "project" else data.get("project_id"),
+                "data": data,
+                "timestamp": datetime.now().isoformat(),
+            }
+            self._changes.append(change)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, change)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self._unsubscribe((loop, queue))
+        return change
+
+    def changes_since(self, version: int, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the changes made after a version.
+
+        Args:
+            version: Last version the caller has seen
+            project_id: Only return changes to this project
+
+        Returns:
+            Changes in version order
+
+        Raises:
+            ChangeLogTruncatedError: If some of the changes are no longer in
+                the log, or the version is newer than the current one; the
+                caller should re-read the data it follows
+        """
+        with self._lock:
+            if version > self.version:
+                raise ChangeLogTruncatedError(f"Unknown version {version}; current version is {self.version}")
+            oldest = self._changes[0]["version"] if self._changes else self.version + 1
+            if version < oldest - 1:
+                raise ChangeLogTruncatedError(f"Changes after version {version} are no longer available")
+            changes = list(itertools.islice(self._changes, version - oldest + 1, None))
+
+        if project_id is not None:
+            changes = [change for change in changes if change["project_id"] == project_id]
+        return changes
+
+    async def subscribe(
+        self,
+        since: Optional[int] = None,
+        project_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over changes as they are made.
+
+        Args:
+            since: Also yield the logged changes after this version first;
+                None to start with the next change
+            project_id: Only yield changes to this project
+
+        Yields:
+            Changes in version order
+
+        Raises:
+            ChangeLogTruncatedError: If since is no longer in the log
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        # Read the backlog and register under one lock, so no change is
+        # missed or delivered twice
+        with self._lock:
+            backlog = self.changes_since(since, project_id) if since is not None else []
+            self._subscribers.append(subscriber)
+
+        try:
+            for change in backlog:
+                yield change
+            while True:
+                change = await subscriber[1].get()
+                if project_id is None or change["project_id"] == project_id:
+                    yield change
+        finally:
+            self._unsubscribe(subscriber)
+
+    def _unsubscribe(self, subscriber: Tuple[asyncio.AbstractEventLoop, asyncio.Queue]):
+        """Stop delivering changes to a subscriber."""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
@@ -0,0 +1,245 @@
+"""
+Task Journal Module
+
+This module provides append-only journal persistence for the task manager.
+Mutations are appended to a log as compact JSON lines, and the log is
+periodically compacted into a snapshot. Records are numbered, and the
+snapshot stores the number of the last record it contains, so records a
+crash leaves in the log after a compaction are not replayed again.
+"""
+
+import json
+import os
+from typing import Callable, Dict, List, Any, Optional
+
+
+class TaskJournal:
+    """Task Journal class for append-only persistence of task data."""
+
+    def __init__(
+        self,
+        data_path: str,
+        snapshot_name: str = "tasks.json",
+        log_name: str = "tasks.journal",
+        compact_threshold: int = 1000,
+        json_default: Optional[Callable[[Any], Any]] = None
+    ):
+        """
+        Initialize a TaskJournal.
+
+        Args:
+            data_path: Directory containing the snapshot and log
+            snapshot_name: File name of the snapshot
+            log_name: File name of the append-only log
+            compact_threshold: Number of logged records that triggers compaction
+            json_default: Function converting values JSON cannot encode, as
+                for json.dumps; by default they raise TypeError
+        """
+        self.data_path = data_path
+        self.snapshot_path = os.path.join(data_path, snapshot_name)
+        self.log_path = os.path.join(data_path, log_name)
+        self.compact_threshold = compact_threshold
+        self.json_default = json_default
+        self.pending: List[Dict[str, Any]] = []
+        self.log_records = 0
+        self.seq = 0  # number of the last record queued
+
+    def append(self, op: str, kind: str, data: Dict[str, Any]):
+        """
+        Queue a record to be appended to the log on the next flush.
+
+        Args:
+            op: Operation ("put" or "delete")
+            kind: Entity kind ("project", "phase" or "task")
+            data: Entity data; delete records only need the IDs
+        """
+        self.pending.append(self.record(op, kind, data))
+
+    def record(self, op: str, kind: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the next numbered record, for callers that batch records themselves.
+
+        Args:
+            op: Operation ("put" or "delete")
+            kind: Entity kind
+            data: Entity data
+
+        Returns:
+            Record to pass to write_records
+        """
+        self.seq += 1
+        return {"seq": self.seq, "op": op, "kind": kind, "data": data}
+
+    def flush(self) -> int:
+        """
+        Append all pending records to the log and sync it to disk.
+
+        Returns:
+            Number of records written
+        """
+        records, self.pending = self.pending, []
+        try:
+            return self.write_records(records)
+        except Exception:
+            self.pending[:0] = records
+            raise
+
+    def write_records(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Append records taken from the pending queue to the log and sync it to disk.
+
+        It can run in a worker thread while new records are queued, as long
+        as the data of these records is no longer changed.
+
+        Args:
+            records: Records to append
+
+        Returns:
+            Number of records written
+        """
+        return self.write_lines(self.encode_records(records), len(records))
+
+    def encode_records(self, records: List[Dict[str, Any]]) -> str:
+        """
+        Encode records as log lines.
+
+        Callers whose records refer to objects that keep changing encode them
+        before handing the lines to a worker thread.
+
+        Args:
+            records: Records to encode
+
+        Returns:
+            The records as JSON lines
+        """
+        return "".join(
+            json.dumps(record, separators=(",", ":"), default=self.json_default) + "\n" for record in records
+        )
+
+    def write_lines(self, lines: str, count: int) -> int:
+        """
+        Append encoded records to the log and sync it to disk.
+
+        Args:
+            lines: Records encoded by encode_records
+            count: Number of records in lines
+
+        Returns:
+            Number of records written
+        """
+        if not count:
+            return 0
+
+        os.makedirs(self.data_path, exist_ok=True)
+        with open(self.log_path, 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.log_records += count
+        return count
+
+    def read_log(self, snapshot_seq: int = 0) -> List[Dict[str, Any]]:
+        """
+        Read the records in the log that are newer than the snapshot.
+
+        A torn record at the end of the log, left by a crash during a flush,
+        is discarded and truncated away so later appends start on a clean line.
+
+        Args:
+            snapshot_seq: Number of the last record the snapshot contains; 0
+                for a snapshot written before records were numbered
+
+        Returns:
+            List of records in the order they were written
+        """
+        records = []
+        self.seq = snapshot_seq
+        if not os.path.exists(self.log_path):
+            self.log_records = 0
+            return records
+
+        valid_size = 0
+        with open(self.log_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_size += len(line)
+                self.seq = max(self.seq, records[-1].get("seq", 0))
+
+        if valid_size < os.path.getsize(self.log_path):
+            print(f"Discarding torn records at the end of {self.log_path}")
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid_size)
+
+        self.log_records = len(records)
+        if snapshot_seq:
+            # Left behind by a crash between replacing the snapshot and
+            # truncating the log
+            records = [record for record in records if record.get("seq", 0) > snapshot_seq]
+        return records
+
+    def needs_compaction(self) -> bool:
+        """
+        Check whether the log has grown past the compaction threshold.
+
+        Returns:
+            True if the log should be compacted, False otherwise
+        """
+        return self.log_records >= self.compact_threshold
+
+    def write_snapshot(self, data: Dict[str, Any], seq: int = 0):
+        """
+        Atomically replace the snapshot and reset the log.
+
+        Records still pending are kept; the caller drops the ones the
+        snapshot already contains. The snapshot is written to a temporary
+        file and renamed into place, so a crash leaves either the old or the
+        new snapshot on disk. The snapshot stores seq, and read_log skips the
+        records up to it, so a crash before the log is truncated does not
+        replay older records over the new snapshot.
+
+        Args:
+            data: Full task data to write
+            seq: Number of the last record the data contains; 0 if the
+                records are not numbered
+        """
+        self.write_encoded_snapshot(self.encode_snapshot(data, seq))
+
+    def encode_snapshot(self, data: Dict[str, Any], seq: int = 0) -> str:
+        """
+        Encode a snapshot for write_encoded_snapshot.
+
+        Args:
+            data: Full data to write
+            seq: Number of the last record the data contains; 0 if the
+                records are not numbered
+
+        Returns:
+            The snapshot as JSON
+        """
+        return json.dumps({**data, "journal_seq": seq}, separators=(",", ":"), default=self.json_default)
+
+    def write_encoded_snapshot(self, snapshot: str):
+        """
+        Atomically replace the snapshot with an encoded one and reset the log.
+
+        Args:
+            snapshot: Snapshot encoded by encode_snapshot
+        """
+        os.makedirs(self.data_path, exist_ok=True)
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+
+        with open(self.log_path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.log_records = 0
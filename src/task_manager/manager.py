@@ -4,12 +4,21 @@ Task Manager Module
 This module provides a simple task manager for handling task data.
 """
 
+import asyncio
+import bisect
 import json
 import os
+import sys
+import threading
+import time
 import uuid
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator, Callable
+
+from src.task_manager.changes import ChangeLogTruncatedError, TaskChangeLog
+from src.task_manager.journal import TaskJournal
+from src.task_manager.search import TaskSearchIndex
 
 
 class TaskStatus(str, Enum):
@@ -19,6 +28,7 @@ class TaskStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
     BLOCKED = "blocked"
+    CANCELLED = "cancelled"
 
 
 class TaskPriority(str, Enum):
@@ -28,9 +38,54 @@ class TaskPriority(str, Enum):
     LOW = "low"
 
 
+def _enum_value(value: Any) -> Any:
+    """Return the plain value of an enum member, or the value unchanged."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def _intern(value: Any) -> Any:
+    """Intern a plain string so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _isoformat(value: Any) -> Any:
+    """Return a datetime as an ISO string, or the value unchanged."""
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+class _LazyTimestamp:
+    """
+    Descriptor for a timestamp that may be stored as an ISO string.
+    
+    Models loaded from disk keep their timestamps as the original strings and
+    parse them on first access, so loading and re-saving never pays for
+    datetime.fromisoformat.
+    """
+    
+    def __set_name__(self, owner, name):
+        self.slot = f"_{name}"
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+            setattr(obj, self.slot, value)
+        return value
+    
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
+
 class Phase:
     """Phase class representing a project phase."""
     
+    __slots__ = ("id", "project_id", "name", "description", "order", "_created_at", "_updated_at")
+    
+    created_at = _LazyTimestamp()
+    updated_at = _LazyTimestamp()
+    
     def __init__(
         self,
         id: str,
@@ -54,12 +109,12 @@ class Phase:
             updated_at: Update timestamp
         """
         self.id = id
-        self.project_id = project_id
+        self.project_id = _intern(project_id)
         self.name = name
         self.description = description
         self.order = order
-        self.created_at = created_at or datetime.now()
-        self.updated_at = updated_at or datetime.now()
+        self._created_at = created_at or datetime.now()
+        self._updated_at = updated_at or datetime.now()
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -74,8 +129,8 @@ class Phase:
             "name": self.name,
             "description": self.description,
             "order": self.order,
-            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
+            "created_at": _isoformat(self._created_at),
+            "updated_at": _isoformat(self._updated_at)
         }
     
     @classmethod
@@ -89,28 +144,29 @@ class Phase:
         Returns:
             Phase instance
         """
-        created_at = data.get("created_at")
-        if created_at and isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        
-        updated_at = data.get("updated_at")
-        if updated_at and isinstance(updated_at, str):
-            updated_at = datetime.fromisoformat(updated_at)
-        
         return cls(
             id=data["id"],
             project_id=data["project_id"],
             name=data["name"],
             description=data["description"],
             order=data["order"],
-            created_at=created_at,
-            updated_at=updated_at
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at")
         )
 
 
 class Task:
     """Task class representing a task."""
     
+    __slots__ = (
+        "id", "project_id", "name", "description", "status", "phase_id", "parent_id",
+        "priority", "progress", "assignee_id", "assignee_type", "metadata", "result",
+        "error", "_created_at", "_updated_at",
+    )
+    
+    created_at = _LazyTimestamp()
+    updated_at = _LazyTimestamp()
+    
     def __init__(
         self,
         id: str,
@@ -152,21 +208,21 @@ class Task:
             updated_at: Update timestamp
         """
         self.id = id
-        self.project_id = project_id
+        self.project_id = _intern(project_id)
         self.name = name
         self.description = description
-        self.status = status
-        self.phase_id = phase_id
-        self.parent_id = parent_id
-        self.priority = priority
+        self.status = _intern(status)
+        self.phase_id = _intern(phase_id)
+        self.parent_id = _intern(parent_id)
+        self.priority = _intern(priority)
         self.progress = progress
-        self.assignee_id = assignee_id
-        self.assignee_type = assignee_type
+        self.assignee_id = _intern(assignee_id)
+        self.assignee_type = _intern(assignee_type)
         self.metadata = metadata or {}
         self.result = result
         self.error = error
-        self.created_at = created_at or datetime.now()
-        self.updated_at = updated_at or datetime.now()
+        self._created_at = created_at or datetime.now()
+        self._updated_at = updated_at or datetime.now()
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -190,8 +246,8 @@ class Task:
             "metadata": self.metadata,
             "result": self.result,
             "error": self.error,
-            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
+            "created_at": _isoformat(self._created_at),
+            "updated_at": _isoformat(self._updated_at)
         }
     
     @classmethod
@@ -205,14 +261,6 @@ class Task:
         Returns:
             Task instance
         """
-        created_at = data.get("created_at")
-        if created_at and isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        
-        updated_at = data.get("updated_at")
-        if updated_at and isinstance(updated_at, str):
-            updated_at = datetime.fromisoformat(updated_at)
-        
         return cls(
             id=data["id"],
             project_id=data["project_id"],
@@ -228,14 +276,19 @@ class Task:
             metadata=data.get("metadata", {}),
             result=data.get("result"),
             error=data.get("error"),
-            created_at=created_at,
-            updated_at=updated_at
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at")
         )
 
 
 class Project:
     """Project class representing a project."""
     
+    __slots__ = ("id", "name", "description", "metadata", "_created_at", "_updated_at", "phases", "tasks")
+    
+    created_at = _LazyTimestamp()
+    updated_at = _LazyTimestamp()
+    
     def __init__(
         self,
         id: str,
@@ -260,8 +313,8 @@ class Project:
         self.name = name
         self.description = description
         self.metadata = metadata or {}
-        self.created_at = created_at or datetime.now()
-        self.updated_at = updated_at or datetime.now()
+        self._created_at = created_at or datetime.now()
+        self._updated_at = updated_at or datetime.now()
         self.phases: Dict[str, Phase] = {}
         self.tasks: Dict[str, Task] = {}
     
@@ -277,8 +330,8 @@ class Project:
             "name": self.name,
             "description": self.description,
             "metadata": self.metadata,
-            "created_at": self.created_at.isoformat() if isinstance(self.created_at, datetime) else self.created_at,
-            "updated_at": self.updated_at.isoformat() if isinstance(self.updated_at, datetime) else self.updated_at
+            "created_at": _isoformat(self._created_at),
+            "updated_at": _isoformat(self._updated_at)
         }
     
     @classmethod
@@ -292,38 +345,329 @@ class Project:
         Returns:
             Project instance
         """
-        created_at = data.get("created_at")
-        if created_at and isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        
-        updated_at = data.get("updated_at")
-        if updated_at and isinstance(updated_at, str):
-            updated_at = datetime.fromisoformat(updated_at)
-        
         return cls(
             id=data["id"],
             name=data["name"],
             description=data["description"],
             metadata=data.get("metadata", {}),
-            created_at=created_at,
-            updated_at=updated_at
+            created_at=data.get("created_at"),
+            updated_at=data.get("updated_at")
         )
 
 
+def _validate_task_specs(
+    task_manager: Any,
+    specs: List[Dict[str, Any]],
+    allowed: Tuple[str, ...],
+    required: Tuple[str, ...]
+) -> List[str]:
+    """
+    Check a batch of task specifications before any of them is applied.
+    
+    Args:
+        task_manager: Task manager the batch will be applied to
+        specs: Task specifications
+        allowed: Keys a specification may contain
+        required: Keys a specification must contain
+    
+    Returns:
+        List of error messages, empty if every specification is valid
+    """
+    errors = []
+    for i, spec in enumerate(specs):
+        if not isinstance(spec, dict):
+            errors.append(f"Item {i}: expected an object")
+            continue
+        
+        unknown = sorted(set(spec) - set(allowed))
+        if unknown:
+            errors.append(f"Item {i}: unknown fields {', '.join(unknown)}")
+        
+        missing = [field for field in required if spec.get(field) is None]
+        if missing:
+            errors.append(f"Item {i}: missing fields {', '.join(missing)}")
+        
+        if "project_id" in required and spec.get("project_id") is not None:
+            if spec["project_id"] not in task_manager.projects:
+                errors.append(f"Item {i}: project not found: {spec['project_id']}")
+        
+        if "task_id" in required and spec.get("task_id") is not None:
+            if task_manager.get_task(spec["task_id"]) is None:
+                errors.append(f"Item {i}: task not found: {spec['task_id']}")
+    return errors
+
+
+def _validate_task_ids(task_manager: Any, task_ids: List[str]) -> List[str]:
+    """
+    Check a batch of task IDs to delete before any of them is deleted.
+    
+    Args:
+        task_manager: Task manager the batch will be applied to
+        task_ids: Task IDs
+    
+    Returns:
+        List of error messages, empty if every ID is valid
+    """
+    errors = [
+        f"Item {i}: task not found: {task_id}"
+        for i, task_id in enumerate(task_ids)
+        if task_manager.get_task(task_id) is None
+    ]
+    if len(set(task_ids)) != len(task_ids):
+        errors.append("Duplicate task IDs")
+    return errors
+
+
 class TaskManager:
     """Task Manager class for managing tasks."""
     
-    def __init__(self, data_path: str):
+    STORAGE_MODES = ("json", "journal")
+    
+    # Keyword arguments accepted by create_task / update_task
+    TASK_FIELDS = (
+        "name", "description", "project_id", "status", "phase_id", "parent_id",
+        "priority", "progress", "assignee_id", "assignee_type", "metadata",
+        "result", "error",
+    )
+    REQUIRED_TASK_FIELDS = ("name", "description", "project_id", "status")
+    
+    def __init__(
+        self,
+        data_path: str,
+        storage_mode: str = "json",
+        compact_threshold: int = 1000,
+        max_changes: int = 10000
+    ):
         """
         Initialize a TaskManager.
         
         Args:
             data_path: Path to task data
+            storage_mode: "json" to rewrite tasks.json on every save, or
+                "journal" to append changes to a log that is periodically
+                compacted into tasks.json
+            compact_threshold: Number of journal records that triggers
+                compaction (journal mode only)
+            max_changes: Number of recent changes kept for get_changes_since
         """
+        if storage_mode not in self.STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode: {storage_mode}")
+        
         self.data_path = data_path
+        self.storage_mode = storage_mode
         self.projects: Dict[str, Project] = {}
+        self._lock = threading.RLock()
+        self._changes = TaskChangeLog(max_changes)
+        self._journal: Optional[TaskJournal] = None
+        if storage_mode == "journal":
+            self._journal = TaskJournal(data_path, compact_threshold=compact_threshold)
+        
+        # Unsaved mutations, coalesced by the background flusher. Writes are
+        # serialized by _io_lock, which is always taken before _lock.
+        self._io_lock = threading.Lock()
+        self._dirty_projects: Dict[str, None] = {}  # project_ids with unsaved changes
+        self._dirty_mutations = 0
+        self._dirty_since: Optional[float] = None  # monotonic time of the oldest unsaved mutation
+        self._last_mutation: Optional[float] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_metrics: Dict[str, Any] = {
+            "flushes": 0,
+            "mutations_flushed": 0,
+            "records_written": 0,
+            "projects_flushed": 0,
+            "errors": 0,
+            "last_flush_seconds": 0.0,
+            "total_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0,
+        }
+        
+        # Global ID indexes so lookups by ID do not scan every project
+        self._task_index: Dict[str, str] = {}  # task_id -> project_id
+        self._phase_index: Dict[str, str] = {}  # phase_id -> project_id
+        
+        # Secondary indexes for filtered task queries. The inner dicts are
+        # used as insertion-ordered sets of task IDs.
+        self._status_index: Dict[Tuple[str, str], Dict[str, None]] = {}  # (project_id, status) -> task_ids
+        self._assignee_index: Dict[str, Dict[Optional[str], Dict[str, None]]] = {}  # assignee_id -> assignee_type -> task_ids
+        self._phase_task_index: Dict[str, Dict[str, None]] = {}  # phase_id -> task_ids
+        self._children_index: Dict[str, Dict[str, None]] = {}  # parent_id -> child task_ids
+        
+        # Status histograms kept up to date on every mutation, so dashboard
+        # statistics do not scan the tasks
+        self._status_totals: Dict[str, int] = {}  # status -> count
+        self._project_status_counts: Dict[str, Dict[str, int]] = {}  # project_id -> status -> count
+        self._phase_status_counts: Dict[Tuple[str, str], Dict[str, int]] = {}  # (project_id, phase_id) -> status -> count
+        self._project_progress: Dict[str, float] = {}  # project_id -> sum of task progress
+        self._phase_progress: Dict[Tuple[str, str], float] = {}  # (project_id, phase_id) -> sum of task progress
+        
+        # Cached subtree rollups, dropped for a task and its ancestors when
+        # the task changes and recomputed on demand. If a task's rollup is
+        # cached, so are the rollups of all its descendants.
+        self._rollups: Dict[str, Dict[str, Any]] = {}  # task_id -> rollup
+        
+        # Full-text index over task names and descriptions, built on the
+        # first search and then kept up to date
+        self._search: Optional[TaskSearchIndex] = None
+        
+        # Sorted lists of (updated_at, task_id) for cursor pagination, keyed by
+        # the _order_keys of a task. Built on the first paged query and then
+        # kept up to date; updated_at is compared as an ISO string so loaded
+        # timestamps are not parsed.
+        self._update_order: Optional[Dict[Tuple, List[Tuple[str, str]]]] = None
+        
         self.load_data()
     
+    def rebuild_indexes(self):
+        """Rebuild all task and phase indexes from the loaded projects."""
+        self._task_index = {}
+        self._phase_index = {}
+        self._status_index = {}
+        self._assignee_index = {}
+        self._phase_task_index = {}
+        self._children_index = {}
+        self._status_totals = {}
+        self._project_status_counts = {}
+        self._phase_status_counts = {}
+        self._project_progress = {}
+        self._phase_progress = {}
+        self._rollups = {}
+        self._search = None
+        self._update_order = None
+        for project in self.projects.values():
+            for phase_id in project.phases:
+                self._phase_index[phase_id] = project.id
+            for task in project.tasks.values():
+                self._index_task(task)
+    
+    def _index_task(self, task: Task):
+        """Add a task to the ID and secondary indexes."""
+        self._task_index[task.id] = task.project_id
+        
+        status_key = (task.project_id, _enum_value(task.status))
+        self._status_index.setdefault(status_key, {})[task.id] = None
+        
+        if task.assignee_id is not None:
+            by_type = self._assignee_index.setdefault(task.assignee_id, {})
+            by_type.setdefault(task.assignee_type, {})[task.id] = None
+        
+        if task.phase_id is not None:
+            self._phase_task_index.setdefault(task.phase_id, {})[task.id] = None
+        
+        if task.parent_id is not None:
+            self._children_index.setdefault(task.parent_id, {})[task.id] = None
+        
+        self._count_task(task, 1)
+        self._invalidate_rollups(task)
+        
+        if self._search is not None:
+            self._search.add(task.id, task.project_id, task.name, task.description)
+        
+        if self._update_order is not None:
+            entry = self._order_entry(task)
+            for key in self._order_keys(task):
+                bisect.insort(self._update_order.setdefault(key, []), entry)
+    
+    def _unindex_task(self, task: Task):
+        """Remove a task from the ID and secondary indexes."""
+        self._task_index.pop(task.id, None)
+        
+        status_key = (task.project_id, _enum_value(task.status))
+        self._discard_from_index(self._status_index, status_key, task.id)
+        
+        if task.assignee_id is not None:
+            by_type = self._assignee_index.get(task.assignee_id)
+            if by_type is not None:
+                self._discard_from_index(by_type, task.assignee_type, task.id)
+                if not by_type:
+                    del self._assignee_index[task.assignee_id]
+        
+        if task.phase_id is not None:
+            self._discard_from_index(self._phase_task_index, task.phase_id, task.id)
+        
+        if task.parent_id is not None:
+            self._discard_from_index(self._children_index, task.parent_id, task.id)
+        
+        self._count_task(task, -1)
+        self._invalidate_rollups(task)
+        
+        if self._update_order is not None:
+            entry = self._order_entry(task)
+            for key in self._order_keys(task):
+                entries = self._update_order.get(key)
+                if entries is None:
+                    continue
+                i = bisect.bisect_left(entries, entry)
+                if i < len(entries) and entries[i] == entry:
+                    del entries[i]
+                if not entries:
+                    del self._update_order[key]
+    
+    @staticmethod
+    def _order_keys(task: Task) -> List[Tuple]:
+        """Get the keys of the ordered lists a task belongs to."""
+        keys = [("project", task.project_id), ("status", task.project_id, _enum_value(task.status))]
+        if task.phase_id is not None:
+            keys.append(("phase", task.project_id, task.phase_id))
+        if task.assignee_id is not None:
+            keys.append(("assignee", task.assignee_id))
+            keys.append(("assignee", task.assignee_id, task.assignee_type))
+        return keys
+    
+    @staticmethod
+    def _order_entry(task: Task) -> Tuple[str, str]:
+        """Get the (updated_at, task_id) sort key of a task."""
+        return (_isoformat(task._updated_at), task.id)
+    
+    def _count_task(self, task: Task, delta: int):
+        """Add delta to the status histograms and progress sums the task belongs to."""
+        status = _enum_value(task.status)
+        histograms = [
+            self._status_totals,
+            self._project_status_counts.setdefault(task.project_id, {}),
+        ]
+        if task.phase_id is not None:
+            histograms.append(self._phase_status_counts.setdefault((task.project_id, task.phase_id), {}))
+        for counts in histograms:
+            counts[status] = counts.get(status, 0) + delta
+        
+        progress = (task.progress or 0.0) * delta
+        self._project_progress[task.project_id] = self._project_progress.get(task.project_id, 0.0) + progress
+        if task.phase_id is not None:
+            key = (task.project_id, task.phase_id)
+            self._phase_progress[key] = self._phase_progress.get(key, 0.0) + progress
+    
+    def _invalidate_rollups(self, task: Task):
+        """Drop the cached rollups of a task and its ancestors."""
+        self._rollups.pop(task.id, None)
+        seen = {task.id}
+        parent_id = task.parent_id
+        # An ancestor without a cached rollup has no cached ancestors either
+        while parent_id is not None and parent_id not in seen and self._rollups.pop(parent_id, None) is not None:
+            seen.add(parent_id)
+            parent = self.get_task(parent_id)
+            parent_id = parent.parent_id if parent else None
+    
+    @staticmethod
+    def _discard_from_index(index: Dict[Any, Dict[str, None]], key: Any, task_id: str):
+        """Remove a task ID from an index bucket, dropping the bucket when empty."""
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(task_id, None)
+        if not bucket:
+            del index[key]
+    
+    def _tasks_for_ids(self, task_ids) -> List[Task]:
+        """Resolve task IDs from an index bucket to Task objects."""
+        tasks = []
+        for task_id in task_ids:
+            task = self.get_task(task_id)
+            if task:
+                tasks.append(task)
+        return tasks
+    
     def load_data(self):
         """Load task data from file."""
         if not os.path.exists(self.data_path):
@@ -331,8 +675,11 @@ class TaskManager:
             return
         
         try:
-            with open(os.path.join(self.data_path, "tasks.json"), 'r') as f:
-                data = json.load(f)
+            snapshot_path = os.path.join(self.data_path, "tasks.json")
+            data = {}
+            if not self._journal or os.path.exists(snapshot_path):
+                with open(snapshot_path, 'r') as f:
+                    data = json.load(f)
             
             # Load projects
             for project_data in data.get("projects", []):
@@ -352,25 +699,353 @@ class TaskManager:
                     self.projects[task.project_id].tasks[task.id] = task
         except Exception as e:
             print(f"Error loading task data: {e}")
+        
+        if self._journal:
+            try:
+                for record in self._journal.read_log(data.get("journal_seq", 0)):
+                    self._apply_journal_record(record)
+            except Exception as e:
+                print(f"Error replaying task journal: {e}")
+        
+        self.rebuild_indexes()
+    
+    def _apply_journal_record(self, record: Dict[str, Any]):
+        """Apply a journal record to the in-memory projects during replay."""
+        op, kind, data = record["op"], record["kind"], record["data"]
+        
+        if kind == "project":
+            existing = self.projects.pop(data["id"], None)
+            if op == "put":
+                project = Project.from_dict(data)
+                if existing:
+                    project.phases = existing.phases
+                    project.tasks = existing.tasks
+                self.projects[project.id] = project
+            return
+        
+        project = self.projects.get(data["project_id"])
+        if not project:
+            return
+        
+        items = project.phases if kind == "phase" else project.tasks
+        if op == "delete":
+            items.pop(data["id"], None)
+        elif kind == "phase":
+            items[data["id"]] = Phase.from_dict(data)
+        else:
+            items[data["id"]] = Task.from_dict(data)
+    
+    def _record(self, op: str, kind: str, item: Any):
+        """
+        Record a mutation in the change log and the journal.
+        
+        Args:
+            op: Operation ("put" or "delete")
+            kind: Entity kind ("project", "phase" or "task")
+            item: The Project, Phase or Task that changed
+        """
+        if op == "put":
+            data = item.to_dict()
+        elif kind == "project":
+            data = {"id": item.id}
+        else:
+            data = {"id": item.id, "project_id": item.project_id}
+        
+        now = time.monotonic()
+        with self._lock:
+            # The mutations call this under the same lock, so a flush sees
+            # each change together with its change log and journal records
+            self._changes.record(op, kind, data)
+            if self._journal:
+                self._journal.append(op, kind, data)
+            self._dirty_projects[item.id if kind == "project" else item.project_id] = None
+            self._dirty_mutations += 1
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._last_mutation = now
+        
+        event = self._flush_event
+        if event is not None and not event.is_set():
+            try:
+                self._flush_loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The flusher's event loop is closed
+                self._flush_event = None
+    
+    @property
+    def version(self) -> int:
+        """Version of the most recent mutation; 0 if nothing changed since loading."""
+        return self._changes.version
+    
+    def get_changes_since(self, version: int, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the mutations made after a version.
+        
+        Each change has the new version, the operation ("put" or "delete"),
+        the entity kind and ID, the project ID and the entity data.
+        
+        Args:
+            version: Last version the caller has seen
+            project_id: Only return changes to this project
+        
+        Returns:
+            Changes in version order
+        
+        Raises:
+            ChangeLogTruncatedError: If the changes are no longer in the
+                bounded change log; the caller should re-read the data
+        """
+        return self._changes.changes_since(version, project_id)
+    
+    def subscribe(
+        self,
+        since: Optional[int] = None,
+        project_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Subscribe to mutations as they are made.
+        
+        Args:
+            since: Also yield the logged changes after this version first;
+                None to start with the next change
+            project_id: Only yield changes to this project
+        
+        Returns:
+            Async iterator of changes in version order
+        """
+        return self._changes.subscribe(since, project_id)
+    
+    def _snapshot_data(self) -> Dict[str, Any]:
+        """Build the full task data written to tasks.json."""
+        data = {
+            "projects": [project.to_dict() for project in self.projects.values()],
+            "phases": [],
+            "tasks": []
+        }
+        
+        for project in self.projects.values():
+            data["phases"].extend([phase.to_dict() for phase in project.phases.values()])
+            data["tasks"].extend([task.to_dict() for task in project.tasks.values()])
+        
+        return data
+    
+    def compact(self):
+        """Write a snapshot of all task data and truncate the journal (journal mode only)."""
+        if not self._journal:
+            return
+        
+        with self._io_lock:
+            self._prepare_save(compact=True)()
     
     def save_data(self):
         """Save task data to file."""
+        with self._io_lock:
+            self._prepare_save()()
+    
+    def _prepare_save(self, compact: bool = False) -> Callable[[], int]:
+        """
+        Capture the data to save and return a writer that only does the file I/O.
+        
+        The capture runs under the lock on the calling thread, and the writer
+        can then run in a worker thread while mutations continue. The caller
+        holds the I/O lock until the writer has run, so writes stay in order.
+        
+        Args:
+            compact: Write a snapshot even if the journal is below the
+                compaction threshold (journal mode only)
+        
+        Returns:
+            Writer returning the number of records written
+        """
+        with self._lock:
+            dirty = (self._dirty_projects, self._dirty_mutations, self._dirty_since)
+            self._dirty_projects = {}
+            self._dirty_mutations = 0
+            self._dirty_since = None
+            
+            records: List[Dict[str, Any]] = []
+            data = None
+            seq = 0
+            if self._journal:
+                records, self._journal.pending = self._journal.pending, []
+                log_records = self._journal.log_records + len(records)
+                if compact or log_records >= self._journal.compact_threshold:
+                    # The pending records are folded into the snapshot, which
+                    # is numbered past them and the records in the log
+                    data = self._snapshot_data()
+                    seq = self._journal.seq
+            else:
+                data = self._snapshot_data()
+        
+        def write() -> int:
+            start = time.perf_counter()
+            try:
+                if data is None:
+                    action = "saving task journal"
+                    written = self._journal.write_records(records)
+                elif self._journal:
+                    action = "compacting task journal"
+                    self._journal.write_snapshot(data, seq)
+                    written = sum(len(items) for items in data.values())
+                else:
+                    action = "saving task data"
+                    os.makedirs(os.path.dirname(os.path.join(self.data_path, "tasks.json")), exist_ok=True)
+                    with open(os.path.join(self.data_path, "tasks.json"), 'w') as f:
+                        json.dump(data, f, indent=2)
+                    written = sum(len(items) for items in data.values())
+            except Exception as e:
+                print(f"Error {action}: {e}")
+                self._restore_dirty(records, *dirty)
+                return 0
+            
+            self._record_flush(time.perf_counter() - start, dirty[1], written, len(dirty[0]))
+            return written
+        
+        return write
+    
+    def _restore_dirty(
+        self,
+        records: List[Dict[str, Any]],
+        projects: Dict[str, None],
+        mutations: int,
+        since: Optional[float]
+    ):
+        """Mark the changes captured by a failed write as unsaved again."""
+        with self._lock:
+            if self._journal:
+                self._journal.pending[:0] = records
+            projects = dict(projects)
+            projects.update(self._dirty_projects)
+            self._dirty_projects = projects
+            self._dirty_mutations += mutations
+            if since is not None and (self._dirty_since is None or since < self._dirty_since):
+                self._dirty_since = since
+            self._flush_metrics["errors"] += 1
+        # The flusher is not woken, so a failing disk is retried on the next
+        # mutation or on shutdown rather than in a loop
+    
+    def _record_flush(self, seconds: float, mutations: int, records: int, projects: int):
+        """Update the flush metrics after a successful write."""
+        with self._lock:
+            metrics = self._flush_metrics
+            metrics["flushes"] += 1
+            metrics["mutations_flushed"] += mutations
+            metrics["records_written"] += records
+            metrics["projects_flushed"] += projects
+            metrics["last_flush_seconds"] = seconds
+            metrics["total_flush_seconds"] += seconds
+            metrics["max_flush_seconds"] = max(metrics["max_flush_seconds"], seconds)
+    
+    def get_flush_metrics(self) -> Dict[str, Any]:
+        """
+        Get the save metrics.
+        
+        Returns:
+            Dictionary with the number of flushes, the mutations they saved,
+            the records and projects written, write errors, flush durations
+            in seconds, and the unsaved projects and mutations
+        """
+        with self._lock:
+            metrics = dict(self._flush_metrics)
+            metrics["dirty_projects"] = len(self._dirty_projects)
+            metrics["dirty_mutations"] = self._dirty_mutations
+        metrics["flusher_running"] = self._flusher is not None and not self._flusher.done()
+        return metrics
+    
+    async def flush(self) -> int:
+        """
+        Save the unsaved changes, doing the file I/O in a worker thread.
+        
+        Returns:
+            Number of records written; 0 if there was nothing to save
+        """
+        # Shielded so a cancelled caller cannot leave the I/O lock held
+        return await asyncio.shield(self._flush())
+    
+    async def _flush(self) -> int:
+        """Save the unsaved changes; see flush."""
+        if not self._io_lock.acquire(blocking=False):
+            await asyncio.to_thread(self._io_lock.acquire)
         try:
-            data = {
-                "projects": [project.to_dict() for project in self.projects.values()],
-                "phases": [],
-                "tasks": []
-            }
+            if not self._dirty_mutations:
+                return 0
+            writer = self._prepare_save()
+            return await asyncio.to_thread(writer)
+        finally:
+            self._io_lock.release()
+    
+    def start_flusher(self, interval: float = 1.0, max_latency: float = 5.0) -> asyncio.Task:
+        """
+        Start saving changes in the background on the running event loop.
+        
+        Each mutation marks its project dirty and wakes the flusher. The
+        flusher waits until no mutation has been made for interval seconds,
+        or until the oldest unsaved mutation is max_latency seconds old, and
+        then saves everything in one write.
+        
+        Args:
+            interval: Seconds without mutations before a burst is saved
+            max_latency: Maximum seconds a mutation stays unsaved while
+                mutations keep coming
+        
+        Returns:
+            The flusher task
+        
+        Raises:
+            ValueError: If interval or max_latency is not positive
+            RuntimeError: If the flusher is already running
+        """
+        if interval <= 0 or max_latency <= 0:
+            raise ValueError("Flush interval and max latency must be positive")
+        if self._flusher is not None and not self._flusher.done():
+            raise RuntimeError("Flusher is already running")
+        
+        self._flush_loop = asyncio.get_running_loop()
+        self._flush_event = asyncio.Event()
+        if self._dirty_mutations:
+            self._flush_event.set()
+        self._flusher = self._flush_loop.create_task(self._run_flusher(interval, max_latency))
+        return self._flusher
+    
+    async def stop_flusher(self) -> int:
+        """
+        Stop the background flusher and save any remaining changes.
+        
+        Returns:
+            Number of records written by the final save
+        """
+        flusher, self._flusher = self._flusher, None
+        self._flush_event = None
+        self._flush_loop = None
+        if flusher is not None:
+            flusher.cancel()
+            try:
+                await flusher
+            except asyncio.CancelledError:
+                pass
+        return await self.flush()
+    
+    async def _run_flusher(self, interval: float, max_latency: float):
+        """Wait for mutations and save them in coalesced writes."""
+        event = self._flush_event
+        while True:
+            await event.wait()
+            event.clear()
             
-            for project in self.projects.values():
-                data["phases"].extend([phase.to_dict() for phase in project.phases.values()])
-                data["tasks"].extend([task.to_dict() for task in project.tasks.values()])
+            while True:
+                with self._lock:
+                    if not self._dirty_mutations:
+                        break
+                    deadline = min(self._last_mutation + interval, self._dirty_since + max_latency)
+                delay = deadline - time.monotonic()
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
             
-            os.makedirs(os.path.dirname(os.path.join(self.data_path, "tasks.json")), exist_ok=True)
-            with open(os.path.join(self.data_path, "tasks.json"), 'w') as f:
-                json.dump(data, f, indent=2)
-        except Exception as e:
-            print(f"Error saving task data: {e}")
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing task data: {e}")
     
     def create_project(
         self,
@@ -389,15 +1064,17 @@ class TaskManager:
         Returns:
             Created Project
         """
-        project_id = f"project-{str(uuid.uuid4())}"
-        project = Project(
-            id=project_id,
-            name=name,
-            description=description,
-            metadata=metadata
-        )
-        self.projects[project_id] = project
-        return project
+        with self._lock:
+            project_id = f"project-{str(uuid.uuid4())}"
+            project = Project(
+                id=project_id,
+                name=name,
+                description=description,
+                metadata=metadata
+            )
+            self.projects[project_id] = project
+            self._record("put", "project", project)
+            return project
     
     def get_project(self, project_id: str) -> Optional[Project]:
         """
@@ -430,21 +1107,23 @@ class TaskManager:
         Returns:
             Updated Project or None if not found
         """
-        project = self.get_project(project_id)
-        if not project:
-            return None
-        
-        if name is not None:
-            project.name = name
-        
-        if description is not None:
-            project.description = description
-        
-        if metadata is not None:
-            project.metadata = metadata
-        
-        project.updated_at = datetime.now()
-        return project
+        with self._lock:
+            project = self.get_project(project_id)
+            if not project:
+                return None
+            
+            if name is not None:
+                project.name = name
+            
+            if description is not None:
+                project.description = description
+            
+            if metadata is not None:
+                project.metadata = metadata
+            
+            project.updated_at = datetime.now()
+            self._record("put", "project", project)
+            return project
     
     def delete_project(self, project_id: str) -> bool:
         """
@@ -456,10 +1135,24 @@ class TaskManager:
         Returns:
             True if project was deleted, False otherwise
         """
-        if project_id in self.projects:
-            del self.projects[project_id]
+        with self._lock:
+            project = self.projects.pop(project_id, None)
+            if not project:
+                return False
+            
+            for phase_id in project.phases:
+                self._phase_index.pop(phase_id, None)
+            for task in project.tasks.values():
+                self._unindex_task(task)
+                if self._search is not None:
+                    self._search.remove(task.id)
+            self._project_status_counts.pop(project_id, None)
+            self._project_progress.pop(project_id, None)
+            for phase_id in project.phases:
+                self._phase_status_counts.pop((project_id, phase_id), None)
+                self._phase_progress.pop((project_id, phase_id), None)
+            self._record("delete", "project", project)
             return True
-        return False
     
     def create_phase(
         self,
@@ -480,20 +1173,23 @@ class TaskManager:
         Returns:
             Created Phase or None if project not found
         """
-        project = self.get_project(project_id)
-        if not project:
-            return None
-        
-        phase_id = f"phase-{str(uuid.uuid4())}"
-        phase = Phase(
-            id=phase_id,
-            project_id=project_id,
-            name=name,
-            description=description,
-            order=order
-        )
-        project.phases[phase_id] = phase
-        return phase
+        with self._lock:
+            project = self.get_project(project_id)
+            if not project:
+                return None
+            
+            phase_id = f"phase-{str(uuid.uuid4())}"
+            phase = Phase(
+                id=phase_id,
+                project_id=project_id,
+                name=name,
+                description=description,
+                order=order
+            )
+            project.phases[phase_id] = phase
+            self._phase_index[phase_id] = project_id
+            self._record("put", "phase", phase)
+            return phase
     
     def get_phase(self, phase_id: str) -> Optional[Phase]:
         """
@@ -505,10 +1201,10 @@ class TaskManager:
         Returns:
             Phase or None if not found
         """
-        for project in self.projects.values():
-            if phase_id in project.phases:
-                return project.phases[phase_id]
-        return None
+        project = self.projects.get(self._phase_index.get(phase_id))
+        if not project:
+            return None
+        return project.phases.get(phase_id)
     
     def update_phase(
         self,
@@ -529,21 +1225,23 @@ class TaskManager:
         Returns:
             Updated Phase or None if not found
         """
-        phase = self.get_phase(phase_id)
-        if not phase:
-            return None
-        
-        if name is not None:
-            phase.name = name
-        
-        if description is not None:
-            phase.description = description
-        
-        if order is not None:
-            phase.order = order
-        
-        phase.updated_at = datetime.now()
-        return phase
+        with self._lock:
+            phase = self.get_phase(phase_id)
+            if not phase:
+                return None
+            
+            if name is not None:
+                phase.name = name
+            
+            if description is not None:
+                phase.description = description
+            
+            if order is not None:
+                phase.order = order
+            
+            phase.updated_at = datetime.now()
+            self._record("put", "phase", phase)
+            return phase
     
     def delete_phase(self, phase_id: str) -> bool:
         """
@@ -555,11 +1253,13 @@ class TaskManager:
         Returns:
             True if phase was deleted, False otherwise
         """
-        for project in self.projects.values():
-            if phase_id in project.phases:
-                del project.phases[phase_id]
-                return True
-        return False
+        with self._lock:
+            project = self.projects.get(self._phase_index.pop(phase_id, None))
+            if not project or phase_id not in project.phases:
+                return False
+            
+            self._record("delete", "phase", project.phases.pop(phase_id))
+            return True
     
     def create_task(
         self,
@@ -598,29 +1298,32 @@ class TaskManager:
         Returns:
             Created Task or None if project not found
         """
-        project = self.get_project(project_id)
-        if not project:
-            return None
-        
-        task_id = f"task-{str(uuid.uuid4())}"
-        task = Task(
-            id=task_id,
-            project_id=project_id,
-            name=name,
-            description=description,
-            status=status,
-            phase_id=phase_id,
-            parent_id=parent_id,
-            priority=priority,
-            progress=progress,
-            assignee_id=assignee_id,
-            assignee_type=assignee_type,
-            metadata=metadata,
-            result=result,
-            error=error
-        )
-        project.tasks[task_id] = task
-        return task
+        with self._lock:
+            project = self.get_project(project_id)
+            if not project:
+                return None
+            
+            task_id = f"task-{str(uuid.uuid4())}"
+            task = Task(
+                id=task_id,
+                project_id=project_id,
+                name=name,
+                description=description,
+                status=status,
+                phase_id=phase_id,
+                parent_id=parent_id,
+                priority=priority,
+                progress=progress,
+                assignee_id=assignee_id,
+                assignee_type=assignee_type,
+                metadata=metadata,
+                result=result,
+                error=error
+            )
+            project.tasks[task_id] = task
+            self._index_task(task)
+            self._record("put", "task", task)
+            return task
     
     def get_task(self, task_id: str) -> Optional[Task]:
         """
@@ -632,10 +1335,10 @@ class TaskManager:
         Returns:
             Task or None if not found
         """
-        for project in self.projects.values():
-            if task_id in project.tasks:
-                return project.tasks[task_id]
-        return None
+        project = self.projects.get(self._task_index.get(task_id))
+        if not project:
+            return None
+        return project.tasks.get(task_id)
     
     def update_task(
         self,
@@ -674,74 +1377,559 @@ class TaskManager:
         Returns:
             Updated Task or None if not found
         """
-        task = self.get_task(task_id)
-        if not task:
-            return None
+        with self._lock:
+            task = self.get_task(task_id)
+            if not task:
+                return None
+            
+            # Drop the task from the secondary indexes while its keys change
+            self._unindex_task(task)
+            
+            if name is not None:
+                task.name = name
+            
+            if description is not None:
+                task.description = description
+            
+            if status is not None:
+                task.status = status
+            
+            if phase_id is not None:
+                task.phase_id = phase_id
+            
+            if parent_id is not None:
+                task.parent_id = parent_id
+            
+            if priority is not None:
+                task.priority = priority
+            
+            if progress is not None:
+                task.progress = progress
+            
+            if assignee_id is not None:
+                task.assignee_id = assignee_id
+            
+            if assignee_type is not None:
+                task.assignee_type = assignee_type
+            
+            if metadata is not None:
+                task.metadata = metadata
+            
+            if result is not None:
+                task.result = result
+            
+            if error is not None:
+                task.error = error
+            
+            task.updated_at = datetime.now()
+            self._index_task(task)
+            self._record("put", "task", task)
+            return task
+    
+    def update_task_status(self, task_id: str, status: str) -> Optional[Task]:
+        """
+        Update a task's status.
         
-        if name is not None:
-            task.name = name
+        Args:
+            task_id: Task ID
+            status: Task status
         
-        if description is not None:
-            task.description = description
+        Returns:
+            Updated Task or None if not found
+        """
+        return self.update_task(task_id, status=status)
+    
+    def update_task_progress(self, task_id: str, progress: float) -> Optional[Task]:
+        """
+        Update a task's progress.
         
-        if status is not None:
-            task.status = status
+        Args:
+            task_id: Task ID
+            progress: Task progress
         
-        if phase_id is not None:
-            task.phase_id = phase_id
+        Returns:
+            Updated Task or None if not found
+        """
+        return self.update_task(task_id, progress=progress)
+    
+    def delete_task(self, task_id: str) -> bool:
+        """
+        Delete a task.
         
-        if parent_id is not None:
-            task.parent_id = parent_id
+        Args:
+            task_id: Task ID
         
-        if priority is not None:
-            task.priority = priority
+        Returns:
+            True if task was deleted, False otherwise
+        """
+        with self._lock:
+            project = self.projects.get(self._task_index.get(task_id))
+            if not project or task_id not in project.tasks:
+                return False
+            
+            task = project.tasks.pop(task_id)
+            self._unindex_task(task)
+            if self._search is not None:
+                self._search.remove(task.id)
+            self._record("delete", "task", task)
+            return True
+    
+    def create_tasks_bulk(self, tasks: List[Dict[str, Any]]) -> List[Task]:
+        """
+        Create many tasks and save once.
         
-        if progress is not None:
-            task.progress = progress
+        Every specification is checked before any task is created, so either
+        the whole batch is applied or nothing is.
         
-        if assignee_id is not None:
-            task.assignee_id = assignee_id
+        Args:
+            tasks: Task specifications with the keyword arguments of create_task
+        
+        Returns:
+            Created tasks, in the same order as the specifications
+        
+        Raises:
+            ValueError: If any specification is invalid
+        """
+        with self._lock:
+            errors = _validate_task_specs(self, tasks, self.TASK_FIELDS, self.REQUIRED_TASK_FIELDS)
+            if errors:
+                raise ValueError("; ".join(errors))
+            
+            created = [self.create_task(**spec) for spec in tasks]
+        
+        self.save_data()
+        return created
+    
+    def update_tasks_bulk(self, updates: List[Dict[str, Any]]) -> List[Task]:
+        """
+        Update many tasks and save once.
+        
+        Every update is checked before any task is changed, so either the whole
+        batch is applied or nothing is.
+        
+        Args:
+            updates: Updates with a task_id and the keyword arguments of update_task
+        
+        Returns:
+            Updated tasks, in the same order as the updates
+        
+        Raises:
+            ValueError: If any update is invalid or refers to a missing task
+        """
+        allowed = ("task_id",) + tuple(field for field in self.TASK_FIELDS if field != "project_id")
+        with self._lock:
+            errors = _validate_task_specs(self, updates, allowed, ("task_id",))
+            if errors:
+                raise ValueError("; ".join(errors))
+            
+            updated = [self.update_task(**update) for update in updates]
+        
+        self.save_data()
+        return updated
+    
+    def delete_tasks_bulk(self, task_ids: List[str]) -> int:
+        """
+        Delete many tasks and save once.
+        
+        Every ID is checked before any task is deleted, so either the whole
+        batch is applied or nothing is.
+        
+        Args:
+            task_ids: IDs of the tasks to delete
+        
+        Returns:
+            Number of deleted tasks
+        
+        Raises:
+            ValueError: If any ID is duplicated or refers to a missing task
+        """
+        with self._lock:
+            errors = _validate_task_ids(self, task_ids)
+            if errors:
+                raise ValueError("; ".join(errors))
+            
+            for task_id in task_ids:
+                self.delete_task(task_id)
+        
+        self.save_data()
+        return len(task_ids)
+    
+    def get_tasks_by_status(self, project_id: str, status: str) -> List[Task]:
+        """
+        Get the tasks in a project with a given status.
+        
+        Args:
+            project_id: Project ID
+            status: Task status
+        
+        Returns:
+            List of matching tasks
+        """
+        task_ids = self._status_index.get((project_id, _enum_value(status)), {})
+        return self._tasks_for_ids(task_ids)
+    
+    def get_tasks_by_phase(self, project_id: str, phase_id: str) -> List[Task]:
+        """
+        Get the tasks in a phase of a project.
+        
+        Args:
+            project_id: Project ID
+            phase_id: Phase ID
         
+        Returns:
+            List of matching tasks
+        """
+        tasks = self._tasks_for_ids(self._phase_task_index.get(phase_id, {}))
+        return [task for task in tasks if task.project_id == project_id]
+    
+    def get_tasks_by_assignee(
+        self,
+        assignee_id: str,
+        assignee_type: Optional[str] = None
+    ) -> List[Task]:
+        """
+        Get the tasks assigned to an assignee across all projects.
+        
+        Args:
+            assignee_id: Assignee ID
+            assignee_type: Assignee type, or None to match any type
+        
+        Returns:
+            List of matching tasks
+        """
+        by_type = self._assignee_index.get(assignee_id, {})
         if assignee_type is not None:
-            task.assignee_type = assignee_type
+            return self._tasks_for_ids(by_type.get(assignee_type, {}))
+        
+        tasks = []
+        for task_ids in by_type.values():
+            tasks.extend(self._tasks_for_ids(task_ids))
+        return tasks
+    
+    def get_tasks_page(
+        self,
+        project_id: Optional[str] = None,
+        phase_id: Optional[str] = None,
+        status: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        assignee_type: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 100,
+        descending: bool = False
+    ) -> Tuple[List[Task], Optional[Tuple[str, str]]]:
+        """
+        Get a page of tasks ordered by (updated_at, id).
+        
+        Pages are read from ordered lists kept per project, status, phase and
+        assignee, so a page costs the same however deep it is. A task updated
+        while pages are being read moves to its new position, and every task
+        that is not updated is returned exactly once.
+        
+        Args:
+            project_id: Project ID; required unless assignee_id is given
+            phase_id: Filter by phase ID
+            status: Filter by status
+            assignee_id: Filter by assignee ID
+            assignee_type: Filter by assignee type, or None to match any type
+            after: (updated_at, id) key of the last task of the previous page
+            limit: Maximum number of tasks to return
+            descending: Return the most recently updated tasks first
+        
+        Returns:
+            Tuple of the tasks and the key to pass as after for the next page,
+            or None if this is the last page
         
-        if metadata is not None:
-            task.metadata = metadata
+        Raises:
+            ValueError: If neither project_id nor assignee_id is given
+        """
+        if project_id is None and assignee_id is None:
+            raise ValueError("project_id or assignee_id is required")
         
-        if result is not None:
-            task.result = result
+        if self._update_order is None:
+            self._update_order = {}
+            for project in self.projects.values():
+                for task in project.tasks.values():
+                    entry = self._order_entry(task)
+                    for key in self._order_keys(task):
+                        self._update_order.setdefault(key, []).append(entry)
+            for entries in self._update_order.values():
+                entries.sort()
+        
+        status = _enum_value(status)
+        if assignee_id is not None:
+            key = ("assignee", assignee_id) if assignee_type is None else ("assignee", assignee_id, assignee_type)
+        elif phase_id is not None:
+            key = ("phase", project_id, phase_id)
+        elif status is not None:
+            key = ("status", project_id, status)
+        else:
+            key = ("project", project_id)
+        entries = self._update_order.get(key, [])
+        
+        if descending:
+            start = len(entries) if after is None else bisect.bisect_left(entries, tuple(after))
+            positions = range(start - 1, -1, -1)
+        else:
+            start = 0 if after is None else bisect.bisect_right(entries, tuple(after))
+            positions = range(start, len(entries))
+        
+        # Filters the chosen list does not cover are applied while reading it;
+        # one match past the page tells whether there is a next page
+        tasks = []
+        for i in positions:
+            task = self.get_task(entries[i][1])
+            if task is None:
+                continue
+            if ((project_id is not None and task.project_id != project_id)
+                    or (phase_id is not None and task.phase_id != phase_id)
+                    or (status is not None and _enum_value(task.status) != status)):
+                continue
+            if len(tasks) == limit:
+                return tasks, self._order_entry(tasks[-1])
+            tasks.append(task)
+        return tasks, None
+    
+    def get_child_tasks(self, parent_id: str) -> List[Task]:
+        """
+        Get the direct children of a task.
         
-        if error is not None:
-            task.error = error
+        Args:
+            parent_id: Parent task ID
         
-        task.updated_at = datetime.now()
-        return task
+        Returns:
+            List of child tasks
+        """
+        return self._tasks_for_ids(self._children_index.get(parent_id, {}))
     
-    def delete_task(self, task_id: str) -> bool:
+    def get_subtree(self, task_id: str) -> List[Task]:
         """
-        Delete a task.
+        Get a task and all its descendants.
         
         Args:
-            task_id: Task ID
+            task_id: Root task ID
         
         Returns:
-            True if task was deleted, False otherwise
+            List of tasks in depth-first order, starting with the root; empty
+            if the task is not found
         """
-        for project in self.projects.values():
-            if task_id in project.tasks:
-                del project.tasks[task_id]
-                return True
-        return False
+        root = self.get_task(task_id)
+        if not root:
+            return []
+        
+        tasks = []
+        seen = set()
+        stack = [root]
+        while stack:
+            task = stack.pop()
+            if task.id in seen:
+                continue
+            seen.add(task.id)
+            tasks.append(task)
+            stack.extend(reversed(self.get_child_tasks(task.id)))
+        return tasks
+    
+    def get_task_rollup(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the rollup of a task's subtree.
+        
+        Rollups are cached per task and only recomputed for the tasks whose
+        subtree changed, so repeated reads of large trees do not walk them.
+        
+        Args:
+            task_id: Root task ID
+        
+        Returns:
+            Dictionary with the number of tasks in the subtree, their average
+            progress, counts by status and the earliest created_at and latest
+            updated_at, or None if the task is not found
+        """
+        task = self.get_task(task_id)
+        if not task:
+            return None
+        
+        rollup = self._rollup(task)
+        counts = {status.value: 0 for status in TaskStatus}
+        counts.update(rollup["status_counts"])
+        return {
+            "task_id": task_id,
+            "task_count": rollup["task_count"],
+            "progress": rollup["progress_sum"] / rollup["task_count"],
+            "status_counts": counts,
+            "earliest_created_at": rollup["earliest_created_at"],
+            "latest_updated_at": rollup["latest_updated_at"],
+        }
+    
+    def _rollup(self, root: Task) -> Dict[str, Any]:
+        """Get the cached rollup of a subtree, computing missing ones bottom-up."""
+        if root.id in self._rollups:
+            return self._rollups[root.id]
+        
+        # Iterative post-order walk, so deep trees do not hit the recursion limit
+        visiting = set()
+        stack = [(root, False)]
+        while stack:
+            task, expanded = stack.pop()
+            if task.id in self._rollups:
+                continue
+            children = self.get_child_tasks(task.id)
+            if not expanded:
+                visiting.add(task.id)
+                stack.append((task, True))
+                stack.extend(
+                    (child, False) for child in children
+                    if child.id not in self._rollups and child.id not in visiting
+                )
+                continue
+            
+            rollup = {
+                "task_count": 1,
+                "progress_sum": task.progress or 0.0,
+                "status_counts": {_enum_value(task.status): 1},
+                "earliest_created_at": task.created_at,
+                "latest_updated_at": task.updated_at,
+            }
+            for child in children:
+                # Missing only if parent_id links form a cycle
+                child_rollup = self._rollups.get(child.id)
+                if child_rollup is None:
+                    continue
+                rollup["task_count"] += child_rollup["task_count"]
+                rollup["progress_sum"] += child_rollup["progress_sum"]
+                counts = rollup["status_counts"]
+                for status, count in child_rollup["status_counts"].items():
+                    counts[status] = counts.get(status, 0) + count
+                rollup["earliest_created_at"] = min(rollup["earliest_created_at"], child_rollup["earliest_created_at"])
+                rollup["latest_updated_at"] = max(rollup["latest_updated_at"], child_rollup["latest_updated_at"])
+            self._rollups[task.id] = rollup
+        
+        return self._rollups[root.id]
+    
+    def search_tasks(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Tuple[Task, float]]:
+        """
+        Search task names and descriptions.
+        
+        Every query token must match; the last one also matches as a prefix.
+        Results are ranked with BM25, counting name matches twice.
+        
+        Args:
+            query: Query text
+            project_id: Only return tasks in this project
+            limit: Maximum number of results
+        
+        Returns:
+            List of (task, score) pairs, best match first
+        """
+        if self._search is None:
+            self._search = TaskSearchIndex()
+            for project in self.projects.values():
+                for task in project.tasks.values():
+                    self._search.add(task.id, task.project_id, task.name, task.description)
+        
+        results = []
+        for task_id, score in self._search.search(query, project_id, limit):
+            task = self.get_task(task_id)
+            if task:
+                results.append((task, score))
+        return results
+    
+    def calculate_project_progress(self, project_id: str) -> float:
+        """
+        Calculate the average progress of the tasks in a project.
+        
+        Progress sums are maintained on every mutation, so this does not scan
+        any tasks.
+        
+        Args:
+            project_id: Project ID
+        
+        Returns:
+            Average task progress, or 0.0 if the project has no tasks
+        """
+        count = sum(self._project_status_counts.get(project_id, {}).values())
+        if not count:
+            return 0.0
+        return self._project_progress.get(project_id, 0.0) / count
+    
+    def calculate_phase_progress(self, project_id: str, phase_id: str) -> float:
+        """
+        Calculate the average progress of the tasks in a phase.
+        
+        Args:
+            project_id: Project ID
+            phase_id: Phase ID
+        
+        Returns:
+            Average task progress, or 0.0 if the phase has no tasks
+        """
+        key = (project_id, phase_id)
+        count = sum(self._phase_status_counts.get(key, {}).values())
+        if not count:
+            return 0.0
+        return self._phase_progress.get(key, 0.0) / count
+    
+    def count_tasks_by_status(
+        self,
+        project_id: Optional[str] = None,
+        phase_id: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Count tasks by status.
+        
+        The counts are maintained on every mutation, so this does not scan
+        any tasks.
+        
+        Args:
+            project_id: Project ID, or None to count across all projects
+            phase_id: Phase ID, or None to count across all phases; when given
+                without a project ID, the phase's project is used
+        
+        Returns:
+            Dictionary mapping status values to task counts
+        """
+        if phase_id is not None:
+            project_id = project_id or self._phase_index.get(phase_id)
+            source = self._phase_status_counts.get((project_id, phase_id), {})
+        elif project_id is not None:
+            source = self._project_status_counts.get(project_id, {})
+        else:
+            source = self._status_totals
+        
+        counts = {status.value: 0 for status in TaskStatus}
+        counts.update(source)
+        return counts
+
+
+# Task managers by (data path, storage mode), so every caller shares one
+# instance and its change log
+_task_managers: Dict[Tuple[str, str], TaskManager] = {}
+_task_managers_lock = threading.Lock()
 
 
-def get_task_manager(data_path: str) -> TaskManager:
+def get_task_manager(data_path: str, storage_mode: Optional[str] = None) -> TaskManager:
     """
-    Get a TaskManager instance.
+    Get the TaskManager instance for a data path, creating it if it doesn't exist.
     
     Args:
         data_path: Path to task data
+        storage_mode: Storage mode ("json", "journal" or "sqlite"); defaults to
+            the TASK_MANAGER_STORAGE environment variable, then "json"
     
     Returns:
-        TaskManager instance
+        TaskManager instance, or SQLiteTaskManager in "sqlite" mode
     """
-    return TaskManager(data_path)
+    storage_mode = storage_mode or os.environ.get("TASK_MANAGER_STORAGE", "json")
+    key = (os.path.abspath(data_path), storage_mode)
+    with _task_managers_lock:
+        if key not in _task_managers:
+            if storage_mode == "sqlite":
+                from src.task_manager.sqlite_manager import SQLiteTaskManager
+                _task_managers[key] = SQLiteTaskManager(data_path)
+            else:
+                _task_managers[key] = TaskManager(data_path, storage_mode=storage_mode)
+        
+        return _task_managers[key]
@@ -248,24 +248,24 @@ class DashboardIntegration:
         Returns:
             Dict containing dashboard statistics
         """
-        projects = list(self.task_manager.projects.values())
-        
-        # Count projects by status
-        total_projects = len(projects)
-        active_projects = sum(1 for p in projects if any(
-            t.status == TaskStatus.IN_PROGRESS for t in p.tasks.values()
-        ))
-        completed_projects = sum(1 for p in projects if all(
-            t.status == TaskStatus.COMPLETED for t in p.tasks.values()
-        ) and len(p.tasks) > 0)
+        # Count projects by status from the per-project status counts
+        total_projects = len(self.task_manager.projects)
+        active_projects = 0
+        completed_projects = 0
+        for project_id in self.task_manager.projects:
+            counts = self.task_manager.count_tasks_by_status(project_id)
+            if counts[TaskStatus.IN_PROGRESS.value] > 0:
+                active_projects += 1
+            if counts[TaskStatus.COMPLETED.value] == sum(counts.values()) > 0:
+                completed_projects += 1
         
         # Count tasks by status
-        all_tasks = [task for p in projects for task in p.tasks.values()]
-        total_tasks = len(all_tasks)
-        completed_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.COMPLETED)
-        in_progress_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.IN_PROGRESS)
-        planned_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.PLANNED)
-        blocked_tasks = sum(1 for t in all_tasks if t.status == TaskStatus.BLOCKED)
+        counts = self.task_manager.count_tasks_by_status()
+        total_tasks = sum(counts.values())
+        completed_tasks = counts[TaskStatus.COMPLETED.value]
+        in_progress_tasks = counts[TaskStatus.IN_PROGRESS.value]
+        planned_tasks = counts[TaskStatus.PLANNED.value]
+        blocked_tasks = counts[TaskStatus.BLOCKED.value]
         
         return {
             "total_projects": total_projects,
@@ -360,16 +360,17 @@ class DashboardIntegration:
         summaries = []
         for project in projects:
             # Calculate project progress
-            total_tasks = len(project.tasks)
-            completed_tasks = sum(1 for t in project.tasks.values() if t.status == TaskStatus.COMPLETED)
+            counts = self.task_manager.count_tasks_by_status(project.id)
+            total_tasks = sum(counts.values())
+            completed_tasks = counts[TaskStatus.COMPLETED.value]
             progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
             
             # Get phase information
             phases = []
             for phase_id, phase in project.phases.items():
-                phase_tasks = [project.tasks[task_id] for task_id in phase.tasks if task_id in project.tasks]
-                phase_total = len(phase_tasks)
-                phase_completed = sum(1 for t in phase_tasks if t.status == TaskStatus.COMPLETED)
+                phase_counts = self.task_manager.count_tasks_by_status(project.id, phase_id)
+                phase_total = sum(phase_counts.values())
+                phase_completed = phase_counts[TaskStatus.COMPLETED.value]
                 phase_progress = (phase_completed / phase_total * 100) if phase_total > 0 else 0
                 
                 phases.append({
@@ -415,16 +416,17 @@ class DashboardIntegration:
             return None
         
         # Calculate project progress
-        total_tasks = len(project.tasks)
-        completed_tasks = sum(1 for t in project.tasks.values() if t.status == TaskStatus.COMPLETED)
+        counts = self.task_manager.count_tasks_by_status(project.id)
+        total_tasks = sum(counts.values())
+        completed_tasks = counts[TaskStatus.COMPLETED.value]
         progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
         # Get phase information
         phases = []
         for phase_id, phase in project.phases.items():
-            phase_tasks = [project.tasks[task_id] for task_id in phase.tasks if task_id in project.tasks]
-            phase_total = len(phase_tasks)
-            phase_completed = sum(1 for t in phase_tasks if t.status == TaskStatus.COMPLETED)
+            phase_counts = self.task_manager.count_tasks_by_status(project.id, phase_id)
+            phase_total = sum(phase_counts.values())
+            phase_completed = phase_counts[TaskStatus.COMPLETED.value]
             phase_progress = (phase_completed / phase_total * 100) if phase_total > 0 else 0
             
             phases.append({
@@ -507,22 +509,20 @@ class DashboardIntegration:
             return []
         
         tasks = []
-        for task_id in phase.tasks:
-            if task_id in project.tasks:
-                task = project.tasks[task_id]
-                task_dict = {
-                    "id": task.id,
-                    "name": task.name,
-                    "description": task.description,
-                    "status": task.status.value,
-                    "priority": task.priority.value if hasattr(task, 'priority') else None,
-                    "progress": task.progress,
-                    "assigneeId": task.assignee_id if hasattr(task, 'assignee_id') else None,
-                    "assigneeType": task.assignee_type if hasattr(task, 'assignee_type') else None,
-                    "createdAt": task.created_at.isoformat() if hasattr(task, 'created_at') else None,
-                    "updatedAt": task.updated_at.isoformat() if hasattr(task, 'updated_at') else None
-                }
-                tasks.append(task_dict)
+        for task in self.task_manager.get_tasks_by_phase(project_id, phase_id):
+            task_dict = {
+                "id": task.id,
+                "name": task.name,
+                "description": task.description,
+                "status": task.status.value,
+                "priority": task.priority.value if hasattr(task, 'priority') else None,
+                "progress": task.progress,
+                "assigneeId": task.assignee_id if hasattr(task, 'assignee_id') else None,
+                "assigneeType": task.assignee_type if hasattr(task, 'assignee_type') else None,
+                "createdAt": task.created_at.isoformat() if hasattr(task, 'created_at') else None,
+                "updatedAt": task.updated_at.isoformat() if hasattr(task, 'updated_at') else None
+            }
+            tasks.append(task_dict)
         
         return tasks
 
@@ -53,6 +53,9 @@ Examples:
 
   # Calculate project progress
   task_cli.py calculate-project-progress --project-id project_123
+
+  # Search tasks by keyword
+  task_cli.py search-tasks --query "database migr"
 """,
         )
 
@@ -275,6 +278,17 @@ Examples:
             "--assignee-type", help="Assignee type"
         )
 
+        search_tasks_parser = subparsers.add_parser(
+            "search-tasks", help="Search task names and descriptions"
+        )
+        search_tasks_parser.add_argument(
+            "--query", required=True, help="Keywords; the last one also matches as a prefix"
+        )
+        search_tasks_parser.add_argument("--project-id", help="Only search this project")
+        search_tasks_parser.add_argument(
+            "--limit", type=int, default=20, help="Maximum number of results"
+        )
+
         return parser
 
     def run(self, args: Optional[List[str]] = None) -> None:
@@ -327,6 +341,8 @@ Examples:
                 self._get_tasks_by_status(args)
             elif args.command == "get-tasks-by-assignee":
                 self._get_tasks_by_assignee(args)
+            elif args.command == "search-tasks":
+                self._search_tasks(args)
             else:
                 print(f"Unknown command: {args.command}")
                 self.parser.print_help()
@@ -560,9 +576,8 @@ Examples:
         # Filter tasks by phase ID if provided
         if args.phase_id:
             tasks = {
-                task_id: task
-                for task_id, task in tasks.items()
-                if task.phase_id == args.phase_id
+                task.id: task
+                for task in self.task_manager.get_tasks_by_phase(args.project_id, args.phase_id)
             }
             if not tasks:
                 print(f"No tasks found in phase: {args.phase_id}")
@@ -725,6 +740,23 @@ Examples:
             print(f"    Phase ID: {task.phase_id}")
             print()
 
+    def _search_tasks(self, args: argparse.Namespace) -> None:
+        """Search tasks by keyword."""
+        results = self.task_manager.search_tasks(
+            args.query, project_id=args.project_id, limit=args.limit
+        )
+
+        if not results:
+            print(f"No tasks found matching {args.query!r}")
+            return
+
+        print(f"Found {len(results)} tasks matching {args.query!r}:")
+        for task, score in results:
+            print(f"  {task.id}: {task.name} (score {score:.2f})")
+            print(f"    Description: {task.description}")
+            print(f"    Project ID: {task.project_id}")
+            print()
+
 
 def main():
     """Run the Task CLI."""
@@ -30,7 +30,7 @@ from mcp.types import (
 )
 
 # Import the Task Manager
-from src.task_manager.manager import get_task_manager, TaskStatus, TaskPriority, Task, Phase, Project
+from src.task_manager.manager import get_task_manager, ChangeLogTruncatedError, TaskPriority, Task, Phase, Project
 
 
 class TaskManagerServer:
@@ -206,13 +206,7 @@ class TaskManagerServer:
     
     def _get_tasks_by_status(self):
         """Get counts of tasks by status across all projects."""
-        counts = {status.value: 0 for status in TaskStatus}
-        
-        for project in self.task_manager.projects.values():
-            for task in project.tasks.values():
-                counts[task.status.value] += 1
-        
-        return counts
+        return self.task_manager.count_tasks_by_status()
 
     def setup_tool_handlers(self):
         """Set up tool handlers for the MCP server."""
@@ -366,7 +360,7 @@ class TaskManagerServer:
                             "status": {
                                 "type": "string",
                                 "description": "Status of the task (planned, in_progress, completed, failed, blocked)",
-                                "enum": ["planned", "in_progress", "completed", "failed", "blocked"],
+                                "enum": ["planned", "in_progress", "completed", "failed", "blocked", "cancelled"],
                             },
                             "priority": {
                                 "type": "string",
@@ -428,7 +422,7 @@ class TaskManagerServer:
                             "status": {
                                 "type": "string",
                                 "description": "New status of the task",
-                                "enum": ["planned", "in_progress", "completed", "failed", "blocked"],
+                                "enum": ["planned", "in_progress", "completed", "failed", "blocked", "cancelled"],
                             },
                             "priority": {
                                 "type": "string",
@@ -487,6 +481,63 @@ class TaskManagerServer:
                         "required": ["task_id"],
                     },
                 },
+                {
+                    "name": "create_tasks_bulk",
+                    "description": "Create many tasks at once; either all are created or none are",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "tasks": {
+                                "type": "array",
+                                "description": "Tasks to create, each with the parameters of create_task",
+                                "items": {"type": "object"},
+                            },
+                            "auth_token": {
+                                "type": "string",
+                                "description": "Authentication token (if required)",
+                            },
+                        },
+                        "required": ["tasks"],
+                    },
+                },
+                {
+                    "name": "update_tasks_bulk",
+                    "description": "Update many tasks at once; either all are updated or none are",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "updates": {
+                                "type": "array",
+                                "description": "Updates, each with a task_id and the parameters of update_task",
+                                "items": {"type": "object"},
+                            },
+                            "auth_token": {
+                                "type": "string",
+                                "description": "Authentication token (if required)",
+                            },
+                        },
+                        "required": ["updates"],
+                    },
+                },
+                {
+                    "name": "delete_tasks_bulk",
+                    "description": "Delete many tasks at once; either all are deleted or none are",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "task_ids": {
+                                "type": "array",
+                                "description": "IDs of the tasks to delete",
+                                "items": {"type": "string"},
+                            },
+                            "auth_token": {
+                                "type": "string",
+                                "description": "Authentication token (if required)",
+                            },
+                        },
+                        "required": ["task_ids"],
+                    },
+                },
                 {
                     "name": "update_task_status",
                     "description": "Update the status of a task",
@@ -500,7 +551,7 @@ class TaskManagerServer:
                             "status": {
                                 "type": "string",
                                 "description": "New status of the task",
-                                "enum": ["planned", "in_progress", "completed", "failed", "blocked"],
+                                "enum": ["planned", "in_progress", "completed", "failed", "blocked", "cancelled"],
                             },
                             "auth_token": {
                                 "type": "string",
@@ -589,7 +640,7 @@ class TaskManagerServer:
                             "status": {
                                 "type": "string",
                                 "description": "Status to filter by",
-                                "enum": ["planned", "in_progress", "completed", "failed", "blocked"],
+                                "enum": ["planned", "in_progress", "completed", "failed", "blocked", "cancelled"],
                             },
                             "auth_token": {
                                 "type": "string",
@@ -599,6 +650,54 @@ class TaskManagerServer:
                         "required": ["project_id", "status"],
                     },
                 },
+                {
+                    "name": "get_changes_since",
+                    "description": "Get the task data changes made after a version",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "since": {
+                                "type": "integer",
+                                "description": "Last version seen; use the returned version next time",
+                            },
+                            "project_id": {
+                                "type": "string",
+                                "description": "Only return changes to this project (optional)",
+                            },
+                            "auth_token": {
+                                "type": "string",
+                                "description": "Authentication token (if required)",
+                            },
+                        },
+                        "required": ["since"],
+                    },
+                },
+                {
+                    "name": "search_tasks",
+                    "description": "Search task names and descriptions by keyword, best match first",
+                    "inputSchema": {
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Keywords; every keyword must match and the last one also matches as a prefix",
+                            },
+                            "project_id": {
+                                "type": "string",
+                                "description": "Only search this project (optional)",
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of results (default 20)",
+                            },
+                            "auth_token": {
+                                "type": "string",
+                                "description": "Authentication token (if required)",
+                            },
+                        },
+                        "required": ["query"],
+                    },
+                },
                 {
                     "name": "get_tasks_by_assignee",
                     "description": "Get all tasks assigned to a specific assignee",
@@ -873,6 +972,47 @@ class TaskManagerServer:
                     ],
                 }
             
+            elif tool_name in ("create_tasks_bulk", "update_tasks_bulk", "delete_tasks_bulk"):
+                param = {
+                    "create_tasks_bulk": "tasks",
+                    "update_tasks_bulk": "updates",
+                    "delete_tasks_bulk": "task_ids",
+                }[tool_name]
+                
+                # Validate required arguments
+                if not isinstance(args.get(param), list):
+                    raise McpError(
+                        ErrorCode.InvalidParams,
+                        f"Missing required parameter: {param}",
+                    )
+                
+                # Call the task manager
+                try:
+                    if tool_name == "create_tasks_bulk":
+                        # Same defaults as create_task
+                        defaults = {"status": "planned", "priority": "medium", "progress": 0.0}
+                        tasks = self.task_manager.create_tasks_bulk([
+                            {**defaults, **task} if isinstance(task, dict) else task
+                            for task in args["tasks"]
+                        ])
+                        result = {"tasks": [task.to_dict() for task in tasks]}
+                    elif tool_name == "update_tasks_bulk":
+                        tasks = self.task_manager.update_tasks_bulk(args["updates"])
+                        result = {"tasks": [task.to_dict() for task in tasks]}
+                    else:
+                        result = {"deleted": self.task_manager.delete_tasks_bulk(args["task_ids"])}
+                except ValueError as e:
+                    raise McpError(ErrorCode.InvalidParams, str(e))
+                
+                return {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": json.dumps(result, indent=2),
+                        }
+                    ],
+                }
+            
             elif tool_name == "update_task_status":
                 # Validate required arguments
                 if "task_id" not in args:
@@ -1024,6 +1164,66 @@ class TaskManagerServer:
                     ],
                 }
             
+            elif tool_name == "get_changes_since":
+                # Validate required arguments
+                if not isinstance(args.get("since"), int):
+                    raise McpError(
+                        ErrorCode.InvalidParams,
+                        "Missing required parameter: since",
+                    )
+                
+                # Call the task manager
+                version = self.task_manager.version
+                try:
+                    changes = self.task_manager.get_changes_since(
+                        args["since"],
+                        project_id=args.get("project_id"),
+                    )
+                except ChangeLogTruncatedError as e:
+                    raise McpError(ErrorCode.InvalidParams, f"{e}; re-read the data")
+                
+                return {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": json.dumps(
+                                {
+                                    "version": version,
+                                    "changes": [c for c in changes if c["version"] <= version],
+                                },
+                                indent=2,
+                            ),
+                        }
+                    ],
+                }
+            
+            elif tool_name == "search_tasks":
+                # Validate required arguments
+                if "query" not in args:
+                    raise McpError(
+                        ErrorCode.InvalidParams,
+                        "Missing required parameter: query",
+                    )
+                
+                # Call the task manager
+                results = self.task_manager.search_tasks(
+                    args["query"],
+                    project_id=args.get("project_id"),
+                    limit=args.get("limit", 20),
+                )
+                
+                return {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": json.dumps(
+                                [dict(task.to_dict(), score=score) for task, score in results],
+                                indent=2,
+                            ),
+                        }
+                    ],
+                }
+            
             elif tool_name == "get_tasks_by_assignee":
                 # Validate required arguments
                 if "assignee_id" not in args:
@@ -1065,6 +1265,12 @@ class TaskManagerServer:
         await self.server.connect(transport)
         print("Task Management MCP server running on stdio", file=sys.stderr)
         
+        # Save task data in the background instead of on every tool call
+        self.task_manager.start_flusher(
+            interval=float(os.environ.get("TASK_MANAGER_FLUSH_INTERVAL", "1.0")),
+            max_latency=float(os.environ.get("TASK_MANAGER_FLUSH_MAX_LATENCY", "5.0"))
+        )
+        
         # Log enabled integrations
         integrations = ["Dashboard Integration"]
         if self.dagger_workflow_integration:
@@ -1079,6 +1285,9 @@ class TaskManagerServer:
         if self.dagger_workflow_integration:
             await self.dagger_workflow_integration.shutdown()
         
+        # Save any changes the flusher has not written yet
+        await self.task_manager.stop_flusher()
+        
         # Close the server
         await self.server.close()
 
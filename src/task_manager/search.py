@@ -0,0 +1,321 @@
+"""
+Task Search Module
+
+This module provides an in-memory inverted index over task names and
+descriptions. Tasks are ranked with BM25, the last query token also matches
+as a prefix, and the index is updated incrementally as tasks change.
+"""
+
+import bisect
+import heapq
+import math
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Split text into lowercase alphanumeric tokens.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        List of tokens in order
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class TaskSearchIndex:
+    """
+    Task Search Index class ranking tasks by keyword with BM25.
+
+    Besides the postings of each term, the index keeps them bucketed by
+    (term frequency, task length). Every task in a bucket has the same BM25
+    score for the term, so a query with many matches can visit the buckets
+    best first and stop once no unseen task can make the top results,
+    instead of scoring every task containing a common word.
+    """
+
+    # Multi-word queries intersect the matches of their tokens when the
+    # rarest token matches at most this many tasks, and score all matching
+    # tasks directly when there are at most DIRECT_SCORING_LIMIT
+    INTERSECT_LIMIT = 20000
+    DIRECT_SCORING_LIMIT = 2000
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        b: float = 0.75,
+        name_weight: int = 2,
+        min_prefix_length: int = 2,
+        max_prefix_terms: int = 50
+    ):
+        """
+        Initialize a TaskSearchIndex.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+            name_weight: Number of times a name token counts relative to a
+                description token
+            min_prefix_length: Shortest query token expanded as a prefix
+            max_prefix_terms: Maximum number of indexed terms a prefix
+                expands to; the terms in the most tasks are kept
+        """
+        self.k1 = k1
+        self.b = b
+        self.name_weight = name_weight
+        self.min_prefix_length = min_prefix_length
+        self.max_prefix_terms = max_prefix_terms
+
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> task_id -> weighted term frequency
+        # term -> (term frequency, task length) -> task_ids, as an insertion-ordered set
+        self._buckets: Dict[str, Dict[Tuple[int, int], Dict[str, None]]] = {}
+        self._terms: List[str] = []  # sorted vocabulary, for prefix matching
+        self._docs: Dict[str, Tuple[str, str, str]] = {}  # task_id -> (project_id, name, description)
+        self._lengths: Dict[str, int] = {}  # task_id -> weighted token count
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def _term_frequencies(self, name: Optional[str], description: Optional[str]) -> Dict[str, int]:
+        """Count the weighted term frequencies of a task's text."""
+        freqs: Dict[str, int] = {}
+        for term in tokenize(name):
+            freqs[term] = freqs.get(term, 0) + self.name_weight
+        for term in tokenize(description):
+            freqs[term] = freqs.get(term, 0) + 1
+        return freqs
+
+    def add(self, task_id: str, project_id: str, name: Optional[str], description: Optional[str]):
+        """
+        Add or replace a task in the index.
+
+        Re-adding a task whose name and description did not change only
+        updates its project, so callers can add a task after every update.
+
+        Args:
+            task_id: Task ID
+            project_id: Project ID, used to filter results
+            name: Task name
+            description: Task description
+        """
+        doc = self._docs.get(task_id)
+        if doc is not None:
+            if doc[1] == name and doc[2] == description:
+                if doc[0] != project_id:
+                    self._docs[task_id] = (project_id, name, description)
+                return
+            self.remove(task_id)
+
+        freqs = self._term_frequencies(name, description)
+        length = sum(freqs.values())
+        for term, tf in freqs.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._buckets[term] = {}
+                bisect.insort(self._terms, term)
+            postings[task_id] = tf
+            self._buckets[term].setdefault((tf, length), {})[task_id] = None
+
+        self._docs[task_id] = (project_id, name, description)
+        self._lengths[task_id] = length
+        self._total_length += length
+
+    def remove(self, task_id: str) -> bool:
+        """
+        Remove a task from the index.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            True if the task was indexed, False otherwise
+        """
+        doc = self._docs.pop(task_id, None)
+        if doc is None:
+            return False
+
+        length = self._lengths.pop(task_id)
+        self._total_length -= length
+        for term in self._term_frequencies(doc[1], doc[2]):
+            postings = self._postings.get(term)
+            tf = postings.pop(task_id, None) if postings is not None else None
+            if tf is None:
+                continue
+            buckets = self._buckets[term]
+            bucket = buckets[(tf, length)]
+            del bucket[task_id]
+            if not bucket:
+                del buckets[(tf, length)]
+            if not postings:
+                del self._postings[term]
+                del self._buckets[term]
+                i = bisect.bisect_left(self._terms, term)
+                if i < len(self._terms) and self._terms[i] == term:
+                    del self._terms[i]
+        return True
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """Get the indexed terms starting with a prefix, most common first."""
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff", start)
+        terms = self._terms[start:end]
+        if len(terms) > self.max_prefix_terms:
+            terms = heapq.nlargest(self.max_prefix_terms, terms, key=lambda term: len(self._postings[term]))
+        return terms
+
+    def search(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the tasks matching every token of a query.
+
+        The last token also matches indexed terms it is a prefix of, so
+        results can be shown while a word is being typed. A task's score is
+        the sum over the query tokens of the best BM25 score of a term the
+        token matches.
+
+        Args:
+            query: Query text
+            project_id: Only return tasks in this project
+            limit: Maximum number of results
+
+        Returns:
+            List of (task_id, score) pairs, best match first
+        """
+        tokens = tokenize(query)
+        if not tokens or not self._docs or limit <= 0:
+            return []
+
+        # Per query token, the term weights (IDF) of the indexed terms it matches
+        groups: List[Dict[str, float]] = []
+        doc_count = len(self._docs)
+        for i, token in enumerate(tokens):
+            if i == len(tokens) - 1 and len(token) >= self.min_prefix_length:
+                terms = self._expand_prefix(token)
+            else:
+                terms = [token] if token in self._postings else []
+            if not terms:
+                return []
+            groups.append({
+                term: math.log(1 + (doc_count - len(self._postings[term]) + 0.5) / (len(self._postings[term]) + 0.5))
+                for term in terms
+            })
+
+        # BM25 divides by tf + k1 * (1 - b + b * length / average length);
+        # precompute the constant part and the per-length factor once
+        norm = (self.k1 * (1 - self.b), self.k1 * self.b * doc_count / self._total_length)
+
+        candidates = None
+        if len(groups) > 1:
+            groups.sort(key=self._match_count)
+            if self._match_count(groups[0]) <= self.INTERSECT_LIMIT:
+                # Intersect the matches of every token, rarest first; dict key
+                # views intersect by probing the larger side
+                candidates = self._matches(groups[0])
+                for group in groups[1:]:
+                    matched = [candidates & self._postings[term].keys() for term in group]
+                    candidates = matched[0] if len(matched) == 1 else set().union(*matched)
+                if project_id is not None:
+                    candidates = {task_id for task_id in candidates if self._docs[task_id][0] == project_id}
+                if len(candidates) <= self.DIRECT_SCORING_LIMIT:
+                    plans = self._plans(groups)
+                    scored = ((self._score(task_id, plans, norm), task_id) for task_id in candidates)
+                    return [(task_id, score) for score, task_id in heapq.nlargest(limit, scored)]
+
+        # Threshold algorithm: read every token's tasks best first, score each
+        # new match in full, and stop when the worst kept score beats the best
+        # score an unseen task could still have
+        streams = [self._ranked_tasks(group, norm) for group in groups]
+        plans = self._plans(groups)
+        bounds = [0.0] * len(streams)
+        seen = set()
+        top: List[Tuple[float, str]] = []
+        while True:
+            for i, stream in enumerate(streams):
+                item = next(stream, None)
+                if item is None:
+                    # Every task matching all tokens is in this stream, so all were seen
+                    return [(task_id, score) for score, task_id in sorted(top, reverse=True)]
+                bounds[i], task_id = item
+                if task_id in seen:
+                    continue
+                seen.add(task_id)
+                if candidates is not None:
+                    if task_id not in candidates:
+                        continue
+                elif project_id is not None and self._docs[task_id][0] != project_id:
+                    continue
+
+                score = item[0] if len(groups) == 1 else self._score(task_id, plans, norm)
+                if score is None:
+                    continue
+                if len(top) < limit:
+                    heapq.heappush(top, (score, task_id))
+                elif score > top[0][0]:
+                    heapq.heapreplace(top, (score, task_id))
+
+            if len(top) == limit and top[0][0] >= sum(bounds):
+                return [(task_id, score) for score, task_id in sorted(top, reverse=True)]
+
+    def _ranked_tasks(self, group: Dict[str, float], norm: Tuple[float, float]) -> Iterator[Tuple[float, str]]:
+        """Yield (score, task_id) for the tasks matching any of a token's terms, best first."""
+        base, scale = norm
+        buckets = sorted(
+            (
+                (idf * (self.k1 + 1) * tf / (tf + base + scale * length), task_ids)
+                for term, idf in group.items()
+                for (tf, length), task_ids in self._buckets[term].items()
+            ),
+            key=lambda bucket: bucket[0],
+            reverse=True,
+        )
+        for score, task_ids in buckets:
+            for task_id in task_ids:
+                yield score, task_id
+
+    def _match_count(self, group: Dict[str, float]) -> int:
+        """Get an upper bound of the number of tasks matching any of a token's terms."""
+        return sum(len(self._postings[term]) for term in group)
+
+    def _matches(self, group: Dict[str, float]):
+        """Get the IDs of the tasks matching any of a token's terms, as a set-like view."""
+        if len(group) == 1:
+            return self._postings[next(iter(group))].keys()
+        return set().union(*(self._postings[term] for term in group))
+
+    def _plans(self, groups: List[Dict[str, float]]) -> List[List[Tuple[Dict[str, int], float]]]:
+        """Resolve every token's terms to (postings, IDF * (k1 + 1)) pairs for scoring."""
+        return [[(self._postings[term], idf * (self.k1 + 1)) for term, idf in group.items()] for group in groups]
+
+    def _score(
+        self,
+        task_id: str,
+        plans: List[List[Tuple[Dict[str, int], float]]],
+        norm: Tuple[float, float]
+    ) -> Optional[float]:
+        """Score a task against every query token; None if a token does not match."""
+        length_norm = norm[0] + norm[1] * self._lengths[task_id]
+        total = 0.0
+        for plan in plans:
+            best = -1.0
+            for postings, weight in plan:
+                tf = postings.get(task_id)
+                if tf is not None:
+                    score = weight * tf / (tf + length_norm)
+                    if score > best:
+                        best = score
+            if best < 0:
+                return None
+            total += best
+        return total
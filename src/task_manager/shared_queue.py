@@ -0,0 +1,338 @@
+"""
+Shared Execution Queue Module
+
+This module provides a work queue several task execution engines, in
+different processes or on different hosts, can share. An engine claims a due
+execution with a lease and renews the lease while it runs the execution; the
+executions of an engine that stops renewing are claimed again by another
+engine once their lease expires.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS executions (
+    execution_id TEXT PRIMARY KEY,
+    priority INTEGER NOT NULL,
+    due_at REAL,
+    state TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    lease_expires REAL,
+    claims INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dependencies (
+    execution_id TEXT NOT NULL,
+    dependency_id TEXT NOT NULL,
+    PRIMARY KEY (execution_id, dependency_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_executions_queued ON executions(state, priority, due_at);
+CREATE INDEX IF NOT EXISTS idx_executions_lease ON executions(state, lease_expires);
+"""
+
+# States of a queue entry: waiting to be claimed, claimed by an engine, or finished
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+
+
+class SharedExecutionQueue:
+    """
+    Base class of the work queues shared by several task execution engines.
+
+    Each engine identifies itself with a node ID. Times are seconds since the
+    epoch, so engines on different hosts need synchronized clocks.
+    """
+
+    def publish(self, node_id: str, entries: List[Tuple[Dict[str, Any], Optional[float]]]) -> None:
+        """
+        Add or update executions.
+
+        An entry with a due time queues the execution; one without marks it
+        done. Finished executions, and executions leased by another node, are
+        not changed.
+
+        Args:
+            node_id: Node publishing the executions
+            entries: (execution data, due time or None) pairs
+        """
+        raise NotImplementedError
+
+    def claim(
+        self,
+        node_id: str,
+        limit: int,
+        lease_ttl: float,
+        now: Optional[float] = None
+    ) -> List[Tuple[Dict[str, Any], float, int]]:
+        """
+        Lease the due executions whose dependencies have completed.
+
+        Queued executions and executions whose lease expired are claimed,
+        highest priority first, then earliest due.
+
+        Args:
+            node_id: Node claiming the executions
+            limit: Maximum number of executions to claim
+            lease_ttl: Seconds until the leases expire unless renewed
+            now: Current time; defaults to the clock
+
+        Returns:
+            List of (execution data, due time, number of claims) tuples
+        """
+        raise NotImplementedError
+
+    def renew(
+        self,
+        node_id: str,
+        execution_ids: List[str],
+        lease_ttl: float,
+        now: Optional[float] = None
+    ) -> List[str]:
+        """
+        Extend the leases a node holds.
+
+        Args:
+            node_id: Node holding the leases
+            execution_ids: IDs of the executions the node runs
+            lease_ttl: Seconds from now until the leases expire
+            now: Current time; defaults to the clock
+
+        Returns:
+            IDs of the executions whose lease the node no longer holds
+        """
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count the executions in each state.
+
+        Returns:
+            Dictionary mapping "queued", "leased" and "done" to counts
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the resources of the queue."""
+
+
+class SQLiteExecutionQueue(SharedExecutionQueue):
+    """
+    Shared execution queue stored in a SQLite database.
+
+    SQLite's file locks serialize the claims of the engines using the same
+    database file, so it stands in for a networked queue when several engine
+    processes run on one host, for example to test them locally.
+    """
+
+    def __init__(self, db_path: str, busy_timeout: float = 5.0):
+        """
+        Initialize a SQLiteExecutionQueue.
+
+        Args:
+            db_path: Path to the database file, shared by the engines
+            busy_timeout: Seconds to wait for another engine's write to finish
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Autocommit, with explicit transactions, so a claim can take the
+        # write lock before it reads
+        self._conn = sqlite3.connect(
+            db_path, timeout=busy_timeout, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def publish(self, node_id: str, entries: List[Tuple[Dict[str, Any], Optional[float]]]) -> None:
+        """
+        Add or update executions.
+
+        An entry with a due time queues the execution; one without marks it
+        done. Finished executions, and executions leased by another node, are
+        not changed.
+
+        Args:
+            node_id: Node publishing the executions
+            entries: (execution data, due time or None) pairs
+        """
+        rows = [
+            (
+                data["execution_id"],
+                int(data["priority"]),
+                due_at,
+                QUEUED if due_at is not None else DONE,
+                str(getattr(data["status"], "value", data["status"])),
+                json.dumps(data, default=str),
+                node_id,
+            )
+            for data, due_at in entries
+        ]
+        dependencies = [
+            (data["execution_id"], dependency_id)
+            for data, _ in entries
+            for dependency_id in data.get("dependencies") or []
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO executions (execution_id, priority, due_at, state, status, data)
+                    VALUES (?1, ?2, ?3, ?4, ?5, ?6)
+                    ON CONFLICT(execution_id) DO UPDATE SET
+                        priority = excluded.priority,
+                        due_at = excluded.due_at,
+                        state = excluded.state,
+                        status = excluded.status,
+                        data = excluded.data,
+                        owner = NULL,
+                        lease_expires = NULL
+                    WHERE executions.state != 'done'
+                        AND (executions.owner IS NULL OR executions.owner = ?7)
+                    """,
+                    rows,
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO dependencies (execution_id, dependency_id) VALUES (?, ?)",
+                    dependencies,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def claim(
+        self,
+        node_id: str,
+        limit: int,
+        lease_ttl: float,
+        now: Optional[float] = None
+    ) -> List[Tuple[Dict[str, Any], float, int]]:
+        """
+        Lease the due executions whose dependencies have completed.
+
+        Queued executions and executions whose lease expired are claimed,
+        highest priority first, then earliest due.
+
+        Args:
+            node_id: Node claiming the executions
+            limit: Maximum number of executions to claim
+            lease_ttl: Seconds until the leases expire unless renewed
+            now: Current time; defaults to the clock
+
+        Returns:
+            List of (execution data, due time, number of claims) tuples
+        """
+        if limit <= 0:
+            return []
+        now = time.time() if now is None else now
+
+        with self._lock:
+            # Take the write lock first, so two nodes cannot read the same
+            # entries as claimable
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    """
+                    SELECT execution_id, due_at, claims, data FROM executions AS e
+                    WHERE ((state = 'queued' AND due_at <= ?1) OR (state = 'leased' AND lease_expires < ?1))
+                        AND NOT EXISTS (
+                            SELECT 1 FROM dependencies AS d
+                            LEFT JOIN executions AS p ON p.execution_id = d.dependency_id
+                            WHERE d.execution_id = e.execution_id
+                                AND (p.status IS NULL OR p.status != 'completed')
+                        )
+                    ORDER BY priority DESC, due_at
+                    LIMIT ?2
+                    """,
+                    (now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    """
+                    UPDATE executions SET state = 'leased', owner = ?, lease_expires = ?, claims = claims + 1
+                    WHERE execution_id = ?
+                    """,
+                    [(node_id, now + lease_ttl, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [(json.loads(data), due_at, claims + 1) for _, due_at, claims, data in rows]
+
+    def renew(
+        self,
+        node_id: str,
+        execution_ids: List[str],
+        lease_ttl: float,
+        now: Optional[float] = None
+    ) -> List[str]:
+        """
+        Extend the leases a node holds.
+
+        Args:
+            node_id: Node holding the leases
+            execution_ids: IDs of the executions the node runs
+            lease_ttl: Seconds from now until the leases expire
+            now: Current time; defaults to the clock
+
+        Returns:
+            IDs of the executions whose lease the node no longer holds
+        """
+        if not execution_ids:
+            return []
+        now = time.time() if now is None else now
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                held = set()
+                for execution_id in execution_ids:
+                    cursor = self._conn.execute(
+                        """
+                        UPDATE executions SET lease_expires = ?
+                        WHERE execution_id = ? AND owner = ? AND state = 'leased'
+                        """,
+                        (now + lease_ttl, execution_id, node_id),
+                    )
+                    if cursor.rowcount:
+                        held.add(execution_id)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return [execution_id for execution_id in execution_ids if execution_id not in held]
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count the executions in each state.
+
+        Returns:
+            Dictionary mapping "queued", "leased" and "done" to counts
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM executions GROUP BY state").fetchall()
+        counts = {QUEUED: 0, LEASED: 0, DONE: 0}
+        counts.update(dict(rows))
+        return counts
@@ -0,0 +1,1236 @@
+"""
+SQLite Task Manager Module
+
+This module provides a task manager backed by SQLite. It has the same public
+API as the TaskManager in manager.py, but keeps task data on disk and pushes
+filtering and pagination into indexed SQL queries instead of holding the whole
+store in memory.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterator, AsyncIterator, Tuple
+
+from src.task_manager.changes import TaskChangeLog
+from src.task_manager.search import tokenize
+from src.task_manager.manager import (
+    Phase,
+    Project,
+    Task,
+    TaskManager,
+    TaskStatus,
+    _enum_value,
+    _isoformat,
+    _validate_task_ids,
+    _validate_task_specs,
+)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    metadata TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS phases (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT,
+    "order" INTEGER,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    project_id TEXT NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    phase_id TEXT,
+    parent_id TEXT,
+    priority TEXT,
+    progress REAL,
+    assignee_id TEXT,
+    assignee_type TEXT,
+    metadata TEXT,
+    result TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_phases_project ON phases(project_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_status ON tasks(project_id, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks(assignee_id, assignee_type);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks(updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_project_updated_at ON tasks(project_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_updated_at ON tasks(assignee_id, updated_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_phase ON tasks(phase_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks(parent_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+    name, description, content='tasks', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+    INSERT INTO tasks_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, name, description)
+    VALUES ('delete', old.rowid, old.name, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, description ON tasks BEGIN
+    INSERT INTO tasks_fts(tasks_fts, rowid, name, description)
+    VALUES ('delete', old.rowid, old.name, old.description);
+    INSERT INTO tasks_fts(rowid, name, description) VALUES (new.rowid, new.name, new.description);
+END;
+"""
+
+TASK_COLUMNS = (
+    "id", "project_id", "name", "description", "status", "phase_id", "parent_id",
+    "priority", "progress", "assignee_id", "assignee_type", "metadata", "result",
+    "error", "created_at", "updated_at",
+)
+
+# Task fields stored as JSON text
+JSON_TASK_FIELDS = ("metadata", "result", "error")
+
+
+class _ProjectMapping(Mapping):
+    """Read-only mapping of project IDs to fully loaded projects."""
+
+    def __init__(self, task_manager: "SQLiteTaskManager"):
+        self._task_manager = task_manager
+
+    def __getitem__(self, project_id: str) -> Project:
+        project = self._task_manager.get_project(project_id)
+        if project is None:
+            raise KeyError(project_id)
+        return project
+
+    def __iter__(self) -> Iterator[str]:
+        rows = self._task_manager._execute("SELECT id FROM projects ORDER BY rowid")
+        return iter([row["id"] for row in rows])
+
+    def __len__(self) -> int:
+        return self._task_manager._execute_one("SELECT COUNT(*) FROM projects")[0]
+
+    def __contains__(self, project_id: object) -> bool:
+        row = self._task_manager._execute_one(
+            "SELECT 1 FROM projects WHERE id = ?", (project_id,)
+        )
+        return row is not None
+
+
+class SQLiteTaskManager:
+    """
+    Task Manager backed by SQLite.
+
+    Projects, phases and tasks are returned as the same model classes used by
+    TaskManager, but they are copies of the stored rows: changes must go through
+    the update methods to be persisted.
+    """
+
+    def __init__(self, data_path: str, db_name: str = "tasks.db", max_changes: int = 10000):
+        """
+        Initialize a SQLiteTaskManager.
+
+        If the database is empty and a tasks.json file exists in data_path, it
+        is imported.
+
+        Args:
+            data_path: Directory containing the database
+            db_name: File name of the database
+            max_changes: Number of recent changes kept for get_changes_since
+        """
+        self.data_path = data_path
+        self.db_path = os.path.join(data_path, db_name)
+        os.makedirs(data_path, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._changes = TaskChangeLog(max_changes)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        # INSERT OR REPLACE only fires the delete trigger of the search index
+        # with recursive triggers on
+        self._conn.execute("PRAGMA recursive_triggers=ON")
+        has_search_index = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'"
+        ).fetchone() is not None
+        self._conn.executescript(SCHEMA)
+        if not has_search_index:
+            # Databases created before the search index existed
+            with self._conn:
+                self._conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+        self.projects = _ProjectMapping(self)
+        self.load_data()
+
+    def _execute(self, sql: str, params: Any = ()) -> List[sqlite3.Row]:
+        """
+        Run a query under the connection lock.
+
+        The rows are fetched before the lock is released, as the connection
+        is shared by every thread.
+        """
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _execute_one(self, sql: str, params: Any = ()) -> Optional[sqlite3.Row]:
+        """Run a query under the connection lock and return its first row, if any."""
+        rows = self._execute(sql, params)
+        return rows[0] if rows else None
+
+    def _write(self, sql: str, params: Any = ()) -> int:
+        """Run a statement in its own transaction and return the number of rows it changed."""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def _record(self, op: str, kind: str, data: Dict[str, Any]):
+        """Record a mutation in the change log."""
+        self._changes.record(op, kind, data)
+
+    @property
+    def version(self) -> int:
+        """Version of the most recent mutation; 0 if nothing changed since opening."""
+        return self._changes.version
+
+    def get_changes_since(self, version: int, project_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get the mutations made after a version.
+
+        Args:
+            version: Last version the caller has seen
+            project_id: Only return changes to this project
+
+        Returns:
+            Changes in version order
+
+        Raises:
+            ChangeLogTruncatedError: If the changes are no longer in the
+                bounded change log; the caller should re-read the data
+        """
+        return self._changes.changes_since(version, project_id)
+
+    def subscribe(
+        self,
+        since: Optional[int] = None,
+        project_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Subscribe to mutations as they are made.
+
+        Args:
+            since: Also yield the logged changes after this version first;
+                None to start with the next change
+            project_id: Only yield changes to this project
+
+        Returns:
+            Async iterator of changes in version order
+        """
+        return self._changes.subscribe(since, project_id)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def load_data(self):
+        """Import tasks.json from the data path if the database is empty."""
+        json_path = os.path.join(self.data_path, "tasks.json")
+        if len(self.projects) == 0 and os.path.exists(json_path):
+            try:
+                self.import_json(json_path)
+            except Exception as e:
+                print(f"Error importing task data: {e}")
+
+    def save_data(self):
+        """Save task data. Every mutation is already committed, so this is a no-op."""
+
+    async def flush(self) -> int:
+        """Save unsaved changes. Every mutation is already committed, so this is a no-op."""
+        return 0
+
+    def start_flusher(self, interval: float = 1.0, max_latency: float = 5.0) -> None:
+        """Start the background flusher. Nothing is ever unsaved, so this is a no-op."""
+
+    async def stop_flusher(self) -> int:
+        """Stop the background flusher. Nothing is ever unsaved, so this is a no-op."""
+        return 0
+
+    def get_flush_metrics(self) -> Dict[str, Any]:
+        """
+        Get the save metrics.
+
+        Returns:
+            Dictionary with the same keys as TaskManager.get_flush_metrics;
+            all zero because every mutation is committed immediately
+        """
+        return {
+            "flushes": 0,
+            "mutations_flushed": 0,
+            "records_written": 0,
+            "projects_flushed": 0,
+            "errors": 0,
+            "last_flush_seconds": 0.0,
+            "total_flush_seconds": 0.0,
+            "max_flush_seconds": 0.0,
+            "dirty_projects": 0,
+            "dirty_mutations": 0,
+            "flusher_running": False,
+        }
+
+    def rebuild_indexes(self):
+        """Rebuild the database indexes."""
+        with self._lock:
+            self._conn.execute("REINDEX")
+
+    def import_json(self, json_path: str) -> Dict[str, int]:
+        """
+        Import projects, phases and tasks from a tasks.json file.
+
+        Existing rows with the same IDs are replaced.
+
+        Args:
+            json_path: Path to the tasks.json file
+
+        Returns:
+            Dictionary with the number of imported projects, phases and tasks
+        """
+        with open(json_path, 'r') as f:
+            data = json.load(f)
+
+        projects = [Project.from_dict(item) for item in data.get("projects", [])]
+        project_ids = {project.id for project in projects}
+        phases = [
+            Phase.from_dict(item) for item in data.get("phases", [])
+            if item.get("project_id") in project_ids
+        ]
+        tasks = [
+            Task.from_dict(item) for item in data.get("tasks", [])
+            if item.get("project_id") in project_ids
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?)",
+                [self._project_row(project) for project in projects],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO phases VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._phase_row(phase) for phase in phases],
+            )
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO tasks VALUES ({', '.join('?' * len(TASK_COLUMNS))})",
+                [self._task_row(task) for task in tasks],
+            )
+
+        return {"projects": len(projects), "phases": len(phases), "tasks": len(tasks)}
+
+    # Row conversion
+
+    @staticmethod
+    def _project_row(project: Project) -> tuple:
+        data = project.to_dict()
+        data["metadata"] = json.dumps(data["metadata"])
+        return tuple(data.values())
+
+    @staticmethod
+    def _phase_row(phase: Phase) -> tuple:
+        return tuple(phase.to_dict().values())
+
+    @staticmethod
+    def _task_row(task: Task) -> tuple:
+        data = task.to_dict()
+        data["status"] = _enum_value(data["status"])
+        data["priority"] = _enum_value(data["priority"])
+        for field in JSON_TASK_FIELDS:
+            data[field] = json.dumps(data[field])
+        return tuple(data[column] for column in TASK_COLUMNS)
+
+    @staticmethod
+    def _row_to_project(row: sqlite3.Row) -> Project:
+        data = dict(row)
+        data["metadata"] = json.loads(data["metadata"]) if data["metadata"] else {}
+        return Project.from_dict(data)
+
+    @staticmethod
+    def _row_to_task(row: sqlite3.Row) -> Task:
+        data = dict(row)
+        for field in JSON_TASK_FIELDS:
+            data[field] = json.loads(data[field]) if data[field] is not None else None
+        return Task.from_dict(data)
+
+    def _select_tasks(self, where: str, params: tuple, suffix: str = "") -> List[Task]:
+        rows = self._execute(f"SELECT * FROM tasks WHERE {where} {suffix}", params)
+        return [self._row_to_task(row) for row in rows]
+
+    # Projects
+
+    def create_project(
+        self,
+        name: str,
+        description: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Project:
+        """
+        Create a new project.
+
+        Args:
+            name: Project name
+            description: Project description
+            metadata: Project metadata
+
+        Returns:
+            Created Project
+        """
+        project = Project(
+            id=f"project-{str(uuid.uuid4())}",
+            name=name,
+            description=description,
+            metadata=metadata
+        )
+        self._write(
+            "INSERT INTO projects VALUES (?, ?, ?, ?, ?, ?)", self._project_row(project)
+        )
+        self._record("put", "project", project.to_dict())
+        return project
+
+    def get_project(self, project_id: str) -> Optional[Project]:
+        """
+        Get a project by ID, with its phases and tasks loaded.
+
+        Args:
+            project_id: Project ID
+
+        Returns:
+            Project or None if not found
+        """
+        row = self._execute_one("SELECT * FROM projects WHERE id = ?", (project_id,))
+        if row is None:
+            return None
+
+        project = self._row_to_project(row)
+        phase_rows = self._execute(
+            "SELECT * FROM phases WHERE project_id = ? ORDER BY rowid", (project_id,)
+        )
+        for phase_row in phase_rows:
+            phase = Phase.from_dict(dict(phase_row))
+            project.phases[phase.id] = phase
+        for task in self._select_tasks("project_id = ?", (project_id,), "ORDER BY rowid"):
+            project.tasks[task.id] = task
+        return project
+
+    def update_project(
+        self,
+        project_id: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[Project]:
+        """
+        Update a project.
+
+        Args:
+            project_id: Project ID
+            name: Project name
+            description: Project description
+            metadata: Project metadata
+
+        Returns:
+            Updated Project or None if not found
+        """
+        changes = {"name": name, "description": description}
+        if metadata is not None:
+            changes["metadata"] = json.dumps(metadata)
+        if not self._update_row("projects", project_id, changes):
+            return None
+        project = self.get_project(project_id)
+        self._record("put", "project", project.to_dict())
+        return project
+
+    def delete_project(self, project_id: str) -> bool:
+        """
+        Delete a project with its phases and tasks.
+
+        Args:
+            project_id: Project ID
+
+        Returns:
+            True if project was deleted, False otherwise
+        """
+        if self._write("DELETE FROM projects WHERE id = ?", (project_id,)) == 0:
+            return False
+        self._record("delete", "project", {"id": project_id})
+        return True
+
+    def _update_row(self, table: str, row_id: str, changes: Dict[str, Any]) -> bool:
+        """Set the non-None columns in changes and bump updated_at."""
+        return self._write(*self._update_statement(table, row_id, changes)) > 0
+
+    @staticmethod
+    def _update_statement(table: str, row_id: str, changes: Dict[str, Any]) -> tuple:
+        """Build an UPDATE setting the non-None columns in changes and updated_at."""
+        changes = {column: value for column, value in changes.items() if value is not None}
+        changes["updated_at"] = datetime.now().isoformat()
+        assignments = ", ".join(f'"{column}" = ?' for column in changes)
+        return f"UPDATE {table} SET {assignments} WHERE id = ?", (*changes.values(), row_id)
+
+    # Phases
+
+    def create_phase(
+        self,
+        project_id: str,
+        name: str,
+        description: str,
+        order: int
+    ) -> Optional[Phase]:
+        """
+        Create a new phase.
+
+        Args:
+            project_id: Project ID
+            name: Phase name
+            description: Phase description
+            order: Phase order
+
+        Returns:
+            Created Phase or None if project not found
+        """
+        if project_id not in self.projects:
+            return None
+
+        phase = Phase(
+            id=f"phase-{str(uuid.uuid4())}",
+            project_id=project_id,
+            name=name,
+            description=description,
+            order=order
+        )
+        self._write("INSERT INTO phases VALUES (?, ?, ?, ?, ?, ?, ?)", self._phase_row(phase))
+        self._record("put", "phase", phase.to_dict())
+        return phase
+
+    def get_phase(self, phase_id: str) -> Optional[Phase]:
+        """
+        Get a phase by ID.
+
+        Args:
+            phase_id: Phase ID
+
+        Returns:
+            Phase or None if not found
+        """
+        row = self._execute_one("SELECT * FROM phases WHERE id = ?", (phase_id,))
+        return Phase.from_dict(dict(row)) if row else None
+
+    def update_phase(
+        self,
+        phase_id: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        order: Optional[int] = None
+    ) -> Optional[Phase]:
+        """
+        Update a phase.
+
+        Args:
+            phase_id: Phase ID
+            name: Phase name
+            description: Phase description
+            order: Phase order
+
+        Returns:
+            Updated Phase or None if not found
+        """
+        changes = {"name": name, "description": description, "order": order}
+        if not self._update_row("phases", phase_id, changes):
+            return None
+        phase = self.get_phase(phase_id)
+        self._record("put", "phase", phase.to_dict())
+        return phase
+
+    def delete_phase(self, phase_id: str) -> bool:
+        """
+        Delete a phase.
+
+        Args:
+            phase_id: Phase ID
+
+        Returns:
+            True if phase was deleted, False otherwise
+        """
+        return self._delete_row("phases", "phase", phase_id)
+
+    # Tasks
+
+    def create_task(
+        self,
+        name: str,
+        description: str,
+        project_id: str,
+        status: str,
+        phase_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        progress: Optional[float] = None,
+        assignee_id: Optional[str] = None,
+        assignee_type: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
+        """
+        Create a new task.
+
+        Args:
+            name: Task name
+            description: Task description
+            project_id: Project ID
+            status: Task status
+            phase_id: Phase ID
+            parent_id: Parent task ID
+            priority: Task priority
+            progress: Task progress
+            assignee_id: Assignee ID
+            assignee_type: Assignee type
+            metadata: Task metadata
+            result: Task result
+            error: Task error
+
+        Returns:
+            Created Task or None if project not found
+        """
+        if project_id not in self.projects:
+            return None
+
+        task = Task(
+            id=f"task-{str(uuid.uuid4())}",
+            project_id=project_id,
+            name=name,
+            description=description,
+            status=status,
+            phase_id=phase_id,
+            parent_id=parent_id,
+            priority=priority,
+            progress=progress,
+            assignee_id=assignee_id,
+            assignee_type=assignee_type,
+            metadata=metadata,
+            result=result,
+            error=error
+        )
+        self._write(
+            f"INSERT INTO tasks VALUES ({', '.join('?' * len(TASK_COLUMNS))})",
+            self._task_row(task),
+        )
+        self._record("put", "task", task.to_dict())
+        return task
+
+    def get_task(self, task_id: str) -> Optional[Task]:
+        """
+        Get a task by ID.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            Task or None if not found
+        """
+        tasks = self._select_tasks("id = ?", (task_id,))
+        return tasks[0] if tasks else None
+
+    def update_task(
+        self,
+        task_id: str,
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        status: Optional[str] = None,
+        phase_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        priority: Optional[str] = None,
+        progress: Optional[float] = None,
+        assignee_id: Optional[str] = None,
+        assignee_type: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[Dict[str, Any]] = None
+    ) -> Optional[Task]:
+        """
+        Update a task.
+
+        Args:
+            task_id: Task ID
+            name: Task name
+            description: Task description
+            status: Task status
+            phase_id: Phase ID
+            parent_id: Parent task ID
+            priority: Task priority
+            progress: Task progress
+            assignee_id: Assignee ID
+            assignee_type: Assignee type
+            metadata: Task metadata
+            result: Task result
+            error: Task error
+
+        Returns:
+            Updated Task or None if not found
+        """
+        changes = self._task_changes(
+            name=name,
+            description=description,
+            status=status,
+            phase_id=phase_id,
+            parent_id=parent_id,
+            priority=priority,
+            progress=progress,
+            assignee_id=assignee_id,
+            assignee_type=assignee_type,
+            metadata=metadata,
+            result=result,
+            error=error,
+        )
+        if not self._update_row("tasks", task_id, changes):
+            return None
+        task = self.get_task(task_id)
+        self._record("put", "task", task.to_dict())
+        return task
+
+    def update_task_status(self, task_id: str, status: str) -> Optional[Task]:
+        """
+        Update a task's status.
+
+        Args:
+            task_id: Task ID
+            status: Task status
+
+        Returns:
+            Updated Task or None if not found
+        """
+        return self.update_task(task_id, status=status)
+
+    def update_task_progress(self, task_id: str, progress: float) -> Optional[Task]:
+        """
+        Update a task's progress.
+
+        Args:
+            task_id: Task ID
+            progress: Task progress
+
+        Returns:
+            Updated Task or None if not found
+        """
+        return self.update_task(task_id, progress=progress)
+
+    @staticmethod
+    def _task_changes(**fields: Any) -> Dict[str, Any]:
+        """Convert update_task keyword arguments to column values."""
+        changes = dict(fields)
+        for field in ("status", "priority"):
+            changes[field] = _enum_value(changes.get(field))
+        for field in JSON_TASK_FIELDS:
+            if changes.get(field) is not None:
+                changes[field] = json.dumps(changes[field])
+        return changes
+
+    def delete_task(self, task_id: str) -> bool:
+        """
+        Delete a task.
+
+        Args:
+            task_id: Task ID
+
+        Returns:
+            True if task was deleted, False otherwise
+        """
+        return self._delete_row("tasks", "task", task_id)
+
+    def _delete_row(self, table: str, kind: str, row_id: str) -> bool:
+        """Delete a phase or task row and record the deletion."""
+        with self._lock:
+            row = self._execute_one(f"SELECT project_id FROM {table} WHERE id = ?", (row_id,))
+            if row is None:
+                return False
+            self._write(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            self._record("delete", kind, {"id": row_id, "project_id": row["project_id"]})
+            return True
+
+    # Bulk operations
+
+    def create_tasks_bulk(self, tasks: List[Dict[str, Any]]) -> List[Task]:
+        """
+        Create many tasks in one transaction.
+
+        Args:
+            tasks: Task specifications with the keyword arguments of create_task
+
+        Returns:
+            Created tasks, in the same order as the specifications
+
+        Raises:
+            ValueError: If any specification is invalid
+        """
+        with self._lock:
+            errors = _validate_task_specs(
+                self, tasks, TaskManager.TASK_FIELDS, TaskManager.REQUIRED_TASK_FIELDS
+            )
+            if errors:
+                raise ValueError("; ".join(errors))
+
+            created = [Task(id=f"task-{str(uuid.uuid4())}", **spec) for spec in tasks]
+            with self._conn:
+                self._conn.executemany(
+                    f"INSERT INTO tasks VALUES ({', '.join('?' * len(TASK_COLUMNS))})",
+                    [self._task_row(task) for task in created],
+                )
+            for task in created:
+                self._record("put", "task", task.to_dict())
+            return created
+
+    def update_tasks_bulk(self, updates: List[Dict[str, Any]]) -> List[Task]:
+        """
+        Update many tasks in one transaction.
+
+        Args:
+            updates: Updates with a task_id and the keyword arguments of update_task
+
+        Returns:
+            Updated tasks, in the same order as the updates
+
+        Raises:
+            ValueError: If any update is invalid or refers to a missing task
+        """
+        allowed = ("task_id",) + tuple(field for field in TaskManager.TASK_FIELDS if field != "project_id")
+        with self._lock:
+            errors = _validate_task_specs(self, updates, allowed, ("task_id",))
+            if errors:
+                raise ValueError("; ".join(errors))
+
+            with self._conn:
+                for update in updates:
+                    fields = dict(update)
+                    task_id = fields.pop("task_id")
+                    self._conn.execute(*self._update_statement("tasks", task_id, self._task_changes(**fields)))
+            updated = [self.get_task(update["task_id"]) for update in updates]
+            for task in updated:
+                self._record("put", "task", task.to_dict())
+            return updated
+
+    def delete_tasks_bulk(self, task_ids: List[str]) -> int:
+        """
+        Delete many tasks in one transaction.
+
+        Args:
+            task_ids: IDs of the tasks to delete
+
+        Returns:
+            Number of deleted tasks
+
+        Raises:
+            ValueError: If any ID is duplicated or refers to a missing task
+        """
+        with self._lock:
+            errors = _validate_task_ids(self, task_ids)
+            if errors:
+                raise ValueError("; ".join(errors))
+
+            project_ids = [self.get_task(task_id).project_id for task_id in task_ids]
+            with self._conn:
+                self._conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+            for task_id, project_id in zip(task_ids, project_ids):
+                self._record("delete", "task", {"id": task_id, "project_id": project_id})
+            return len(task_ids)
+
+    # Queries
+
+    def query_tasks(
+        self,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        phase_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        assignee_type: Optional[str] = None,
+        updated_since: Optional[datetime] = None,
+        limit: Optional[int] = 100,
+        offset: int = 0
+    ) -> List[Task]:
+        """
+        Query tasks with filtering and pagination done in SQL.
+
+        Results are ordered by most recently updated first.
+
+        Args:
+            project_id: Filter by project ID
+            status: Filter by status
+            phase_id: Filter by phase ID
+            parent_id: Filter by parent task ID
+            assignee_id: Filter by assignee ID
+            assignee_type: Filter by assignee type
+            updated_since: Only return tasks updated at or after this time
+            limit: Maximum number of tasks to return, or None for no limit
+            offset: Number of tasks to skip
+
+        Returns:
+            List of matching tasks
+        """
+        where, params = self._task_filters(
+            project_id=project_id,
+            status=_enum_value(status),
+            phase_id=phase_id,
+            parent_id=parent_id,
+            assignee_id=assignee_id,
+            assignee_type=assignee_type,
+            updated_since=updated_since,
+        )
+        suffix = "ORDER BY updated_at DESC, id DESC"
+        if limit is not None:
+            suffix += " LIMIT ? OFFSET ?"
+            params += (limit, offset)
+        return self._select_tasks(where, params, suffix)
+
+    def count_tasks(
+        self,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        assignee_type: Optional[str] = None
+    ) -> int:
+        """
+        Count tasks matching the given filters.
+
+        Args:
+            project_id: Filter by project ID
+            status: Filter by status
+            assignee_id: Filter by assignee ID
+            assignee_type: Filter by assignee type
+
+        Returns:
+            Number of matching tasks
+        """
+        where, params = self._task_filters(
+            project_id=project_id,
+            status=_enum_value(status),
+            assignee_id=assignee_id,
+            assignee_type=assignee_type,
+        )
+        return self._execute_one(f"SELECT COUNT(*) FROM tasks WHERE {where}", params)[0]
+
+    @staticmethod
+    def _task_filters(updated_since: Optional[datetime] = None, **filters: Any) -> tuple:
+        """Build a WHERE clause and parameters from column filters."""
+        clauses = []
+        params = ()
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params += (value,)
+        if updated_since is not None:
+            clauses.append("updated_at >= ?")
+            params += (_isoformat(updated_since),)
+        return " AND ".join(clauses) or "1 = 1", params
+
+    def get_tasks_by_status(self, project_id: str, status: str) -> List[Task]:
+        """
+        Get the tasks in a project with a given status.
+
+        Args:
+            project_id: Project ID
+            status: Task status
+
+        Returns:
+            List of matching tasks
+        """
+        return self._select_tasks(
+            "project_id = ? AND status = ?", (project_id, _enum_value(status)), "ORDER BY rowid"
+        )
+
+    def get_tasks_by_phase(self, project_id: str, phase_id: str) -> List[Task]:
+        """
+        Get the tasks in a phase of a project.
+
+        Args:
+            project_id: Project ID
+            phase_id: Phase ID
+
+        Returns:
+            List of matching tasks
+        """
+        return self._select_tasks(
+            "phase_id = ? AND project_id = ?", (phase_id, project_id), "ORDER BY rowid"
+        )
+
+    def get_tasks_by_assignee(
+        self,
+        assignee_id: str,
+        assignee_type: Optional[str] = None
+    ) -> List[Task]:
+        """
+        Get the tasks assigned to an assignee across all projects.
+
+        Args:
+            assignee_id: Assignee ID
+            assignee_type: Assignee type, or None to match any type
+
+        Returns:
+            List of matching tasks
+        """
+        if assignee_type is None:
+            return self._select_tasks("assignee_id = ?", (assignee_id,), "ORDER BY rowid")
+        return self._select_tasks(
+            "assignee_id = ? AND assignee_type = ?", (assignee_id, assignee_type), "ORDER BY rowid"
+        )
+
+    def get_tasks_page(
+        self,
+        project_id: Optional[str] = None,
+        phase_id: Optional[str] = None,
+        status: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        assignee_type: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 100,
+        descending: bool = False
+    ) -> Tuple[List[Task], Optional[Tuple[str, str]]]:
+        """
+        Get a page of tasks ordered by (updated_at, id).
+
+        Pages seek past the previous page's key with the updated_at indexes
+        instead of skipping rows with OFFSET.
+
+        Args:
+            project_id: Project ID; required unless assignee_id is given
+            phase_id: Filter by phase ID
+            status: Filter by status
+            assignee_id: Filter by assignee ID
+            assignee_type: Filter by assignee type, or None to match any type
+            after: (updated_at, id) key of the last task of the previous page
+            limit: Maximum number of tasks to return
+            descending: Return the most recently updated tasks first
+
+        Returns:
+            Tuple of the tasks and the key to pass as after for the next page,
+            or None if this is the last page
+
+        Raises:
+            ValueError: If neither project_id nor assignee_id is given
+        """
+        if project_id is None and assignee_id is None:
+            raise ValueError("project_id or assignee_id is required")
+
+        where, params = self._task_filters(
+            project_id=project_id,
+            phase_id=phase_id,
+            status=_enum_value(status),
+            assignee_id=assignee_id,
+            assignee_type=assignee_type,
+        )
+        if after is not None:
+            where += f" AND (updated_at, id) {'<' if descending else '>'} (?, ?)"
+            params += tuple(after)
+        direction = "DESC" if descending else "ASC"
+        tasks = self._select_tasks(
+            where, params + (limit + 1,), f"ORDER BY updated_at {direction}, id {direction} LIMIT ?"
+        )
+        if len(tasks) <= limit:
+            return tasks, None
+        tasks = tasks[:limit]
+        return tasks, (_isoformat(tasks[-1]._updated_at), tasks[-1].id)
+
+    def get_child_tasks(self, parent_id: str) -> List[Task]:
+        """
+        Get the direct children of a task.
+
+        Args:
+            parent_id: Parent task ID
+
+        Returns:
+            List of child tasks
+        """
+        return self._select_tasks("parent_id = ?", (parent_id,), "ORDER BY rowid")
+
+    # The recursive part uses UNION rather than UNION ALL, so parent_id cycles terminate
+    SUBTREE_CTE = """
+        WITH RECURSIVE subtree(id) AS (
+            SELECT id FROM tasks WHERE id = ?
+            UNION
+            SELECT tasks.id FROM tasks JOIN subtree ON tasks.parent_id = subtree.id
+        )
+    """
+
+    def get_subtree(self, task_id: str) -> List[Task]:
+        """
+        Get a task and all its descendants.
+
+        Args:
+            task_id: Root task ID
+
+        Returns:
+            List of tasks in depth-first order, starting with the root; empty
+            if the task is not found
+        """
+        rows = self._execute(
+            f"{self.SUBTREE_CTE} SELECT * FROM tasks WHERE id IN subtree ORDER BY rowid", (task_id,)
+        )
+        tasks = {row["id"]: self._row_to_task(row) for row in rows}
+        if task_id not in tasks:
+            return []
+
+        children: Dict[str, List[Task]] = {}
+        for task in tasks.values():
+            if task.id != task_id:
+                children.setdefault(task.parent_id, []).append(task)
+
+        ordered = []
+        stack = [tasks[task_id]]
+        while stack:
+            task = stack.pop()
+            ordered.append(task)
+            stack.extend(reversed(children.pop(task.id, [])))
+        return ordered
+
+    def get_task_rollup(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the rollup of a task's subtree, aggregated in SQL.
+
+        Args:
+            task_id: Root task ID
+
+        Returns:
+            Dictionary with the number of tasks in the subtree, their average
+            progress, counts by status and the earliest created_at and latest
+            updated_at, or None if the task is not found
+        """
+        rows = self._execute(
+            f"""{self.SUBTREE_CTE}
+            SELECT status, COUNT(*), SUM(COALESCE(progress, 0)), MIN(created_at), MAX(updated_at)
+            FROM tasks WHERE id IN subtree GROUP BY status""",
+            (task_id,),
+        )
+        if not rows:
+            return None
+
+        counts = {status.value: 0 for status in TaskStatus}
+        counts.update({row[0]: row[1] for row in rows})
+        task_count = sum(row[1] for row in rows)
+        return {
+            "task_id": task_id,
+            "task_count": task_count,
+            "progress": sum(row[2] for row in rows) / task_count,
+            "status_counts": counts,
+            "earliest_created_at": datetime.fromisoformat(min(row[3] for row in rows)),
+            "latest_updated_at": datetime.fromisoformat(max(row[4] for row in rows)),
+        }
+
+    def search_tasks(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Tuple[Task, float]]:
+        """
+        Search task names and descriptions with the FTS5 index.
+
+        Every query token must match; the last one also matches as a prefix.
+        Results are ranked with BM25, counting name matches twice.
+
+        Args:
+            query: Query text
+            project_id: Only return tasks in this project
+            limit: Maximum number of results
+
+        Returns:
+            List of (task, score) pairs, best match first
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+
+        terms = [f'"{token}"' for token in tokens]
+        if len(tokens[-1]) >= 2:
+            terms[-1] += "*"
+        sql = (
+            "SELECT tasks.*, bm25(tasks_fts, 2.0, 1.0) AS rank FROM tasks_fts "
+            "JOIN tasks ON tasks.rowid = tasks_fts.rowid WHERE tasks_fts MATCH ?"
+        )
+        params: tuple = (" ".join(terms),)
+        if project_id is not None:
+            sql += " AND tasks.project_id = ?"
+            params += (project_id,)
+        rows = self._execute(f"{sql} ORDER BY rank LIMIT ?", params + (limit,))
+        # FTS5 ranks better matches with lower, negative values
+        return [(self._row_to_task(row), -row["rank"]) for row in rows]
+
+    def calculate_project_progress(self, project_id: str) -> float:
+        """
+        Calculate the average progress of the tasks in a project.
+
+        Args:
+            project_id: Project ID
+
+        Returns:
+            Average task progress, or 0.0 if the project has no tasks
+        """
+        row = self._execute_one(
+            "SELECT AVG(COALESCE(progress, 0)) FROM tasks WHERE project_id = ?", (project_id,)
+        )
+        return row[0] or 0.0
+
+    def calculate_phase_progress(self, project_id: str, phase_id: str) -> float:
+        """
+        Calculate the average progress of the tasks in a phase.
+
+        Args:
+            project_id: Project ID
+            phase_id: Phase ID
+
+        Returns:
+            Average task progress, or 0.0 if the phase has no tasks
+        """
+        row = self._execute_one(
+            "SELECT AVG(COALESCE(progress, 0)) FROM tasks WHERE project_id = ? AND phase_id = ?",
+            (project_id, phase_id),
+        )
+        return row[0] or 0.0
+
+    def count_tasks_by_status(
+        self,
+        project_id: Optional[str] = None,
+        phase_id: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Count tasks by status.
+
+        Args:
+            project_id: Project ID, or None to count across all projects
+            phase_id: Phase ID, or None to count across all phases
+
+        Returns:
+            Dictionary mapping status values to task counts
+        """
+        where, params = self._task_filters(project_id=project_id, phase_id=phase_id)
+        rows = self._execute(
+            f"SELECT status, COUNT(*) FROM tasks WHERE {where} GROUP BY status", params
+        )
+
+        counts = {status.value: 0 for status in TaskStatus}
+        counts.update({row[0]: row[1] for row in rows})
+        return counts
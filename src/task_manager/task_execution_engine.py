@@ -6,8 +6,11 @@ executing, and managing tasks with dependencies using Dagger workflows.
 """
 
 import asyncio
+import bisect
+import gc
 import logging
 import os
+import socket
 import sys
 import uuid
 import json
@@ -15,19 +18,25 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple, Set, Callable
 from enum import Enum
 import heapq
+import math
 import time
 import traceback
+from collections import deque
 
 # Add the project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.task_manager.manager import get_task_manager, TaskStatus, Task
+from src.task_manager.journal import TaskJournal
+from src.task_manager.shared_queue import SharedExecutionQueue
+from src.task_manager.workflow_executors import WorkflowExecutor, load_workflow_executors
 from src.task_manager.dagger_integration import get_task_workflow_integration, TaskWorkflowIntegration
 from src.task_manager.workflow_status import WorkflowState, get_workflow_status_manager
 from src.task_manager.result_processor import get_result_processor, ResultProcessor
 from src.task_manager.workflow_cache import get_workflow_cache, WorkflowCache
 from src.task_manager.pipeline_converter import get_pipeline_converter, PipelineConverter
 from src.orchestrator.circuit_breaker import get_circuit_breaker, execute_with_circuit_breaker
+from src.orchestrator.error_handling import Component, RateLimitError
 from src.orchestrator.dagger_communication import get_dagger_communication_manager, DaggerCommunicationManager
 
 logger = logging.getLogger(__name__)
@@ -64,6 +73,46 @@ class RetryStrategy(str, Enum):
     FIBONACCI_BACKOFF = "fibonacci_backoff"
 
 
+# Kinds of keys concurrency limits can be set on
+CONCURRENCY_KEY_KINDS = ("workflow_type", "image", "agent")
+
+# Statuses of the executions admitted but not started, which count towards the queue depth
+QUEUED_STATUSES = (
+    TaskExecutionStatus.PENDING,
+    TaskExecutionStatus.SCHEDULED,
+    TaskExecutionStatus.RETRYING,
+)
+
+# Statuses an execution does not leave unless it is retried
+FINISHED_STATUSES = (
+    TaskExecutionStatus.COMPLETED,
+    TaskExecutionStatus.FAILED,
+    TaskExecutionStatus.CANCELLED,
+    TaskExecutionStatus.TIMEOUT,
+)
+
+
+class AdmissionRejectedError(RateLimitError):
+    """Error raised when the execution engine sheds new work because it is at a limit."""
+    
+    def __init__(self, message: str, retry_after: int, details: Optional[Dict[str, Any]] = None):
+        """
+        Initialize an AdmissionRejectedError.
+        
+        Args:
+            message: Human-readable error message
+            retry_after: Seconds to wait before scheduling again
+            details: Limit that was hit and the current usage
+        """
+        super().__init__(
+            message=message,
+            details=details,
+            component=Component.TASK_SCHEDULER,
+            retry_after=retry_after,
+        )
+        self.retry_after = retry_after
+
+
 class TaskExecution:
     """Class representing a task execution."""
     
@@ -80,6 +129,9 @@ class TaskExecution:
         timeout: int = 3600,  # seconds
         dependencies: Optional[List[str]] = None,
         metadata: Optional[Dict[str, Any]] = None,
+        project_id: Optional[str] = None,
+        assignee_id: Optional[str] = None,
+        critical_path: float = 0.0,  # seconds
     ):
         """Initialize a task execution."""
         self.task_id = task_id
@@ -93,6 +145,11 @@ class TaskExecution:
         self.timeout = timeout
         self.dependencies = dependencies or []
         self.metadata = metadata or {}
+        self.project_id = project_id
+        self.assignee_id = assignee_id
+        # Estimated seconds from its start to the end of the longest chain of
+        # executions depending on it, set for the executions of a task graph
+        self.critical_path = critical_path
         
         self.status = TaskExecutionStatus.PENDING
         self.created_at = datetime.now()
@@ -108,6 +165,9 @@ class TaskExecution:
         self.workflow_id = None
         self.container_id = None
         
+        # Called with the execution and its previous status after every status change
+        self.status_listener: Optional[Callable[["TaskExecution", TaskExecutionStatus], None]] = None
+        
         self.status_history = [
             {
                 "status": self.status,
@@ -115,10 +175,22 @@ class TaskExecution:
                 "previous_status": None,
             }
         ]
+        
+        # Transitions into and seconds spent in each status, for the history
+        # entries dropped by compact_history
+        self.status_summary: Dict[str, Dict[str, float]] = {}
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert the task execution to a dictionary."""
-        return {
+    def to_dict(self, include_history: bool = True) -> Dict[str, Any]:
+        """
+        Convert the task execution to a dictionary.
+        
+        Args:
+            include_history: Include the status history
+            
+        Returns:
+            Dictionary with the task execution data
+        """
+        data = {
             "task_id": self.task_id,
             "execution_id": self.execution_id,
             "workflow_type": self.workflow_type,
@@ -130,6 +202,9 @@ class TaskExecution:
             "timeout": self.timeout,
             "dependencies": self.dependencies,
             "metadata": self.metadata,
+            "project_id": self.project_id,
+            "assignee_id": self.assignee_id,
+            "critical_path": self.critical_path,
             "status": self.status,
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
@@ -143,37 +218,41 @@ class TaskExecution:
             "workflow_id": self.workflow_id,
             "container_id": self.container_id,
             "status_history": self.status_history,
+            "status_summary": self.status_summary,
         }
+        if not include_history:
+            del data["status_history"]
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "TaskExecution":
         """Create a task execution from a dictionary."""
-        execution = cls(
-            task_id=data["task_id"],
-            execution_id=data["execution_id"],
-            workflow_type=data["workflow_type"],
-            priority=data["priority"],
-            workflow_params=data["workflow_params"],
-            retry_strategy=data["retry_strategy"],
-            max_retries=data["max_retries"],
-            retry_delay=data["retry_delay"],
-            timeout=data["timeout"],
-            dependencies=data["dependencies"],
-            metadata=data["metadata"],
-        )
+        # Set every attribute directly rather than through __init__, which
+        # would build a default status history only for it to be replaced;
+        # this runs for every saved execution on startup
+        execution = cls.__new__(cls)
+        execution.task_id = data["task_id"]
+        execution.execution_id = data["execution_id"]
+        execution.workflow_type = data["workflow_type"]
+        execution.priority = TaskExecutionPriority(data["priority"])
+        execution.workflow_params = data["workflow_params"] or {}
+        execution.retry_strategy = RetryStrategy(data["retry_strategy"])
+        execution.max_retries = data["max_retries"]
+        execution.retry_delay = data["retry_delay"]
+        execution.timeout = data["timeout"]
+        execution.dependencies = data["dependencies"] or []
+        execution.metadata = data["metadata"] or {}
+        execution.project_id = data.get("project_id")
+        execution.assignee_id = data.get("assignee_id")
+        execution.critical_path = data.get("critical_path") or 0.0
         
         execution.status = TaskExecutionStatus(data["status"])
         execution.created_at = datetime.fromisoformat(data["created_at"])
         execution.updated_at = datetime.fromisoformat(data["updated_at"])
-        
-        if data.get("scheduled_at"):
-            execution.scheduled_at = datetime.fromisoformat(data["scheduled_at"])
-        if data.get("started_at"):
-            execution.started_at = datetime.fromisoformat(data["started_at"])
-        if data.get("completed_at"):
-            execution.completed_at = datetime.fromisoformat(data["completed_at"])
-        if data.get("next_retry_at"):
-            execution.next_retry_at = datetime.fromisoformat(data["next_retry_at"])
+        execution.scheduled_at = datetime.fromisoformat(data["scheduled_at"]) if data.get("scheduled_at") else None
+        execution.started_at = datetime.fromisoformat(data["started_at"]) if data.get("started_at") else None
+        execution.completed_at = datetime.fromisoformat(data["completed_at"]) if data.get("completed_at") else None
+        execution.next_retry_at = datetime.fromisoformat(data["next_retry_at"]) if data.get("next_retry_at") else None
         
         execution.retry_count = data["retry_count"]
         execution.result = data["result"]
@@ -181,6 +260,8 @@ class TaskExecution:
         execution.workflow_id = data["workflow_id"]
         execution.container_id = data["container_id"]
         execution.status_history = data["status_history"]
+        execution.status_summary = data.get("status_summary") or {}
+        execution.status_listener = None
         
         return execution
     
@@ -209,6 +290,38 @@ class TaskExecution:
             "timestamp": self.updated_at.isoformat(),
             "previous_status": previous_status,
         })
+        
+        if self.status_listener is not None:
+            self.status_listener(self, previous_status)
+    
+    def compact_history(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        Drop the oldest status history entries beyond a limit.
+        
+        Each dropped entry is counted in status_summary as a transition into
+        its status and the time until the next entry.
+        
+        Args:
+            limit: Number of most recent entries to keep
+            
+        Returns:
+            The dropped entries, oldest first
+        """
+        excess = len(self.status_history) - limit
+        if excess <= 0:
+            return []
+        
+        dropped = self.status_history[:excess]
+        for entry, next_entry in zip(dropped, self.status_history[1:excess + 1]):
+            summary = self.status_summary.setdefault(
+                TaskExecutionStatus(entry["status"]).value, {"transitions": 0, "seconds": 0.0}
+            )
+            summary["transitions"] += 1
+            summary["seconds"] += (
+                datetime.fromisoformat(next_entry["timestamp"]) - datetime.fromisoformat(entry["timestamp"])
+            ).total_seconds()
+        del self.status_history[:excess]
+        return dropped
     
     def calculate_next_retry_time(self) -> datetime:
         """
@@ -309,6 +422,40 @@ class TaskExecution:
         return self.status in (TaskExecutionStatus.COMPLETED, TaskExecutionStatus.FAILED, TaskExecutionStatus.CANCELLED)
 
 
+def critical_path_lengths(task_graph: Dict[str, List[str]], durations: Dict[str, float]) -> Dict[str, float]:
+    """
+    Compute the longest remaining path of each task of a task graph.
+    
+    Args:
+        task_graph: Dictionary mapping task IDs to lists of the task IDs they depend on
+        durations: Estimated seconds each task takes
+        
+    Returns:
+        Dictionary mapping task IDs to the estimated seconds from their start
+        to the end of the longest chain of tasks depending on them
+    """
+    dependents: Dict[str, List[str]] = {task_id: [] for task_id in task_graph}
+    remaining = {task_id: len(dependencies) for task_id, dependencies in task_graph.items()}
+    for task_id, dependencies in task_graph.items():
+        for dependency_id in dependencies:
+            dependents[dependency_id].append(task_id)
+    
+    # Order the tasks dependencies first, then add up the paths from the last task back
+    order = [task_id for task_id, count in remaining.items() if not count]
+    for task_id in order:
+        for dependent_id in dependents[task_id]:
+            remaining[dependent_id] -= 1
+            if not remaining[dependent_id]:
+                order.append(dependent_id)
+    if len(order) < len(task_graph):
+        raise ValueError("Graph contains cycles")
+    
+    lengths: Dict[str, float] = {}
+    for task_id in reversed(order):
+        lengths[task_id] = durations[task_id] + max((lengths[d] for d in dependents[task_id]), default=0.0)
+    return lengths
+
+
 class TaskExecutionEngine:
     """
     Engine for scheduling and executing tasks.
@@ -324,6 +471,20 @@ class TaskExecutionEngine:
         data_dir: Optional[str] = None,
         dagger_config_path: Optional[str] = None,
         templates_dir: Optional[str] = None,
+        aging_interval: int = 300,  # seconds
+        fair_share_weights: Optional[Dict[str, float]] = None,
+        persist_interval: float = 1.0,  # seconds
+        max_status_history: int = 100,
+        workflow_executors: Optional[List[WorkflowExecutor]] = None,
+        shared_queue: Optional[SharedExecutionQueue] = None,
+        node_id: Optional[str] = None,
+        lease_ttl: float = 30.0,  # seconds
+        max_queue_depth: Optional[int] = None,
+        max_memory_bytes: Optional[int] = None,
+        admission_block_priority: Union[TaskExecutionPriority, int] = TaskExecutionPriority.HIGH,
+        admission_timeout: float = 30.0,  # seconds
+        concurrency_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        default_task_duration: float = 60.0,  # seconds
     ):
         """
         Initialize the task execution engine.
@@ -334,14 +495,63 @@ class TaskExecutionEngine:
             data_dir: Directory for storing task execution data
             dagger_config_path: Path to the Dagger configuration file
             templates_dir: Directory containing pipeline templates
+            aging_interval: Seconds a queued execution waits before its priority
+                is raised by one level; 0 disables aging
+            fair_share_weights: Share of the queue of each project or tenant,
+                relative to the default weight of 1
+            persist_interval: Seconds execution changes are collected before
+                they are written together
+            max_status_history: Number of status history entries kept with an
+                execution; older entries are summarized and moved to an archive
+            workflow_executors: Backends running selected workflow types, such
+                as a process pool for CPU-bound local workflows; every other
+                type runs through the workflow integration
+            shared_queue: Work queue shared with other engines; executions
+                are then queued there and run by whichever engine claims them
+            node_id: ID of this engine in the shared queue; defaults to the
+                host name and process ID
+            lease_ttl: Seconds a claimed execution stays leased to this engine
+                without a heartbeat
+            max_queue_depth: Maximum number of executions admitted but not
+                started; None for no limit
+            max_memory_bytes: Resident memory of the process above which new
+                executions are not admitted; None for no limit
+            admission_block_priority: Priority from which scheduling waits for
+                room when a limit is hit, instead of being rejected at once
+            admission_timeout: Seconds scheduling waits for room before it is
+                rejected
+            concurrency_limits: Maximum number of running executions per key,
+                by kind of key: "workflow_type", "image" (workflow_params
+                ["image"]) or "agent" (the task's assignee)
+            default_task_duration: Estimated seconds of a workflow type no
+                execution has completed yet, for task graph critical paths
         """
         self.max_concurrent_executions = max_concurrent_executions
         self.scheduler_interval = scheduler_interval
+        self.aging_interval = aging_interval
+        self.fair_share_weights = fair_share_weights or {}
+        self.persist_interval = persist_interval
+        self.max_status_history = max_status_history
         
         # Set up data directory
         self.data_dir = data_dir or os.path.join(os.path.dirname(__file__), "data", "executions")
         os.makedirs(self.data_dir, exist_ok=True)
         
+        # Executions are saved as a snapshot plus a log of the executions
+        # changed since. Changes are only marked here, and the persist task
+        # writes them in batches from a worker thread.
+        self._journal = TaskJournal(
+            self.data_dir,
+            snapshot_name="executions.json",
+            log_name="executions.journal",
+            json_default=str,
+        )
+        self._dirty_executions: Dict[str, None] = {}  # insertion-ordered set of unsaved execution IDs
+        self._unarchived_history: Dict[str, List[Dict[str, Any]]] = {}  # execution_id -> compacted entries to archive
+        self._persist_task = None
+        self._persist_event = asyncio.Event()
+        self._persist_lock = asyncio.Lock()
+        
         # Get dependencies
         self.task_manager = get_task_manager()
         self.workflow_integration = get_task_workflow_integration(dagger_config_path, templates_dir)
@@ -350,32 +560,116 @@ class TaskExecutionEngine:
         self.workflow_cache = get_workflow_cache()
         self.pipeline_converter = get_pipeline_converter(templates_dir)
         
+        # Backends running selected workflow types instead of the workflow integration
+        self.workflow_executors: Dict[str, WorkflowExecutor] = {}  # workflow type -> backend
+        for executor in workflow_executors or []:
+            self.register_workflow_executor(executor)
+        
+        # Work queue shared with other engines. Queued and finished executions
+        # are collected in the outbox and published by the scheduler pass,
+        # which also renews the leases of the running executions (the
+        # heartbeat) and claims work for the free slots.
+        self.shared_queue = shared_queue
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_ttl = lease_ttl
+        self._shared_outbox: Dict[str, Optional[datetime]] = {}  # execution_id -> due time, None once finished
+        self._next_heartbeat = datetime.now()
+        self.shared_queue_stats = {"claimed": 0, "reclaimed": 0, "lost_leases": 0}
+        
+        # Admission control. Scheduling past a limit is rejected, or for high
+        # priorities waits until executions leave the queue; the event is
+        # replaced each time they do, waking every waiter.
+        self.max_queue_depth = max_queue_depth
+        self.max_memory_bytes = max_memory_bytes
+        self.admission_block_priority = TaskExecutionPriority(admission_block_priority)
+        self.admission_timeout = admission_timeout
+        self._queue_left = asyncio.Event()
+        self.admission_stats = {"admitted": 0, "rejected": 0, "blocked": 0}
+        self.admission_latencies: deque = deque(maxlen=1000)  # seconds the recent admissions took
+        if max_memory_bytes is not None and self._memory_usage() is None:
+            logger.warning("psutil not installed, the memory limit of the execution queue is not enforced")
+        
         # Get circuit breaker for task executions
         self.circuit_breaker = get_circuit_breaker("task_executions")
         
         # Get the Dagger communication manager
         self.communication_manager = get_dagger_communication_manager()
         
-        # Task execution registry
+        # Task execution registry, with the executions in creation order
+        # overall, by status and by task, and the number in each status
         self.executions: Dict[str, TaskExecution] = {}
-        
-        # Priority queue for scheduled executions
-        self.execution_queue: List[Tuple[int, datetime, str]] = []  # (priority, scheduled_time, execution_id)
-        
-        # Set of currently running executions
+        self._execution_order: Dict[Tuple[str, str], List[Tuple[datetime, str]]] = {}  # key -> sorted (created_at, execution_id)
+        self._status_counts: Dict[TaskExecutionStatus, int] = {}
+        
+        # Priority queue for executions that are due. Within a priority level,
+        # entries are ordered by a fair-share tag, so the executions of each
+        # project or tenant are interleaved in proportion to its weight. Entries
+        # that aging has replaced no longer match _queued and are skipped.
+        # When a project's turn comes, its queued execution of that priority
+        # with the longest critical path takes the turn instead; see
+        # _take_critical_path.
+        self.execution_queue: List[Tuple[int, float, float, str]] = []  # (-priority, tag, -critical path, execution_id)
+        self._queued: Dict[str, Tuple[int, float, datetime]] = {}  # execution_id -> (priority, tag, ready time)
+        self._fair_share_tags: Dict[str, float] = {}  # project or tenant -> tag of its next execution
+        self._virtual_time = 0.0  # tag of the last execution taken off the queue
+        self._aging_queue: List[Tuple[datetime, str]] = []  # (promotion time, execution_id)
+        self._critical_queues: Dict[Tuple[str, int], List[Tuple[float, float, str]]] = {}  # (project or tenant, priority) -> (-critical path, tag, execution_id)
+        
+        # Mean duration of the completed executions of each workflow type, to
+        # estimate the critical paths of task graphs
+        self.default_task_duration = default_task_duration
+        self._workflow_durations: Dict[str, Tuple[int, float]] = {}  # workflow_type -> (count, mean seconds)
+        
+        # Executions due later, ordered by due time
+        self.delayed_queue: List[Tuple[datetime, int, str]] = []  # (due_time, -priority, execution_id)
+        
+        # Set of currently running executions, and the tasks running them
         self.running_executions: Set[str] = set()
+        self.running_tasks: Dict[str, asyncio.Task] = {}  # execution_id -> task
+        
+        # Concurrency limits per key, such as a workflow type or container
+        # image, on top of max_concurrent_executions. Queue entries whose key
+        # is at its limit are parked under the key and pushed back onto the
+        # queue when a run with that key finishes, so they do not hold up the
+        # executions behind them. An execution has at most one parked entry:
+        # parking it again, after aging or a queue rebuild pushed a new entry,
+        # replaces the old one.
+        self.concurrency_limits: Dict[Tuple[str, str], int] = {}  # (kind, key) -> limit
+        self._key_running: Dict[Tuple[str, str], int] = {}  # (kind, key) -> running executions
+        self._run_keys: Dict[str, List[Tuple[str, str]]] = {}  # execution_id -> keys of its run
+        self._parked: Dict[Tuple[str, str], Dict[str, Tuple[int, float, float, str]]] = {}  # (kind, key) -> execution_id -> queue entry
+        self._parked_keys: Dict[str, Tuple[str, str]] = {}  # execution_id -> key it is parked under
+        for kind, limits in (concurrency_limits or {}).items():
+            for key, limit in limits.items():
+                self.set_concurrency_limit(kind, key, limit)
+        
+        # Timeouts of running executions. Heap entries of runs that finished or
+        # were superseded no longer match _deadlines and are skipped when popped.
+        self.timeout_deadlines: List[Tuple[datetime, str]] = []  # (deadline, execution_id)
+        self._deadlines: Dict[str, datetime] = {}  # execution_id -> deadline of its current run
         
         # Dependency graph for executions
         self.dependency_graph: Dict[str, Set[str]] = {}  # execution_id -> set of dependent execution_ids
         
-        # Scheduler task
+        # Executions taken off the queue with unfinished dependencies, and how
+        # many of their dependencies have not completed yet
+        self.waiting_executions: Dict[str, int] = {}  # execution_id -> remaining dependencies
+        
+        # Scheduler task, and the event that wakes it when work arrives or a
+        # slot frees up
         self._scheduler_task = None
+        self._scheduler_event = asyncio.Event()
         self._initialized = False
         
         # Execution hooks
         self.pre_execution_hooks: List[Callable[[TaskExecution], None]] = []
         self.post_execution_hooks: List[Callable[[TaskExecution], None]] = []
         
+        # Seconds the most recently started executions of each priority waited in the queue
+        self.wait_times: Dict[str, deque] = {
+            priority.name.lower(): deque(maxlen=1000) for priority in TaskExecutionPriority
+        }
+        
         # Statistics
         self.stats = {
             "total_executions": 0,
@@ -395,6 +689,10 @@ class TaskExecutionEngine:
             # Load persisted executions
             await self._load_executions()
             
+            # Start the workflow executors, so their workers are warm
+            for executor in self._unique_workflow_executors():
+                await executor.start()
+            
             # Register with the communication manager
             await self.communication_manager.register_agent(
                 agent_id="task_execution_engine",
@@ -406,8 +704,9 @@ class TaskExecutionEngine:
                 use_circuit_breaker=True
             )
             
-            # Start the scheduler
+            # Start the scheduler and the persist task
             self._scheduler_task = asyncio.create_task(self._scheduler_loop())
+            self._persist_task = asyncio.create_task(self._persist_loop())
             
             self._initialized = True
             logger.info("Task Execution Engine initialized successfully")
@@ -415,9 +714,19 @@ class TaskExecutionEngine:
     async def shutdown(self) -> None:
         """Shutdown the task execution engine."""
         if self._initialized:
-            # Save executions
+            # Stop the persist task and save all executions to the snapshot
+            if self._persist_task:
+                self._persist_task.cancel()
+                try:
+                    await self._persist_task
+                except asyncio.CancelledError:
+                    pass
             await self._save_executions()
             
+            # Publish the last changes to the shared queue
+            if self.shared_queue is not None:
+                await self._sync_shared_queue(datetime.now(), claim=False)
+            
             # Cancel the scheduler task
             if self._scheduler_task:
                 self._scheduler_task.cancel()
@@ -436,87 +745,148 @@ class TaskExecutionEngine:
                 logger.warning(f"Failed to unregister from communication manager: {e}")
             
             # Shutdown dependencies
+            for executor in self._unique_workflow_executors():
+                await executor.shutdown()
             await self.workflow_integration.shutdown()
             
             self._initialized = False
             logger.info("Task Execution Engine shut down successfully")
     
+    def register_workflow_executor(self, executor: WorkflowExecutor) -> None:
+        """
+        Run the workflow types of a backend in it, instead of the workflow integration.
+        
+        The engine starts its backends when it is initialized; a process pool
+        registered after that starts on its first run.
+        
+        Args:
+            executor: Workflow executor
+        """
+        for workflow_type in executor.workflow_types:
+            self.workflow_executors[workflow_type] = executor
+    
+    def _unique_workflow_executors(self) -> List[WorkflowExecutor]:
+        """Get the registered workflow executors, each once."""
+        return list({id(executor): executor for executor in self.workflow_executors.values()}.values())
+    
     async def _load_executions(self) -> None:
         """Load executions from disk."""
-        executions_dir = os.path.join(self.data_dir, "executions")
-        if not os.path.exists(executions_dir):
-            os.makedirs(executions_dir, exist_ok=True)
-            return
-        
-        for filename in os.listdir(executions_dir):
-            if filename.endswith(".json"):
-                execution_id = filename[:-5]  # Remove .json extension
-                execution_path = os.path.join(executions_dir, filename)
-                try:
-                    with open(execution_path, "r") as f:
-                        execution_data = json.load(f)
-                    
-                    execution = TaskExecution.from_dict(execution_data)
-                    self.executions[execution_id] = execution
-                    
-                    # Add to queue if not complete
-                    if not execution.is_complete():
-                        if execution.status == TaskExecutionStatus.RUNNING:
-                            # Add to running executions
-                            self.running_executions.add(execution_id)
-                        elif execution.status == TaskExecutionStatus.RETRYING:
-                            # Add to queue with next retry time
-                            heapq.heappush(
-                                self.execution_queue,
-                                (-execution.priority.value, execution.next_retry_at, execution_id)
-                            )
-                        else:
-                            # Add to queue with current time
-                            heapq.heappush(
-                                self.execution_queue,
-                                (-execution.priority.value, datetime.now(), execution_id)
-                            )
-                    
-                    # Update dependency graph
-                    for dep_id in execution.dependencies:
-                        if dep_id not in self.dependency_graph:
-                            self.dependency_graph[dep_id] = set()
-                        self.dependency_graph[dep_id].add(execution_id)
-                    
-                    # Update statistics
-                    self.stats["total_executions"] += 1
-                    if execution.status == TaskExecutionStatus.COMPLETED:
-                        self.stats["successful_executions"] += 1
-                    elif execution.status == TaskExecutionStatus.FAILED:
-                        self.stats["failed_executions"] += 1
-                    elif execution.status == TaskExecutionStatus.CANCELLED:
-                        self.stats["cancelled_executions"] += 1
-                    elif execution.status == TaskExecutionStatus.TIMEOUT:
-                        self.stats["timed_out_executions"] += 1
-                    
-                    if execution.retry_count > 0:
-                        self.stats["retried_executions"] += 1
-                except Exception as e:
-                    logger.error(f"Error loading execution {execution_id}: {e}")
+        # Loading creates a lot of objects at once, which the cyclic garbage
+        # collector would otherwise rescan over and over
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            await self._load_execution_records()
+        finally:
+            if gc_enabled:
+                gc.enable()
         
         logger.info(f"Loaded {len(self.executions)} executions")
     
-    async def _save_executions(self) -> None:
-        """Save executions to disk."""
-        executions_dir = os.path.join(self.data_dir, "executions")
-        os.makedirs(executions_dir, exist_ok=True)
+    async def _load_execution_records(self) -> None:
+        """Register the saved executions, queueing the unfinished ones."""
+        records, migrated = await asyncio.to_thread(self._read_execution_records)
         
-        for execution_id, execution in self.executions.items():
-            execution_path = os.path.join(executions_dir, f"{execution_id}.json")
+        for execution_id, execution_data in records.items():
             try:
-                with open(execution_path, "w") as f:
-                    json.dump(execution.to_dict(), f, indent=2)
+                execution = TaskExecution.from_dict(execution_data)
+                self._register_execution(execution, keep_sorted=False)
+                
+                # Add to queue if not complete
+                if not execution.is_complete():
+                    if execution.status == TaskExecutionStatus.RUNNING:
+                        # Add to running executions, timing out from its
+                        # original start. With a shared queue, the run's lease
+                        # expires instead and whichever engine claims it runs it again.
+                        if self.shared_queue is None:
+                            self.running_executions.add(execution_id)
+                            self._take_keys(execution)
+                            started_at = execution.started_at or datetime.now()
+                            self._set_deadline(execution_id, started_at + timedelta(seconds=execution.timeout))
+                    elif execution.status == TaskExecutionStatus.RETRYING:
+                        # Add to queue with next retry time
+                        self._enqueue(execution, execution.next_retry_at)
+                    else:
+                        # Add to queue with current time
+                        self._enqueue(execution)
+                
+                # Update dependency graph
+                for dep_id in execution.dependencies:
+                    if dep_id not in self.dependency_graph:
+                        self.dependency_graph[dep_id] = set()
+                    self.dependency_graph[dep_id].add(execution_id)
+                
+                # Update statistics
+                self.stats["total_executions"] += 1
+                if execution.status == TaskExecutionStatus.COMPLETED:
+                    self.stats["successful_executions"] += 1
+                elif execution.status == TaskExecutionStatus.FAILED:
+                    self.stats["failed_executions"] += 1
+                elif execution.status == TaskExecutionStatus.CANCELLED:
+                    self.stats["cancelled_executions"] += 1
+                elif execution.status == TaskExecutionStatus.TIMEOUT:
+                    self.stats["timed_out_executions"] += 1
+                
+                if execution.retry_count > 0:
+                    self.stats["retried_executions"] += 1
             except Exception as e:
-                logger.error(f"Error saving execution {execution_id}: {e}")
+                logger.error(f"Error loading execution {execution_id}: {e}")
+        
+        # The snapshot is mostly in creation order already, which sorts in linear time
+        for order in self._execution_order.values():
+            order.sort()
+        
+        # Move executions saved in per-execution files into the snapshot
+        if migrated:
+            await self._save_executions()
+    
+    def _read_execution_records(self) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """
+        Read the saved executions: the snapshot, then the changes logged since.
+        
+        Without a snapshot, the per-execution files written by earlier
+        versions are read instead. This only does file I/O, so it runs in a
+        worker thread.
+        
+        Returns:
+            Tuple of the execution data by execution ID, and whether it was
+            read from per-execution files
+        """
+        records: Dict[str, Dict[str, Any]] = {}
+        migrated = False
+        snapshot: Dict[str, Any] = {}
+        if os.path.exists(self._journal.snapshot_path):
+            with open(self._journal.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+            fields = snapshot["fields"]
+            for row in snapshot["executions"]:
+                execution_data = dict(zip(fields, row))
+                records[execution_data["execution_id"]] = execution_data
+        else:
+            executions_dir = os.path.join(self.data_dir, "executions")
+            if os.path.isdir(executions_dir):
+                for filename in os.listdir(executions_dir):
+                    if filename.endswith(".json"):
+                        try:
+                            with open(os.path.join(executions_dir, filename), "r") as f:
+                                records[filename[:-5]] = json.load(f)
+                            migrated = True
+                        except Exception as e:
+                            logger.error(f"Error loading execution {filename[:-5]}: {e}")
+        
+        for record in self._journal.read_log(snapshot.get("journal_seq", 0)):
+            if record["kind"] == "execution":
+                records[record["data"]["execution_id"]] = record["data"]
+        
+        return records, migrated
+    
+    async def _save_executions(self) -> None:
+        """Save all executions to a new snapshot, replacing the log."""
+        await asyncio.shield(self._flush_executions(compact=True))
     
     async def _save_execution(self, execution_id: str) -> None:
         """
-        Save a single execution to disk.
+        Mark an execution to be saved with the next batch of changes.
         
         Args:
             execution_id: ID of the execution to save
@@ -524,76 +894,396 @@ class TaskExecutionEngine:
         if execution_id not in self.executions:
             return
         
-        execution = self.executions[execution_id]
-        execution_path = os.path.join(self.data_dir, "executions", f"{execution_id}.json")
+        self._dirty_executions[execution_id] = None
+        self._persist_event.set()
+    
+    async def _persist_loop(self) -> None:
+        """Background task writing the changed executions every persist_interval."""
+        while True:
+            try:
+                await self._persist_event.wait()
+                await asyncio.sleep(self.persist_interval)
+                self._persist_event.clear()
+                await asyncio.shield(self._flush_executions())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in persist loop: {e}")
+    
+    async def _flush_executions(self, compact: bool = False) -> int:
+        """
+        Write the changed executions to the log in a worker thread.
         
-        try:
-            os.makedirs(os.path.dirname(execution_path), exist_ok=True)
-            with open(execution_path, "w") as f:
-                json.dump(execution.to_dict(), f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving execution {execution_id}: {e}")
+        Once the log holds more records than there are executions, a snapshot
+        of all executions replaces it instead, so restarting reads the
+        snapshot and a log no larger than it.
+        
+        Args:
+            compact: Write a snapshot even if the log is still small
+            
+        Returns:
+            Number of executions written
+        """
+        async with self._persist_lock:
+            dirty, self._dirty_executions = self._dirty_executions, {}
+            archive, self._unarchived_history = self._unarchived_history, {}
+            if not dirty and not archive and not compact:
+                return 0
+            
+            # Encode here rather than in the worker thread, as the event loop
+            # keeps changing the executions and their nested fields
+            records = [
+                self._journal.record("put", "execution", self.executions[execution_id].to_dict())
+                for execution_id in dirty
+                if execution_id in self.executions
+            ]
+            threshold = max(self._journal.compact_threshold, len(self.executions))
+            if compact or self._journal.log_records + len(records) >= threshold:
+                # One row of values per execution, in the order of the fields,
+                # so the keys are not repeated for every execution
+                data = [execution.to_dict() for execution in self.executions.values()]
+                rows = [list(execution_data.values()) for execution_data in data]
+                fields = list(data[0]) if data else []
+                count = len(rows)
+                snapshot = self._journal.encode_snapshot({"fields": fields, "executions": rows}, self._journal.seq)
+                lines = None
+            else:
+                count = len(records)
+                lines = self._journal.encode_records(records)
+            
+            def write() -> int:
+                # Take each archive out of the batch once written, so a failed
+                # write only retries the rest
+                for execution_id in list(archive):
+                    self._archive_history(execution_id, archive[execution_id])
+                    del archive[execution_id]
+                if lines is not None:
+                    return self._journal.write_lines(lines, count)
+                self._journal.write_encoded_snapshot(snapshot)
+                return count
+            
+            try:
+                return await asyncio.to_thread(write)
+            except Exception as e:
+                logger.error(f"Error saving executions: {e}")
+                
+                # Mark them unsaved again for the next write
+                dirty.update(self._dirty_executions)
+                self._dirty_executions = dirty
+                for execution_id, entries in self._unarchived_history.items():
+                    archive.setdefault(execution_id, []).extend(entries)
+                self._unarchived_history = archive
+                return 0
+    
+    def _history_path(self, execution_id: str) -> str:
+        """Get the path of the archive of an execution's compacted status history."""
+        return os.path.join(self.data_dir, "history", f"{execution_id}.jsonl")
+    
+    def _archive_history(self, execution_id: str, entries: List[Dict[str, Any]]) -> None:
+        """
+        Append compacted status history entries to an execution's archive.
+        
+        Args:
+            execution_id: ID of the execution
+            entries: Entries to append, oldest first
+        """
+        path = self._history_path(execution_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a") as f:
+            f.write("".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries))
+    
+    def _register_execution(self, execution: TaskExecution, keep_sorted: bool = True) -> None:
+        """
+        Add an execution to the registry and its indexes.
+        
+        Args:
+            execution: Execution to add
+            keep_sorted: Insert it in creation order; otherwise it is appended,
+                and the caller sorts the indexes once it has added a batch
+        """
+        self.executions[execution.execution_id] = execution
+        entry = (execution.created_at, execution.execution_id)
+        for key in (("all", ""), ("status", execution.status.value), ("task", execution.task_id)):
+            order = self._execution_order.setdefault(key, [])
+            if keep_sorted:
+                bisect.insort(order, entry)
+            else:
+                order.append(entry)
+        self._status_counts[execution.status] = self._status_counts.get(execution.status, 0) + 1
+        self._record_duration(execution)
+        execution.status_listener = self._on_status_change
+    
+    def _on_status_change(self, execution: TaskExecution, previous_status: TaskExecutionStatus) -> None:
+        """
+        Move an execution to the index and count of its new status, and
+        compact its status history once it is over the limit. Wakes the
+        schedule calls waiting for room when the execution leaves the queue.
+        With a shared queue, finished executions are marked to be published.
+        
+        Args:
+            execution: Execution whose status changed
+            previous_status: Status before the change
+        """
+        if len(execution.status_history) > self.max_status_history:
+            dropped = execution.compact_history(self.max_status_history)
+            self._unarchived_history.setdefault(execution.execution_id, []).extend(dropped)
+        
+        if execution.status == previous_status:
+            return
+        
+        entry = (execution.created_at, execution.execution_id)
+        order = self._execution_order.get(("status", previous_status.value), [])
+        i = bisect.bisect_left(order, entry)
+        if i < len(order) and order[i] == entry:
+            del order[i]
+        bisect.insort(self._execution_order.setdefault(("status", execution.status.value), []), entry)
+        
+        self._status_counts[previous_status] -= 1
+        self._status_counts[execution.status] = self._status_counts.get(execution.status, 0) + 1
+        
+        if previous_status in QUEUED_STATUSES and execution.status not in QUEUED_STATUSES:
+            self._queue_left.set()
+            self._queue_left = asyncio.Event()
+        
+        if self.shared_queue is not None and execution.status in FINISHED_STATUSES:
+            self._shared_outbox[execution.execution_id] = None
+        
+        self._record_duration(execution)
+    
+    def _record_duration(self, execution: TaskExecution) -> None:
+        """
+        Add the run time of a completed execution to the mean of its workflow type.
+        
+        The mean weighs the last 100 executions about equally, so it follows
+        changes in the workflow's run time.
+        
+        Args:
+            execution: Execution, ignored unless it completed
+        """
+        if execution.status != TaskExecutionStatus.COMPLETED or not execution.started_at or not execution.completed_at:
+            return
+        
+        seconds = max((execution.completed_at - execution.started_at).total_seconds(), 0.0)
+        count, mean = self._workflow_durations.get(execution.workflow_type, (0, 0.0))
+        count += 1
+        self._workflow_durations[execution.workflow_type] = (count, mean + (seconds - mean) / min(count, 100))
+    
+    def _estimate_duration(self, workflow_type: str) -> float:
+        """
+        Estimate the run time of a workflow type.
+        
+        Args:
+            workflow_type: Workflow type
+            
+        Returns:
+            Mean seconds of its completed executions, or the default task duration
+        """
+        if workflow_type in self._workflow_durations:
+            return self._workflow_durations[workflow_type][1]
+        return self.default_task_duration
+    
+    def _enqueue(self, execution: TaskExecution, due_time: Optional[datetime] = None) -> None:
+        """
+        Queue an execution and wake the scheduler.
+        
+        With a shared queue, the execution is published there by the next
+        scheduler pass instead.
+        
+        Args:
+            execution: Execution to queue
+            due_time: Time the execution may start; now if not given
+        """
+        now = datetime.now()
+        if self.shared_queue is not None:
+            self._shared_outbox[execution.execution_id] = due_time or now
+        elif due_time is not None and due_time > now:
+            heapq.heappush(self.delayed_queue, (due_time, -execution.priority.value, execution.execution_id))
+        else:
+            self._push_ready(execution, due_time or now)
+        self._wake_scheduler()
+    
+    def _push_ready(self, execution: TaskExecution, ready_at: datetime) -> None:
+        """
+        Add a due execution to the priority queue.
+        
+        The execution is tagged after the queued executions of its project or
+        tenant, but not before the tag of the last execution taken off the
+        queue, so a project that queues a lot of work does not hold back
+        projects that queue work later.
+        
+        Args:
+            execution: Execution to queue
+            ready_at: Time the execution became due
+        """
+        key = self._fair_share_key(execution)
+        tag = max(self._fair_share_tags.get(key, 0.0), self._virtual_time)
+        self._fair_share_tags[key] = tag + 1.0 / self.fair_share_weights.get(key, 1.0)
+        
+        priority = execution.priority.value
+        self._queued[execution.execution_id] = (priority, tag, ready_at)
+        heapq.heappush(self.execution_queue, (-priority, tag, -execution.critical_path, execution.execution_id))
+        self._push_critical(execution, priority, tag)
+        if self.aging_interval and priority < TaskExecutionPriority.CRITICAL.value:
+            heapq.heappush(self._aging_queue, (ready_at + timedelta(seconds=self.aging_interval), execution.execution_id))
+    
+    @staticmethod
+    def _fair_share_key(execution: TaskExecution) -> str:
+        """Get the project or tenant an execution shares the queue as."""
+        return execution.metadata.get("tenant") or execution.project_id or ""
+    
+    def _push_critical(self, execution: TaskExecution, priority: int, tag: float) -> None:
+        """Index a queued task graph execution by critical path within its project and priority."""
+        if execution.critical_path > 0:
+            heap = self._critical_queues.setdefault((self._fair_share_key(execution), priority), [])
+            heapq.heappush(heap, (-execution.critical_path, tag, execution.execution_id))
+    
+    def _remaining_dependencies(self, execution: TaskExecution) -> int:
+        """Count the dependencies of an execution that have not completed."""
+        remaining = 0
+        for dep_id in set(execution.dependencies):
+            dep_execution = self.executions.get(dep_id)
+            if not dep_execution or dep_execution.status != TaskExecutionStatus.COMPLETED:
+                remaining += 1
+        return remaining
+    
+    def _take_critical_path(self, entry: Tuple[int, float, float, str]) -> Tuple[int, float, float, str]:
+        """
+        Give a queue entry's turn to the execution of the same project and
+        priority with the longest critical path.
+        
+        The two executions swap tags, so the project's turns, and with them
+        the fair share between projects, stay the same. Executions whose
+        concurrency key is at its limit are not swapped in.
+        
+        Args:
+            entry: Queue entry taken off the queue, matching _queued
+            
+        Returns:
+            Queue entry of the execution to start in its place
+        """
+        priority, tag, path, execution_id = entry
+        execution = self.executions.get(execution_id)
+        if execution is None:
+            return entry
+        key = (self._fair_share_key(execution), -priority)
+        heap = self._critical_queues.get(key)
+        
+        # Drop the executions that left the queue or changed priority, and
+        # park the ones with unfinished dependencies, as the scheduler would
+        # when it takes them off the queue
+        while heap:
+            other_id = heap[0][2]
+            queued = self._queued.get(other_id)
+            other = self.executions.get(other_id)
+            if queued is None or other is None or queued[0] != -priority or not other.can_execute():
+                heapq.heappop(heap)
+                continue
+            remaining = self._remaining_dependencies(other)
+            if remaining and other_id != execution_id:
+                heapq.heappop(heap)
+                del self._queued[other_id]
+                self.waiting_executions[other_id] = remaining
+                continue
+            break
+        if not heap:
+            self._critical_queues.pop(key, None)
+            return entry
+        
+        longest, _, other_id = heap[0]
+        other = self.executions.get(other_id)
+        if longest >= path or other is None or (self.concurrency_limits and self._blocked_key(other)):
+            return entry
+        
+        _, other_tag, other_ready_at = self._queued[other_id]
+        self._queued[other_id] = (-priority, tag, other_ready_at)
+        self._queued[execution_id] = (-priority, other_tag, self._queued[execution_id][2])
+        heapq.heappush(self.execution_queue, (priority, other_tag, path, execution_id))
+        return (priority, tag, longest, other_id)
+    
+    def _age(self, execution_id: str, now: datetime) -> None:
+        """
+        Raise the priority of a queued execution by a level per aging interval it has waited.
+        
+        Args:
+            execution_id: ID of the execution
+            now: Current time
+        """
+        queued = self._queued.get(execution_id)
+        execution = self.executions.get(execution_id)
+        if queued is None or execution is None:
+            return
+        
+        priority, tag, ready_at = queued
+        waited = int((now - ready_at).total_seconds() // self.aging_interval)
+        aged = min(execution.priority.value + waited, TaskExecutionPriority.CRITICAL.value)
+        if aged <= priority:
+            return
+        
+        # Queue it again at the new level, keeping its tag
+        self._queued[execution_id] = (aged, tag, ready_at)
+        heapq.heappush(self.execution_queue, (-aged, tag, -execution.critical_path, execution_id))
+        self._push_critical(execution, aged, tag)
+        if aged < TaskExecutionPriority.CRITICAL.value:
+            levels = aged - execution.priority.value + 1
+            heapq.heappush(self._aging_queue, (ready_at + timedelta(seconds=levels * self.aging_interval), execution_id))
+    
+    def _set_deadline(self, execution_id: str, deadline: datetime) -> None:
+        """
+        Set the time the current run of an execution times out.
+        
+        Args:
+            execution_id: ID of the execution
+            deadline: Time the run times out
+        """
+        self._deadlines[execution_id] = deadline
+        heapq.heappush(self.timeout_deadlines, (deadline, execution_id))
+        
+        # Drop the stale entries once they outnumber the live ones
+        if len(self.timeout_deadlines) > 2 * len(self._deadlines) + 64:
+            self.timeout_deadlines = [(deadline, execution_id) for execution_id, deadline in self._deadlines.items()]
+            heapq.heapify(self.timeout_deadlines)
+    
+    def _stop_run(self, execution_id: str) -> None:
+        """
+        Cancel the task running an execution and free its slot.
+        
+        The task's finally block still runs, so post-execution hooks and
+        dependents are handled as for any other finished run.
+        
+        Args:
+            execution_id: ID of the execution
+        """
+        self._deadlines.pop(execution_id, None)
+        task = self.running_tasks.pop(execution_id, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+        self.running_executions.discard(execution_id)
+        self._release_keys(execution_id)
+        self._wake_scheduler()
+    
+    def _wake_scheduler(self) -> None:
+        """Make the scheduler loop run a pass now instead of at its next due time."""
+        self._scheduler_event.set()
     
     async def _scheduler_loop(self) -> None:
-        """Background task for scheduling and executing tasks."""
+        """
+        Background task for scheduling and executing tasks.
+        
+        Each pass starts as many due executions as there are free slots. The
+        loop then sleeps until it is woken by newly queued work or a freed slot,
+        or until the next delayed execution is due, checking timeouts at least
+        every scheduler_interval.
+        """
         while True:
             try:
-                # Check for timed out executions
-                timed_out = []
-                for execution_id in self.running_executions:
-                    execution = self.executions.get(execution_id)
-                    if execution and execution.is_timed_out():
-                        timed_out.append(execution_id)
-                
-                # Handle timed out executions
-                for execution_id in timed_out:
-                    await self._handle_timeout(execution_id)
-                
-                # Check if we can execute more tasks
-                if len(self.running_executions) < self.max_concurrent_executions:
-                    # Get the next execution from the queue
-                    while self.execution_queue and len(self.running_executions) < self.max_concurrent_executions:
-                        # Get the highest priority execution that is ready to run
-                        now = datetime.now()
-                        if not self.execution_queue:
-                            break
-                        
-                        priority, scheduled_time, execution_id = self.execution_queue[0]
-                        
-                        # Check if it's time to execute
-                        if scheduled_time > now:
-                            # Not yet time to execute
-                            break
-                        
-                        # Remove from queue
-                        heapq.heappop(self.execution_queue)
-                        
-                        # Check if execution exists and can be executed
-                        execution = self.executions.get(execution_id)
-                        if not execution or not execution.can_execute():
-                            continue
-                        
-                        # Check if dependencies are satisfied
-                        dependencies_satisfied = True
-                        for dep_id in execution.dependencies:
-                            dep_execution = self.executions.get(dep_id)
-                            if not dep_execution or dep_execution.status != TaskExecutionStatus.COMPLETED:
-                                dependencies_satisfied = False
-                                break
-                        
-                        if not dependencies_satisfied:
-                            # Reschedule for later
-                            heapq.heappush(
-                                self.execution_queue,
-                                (priority, now + timedelta(seconds=self.scheduler_interval), execution_id)
-                            )
-                            continue
-                        
-                        # Execute the task
-                        asyncio.create_task(self._execute_task(execution_id))
-                
-                # Wait for the next scheduler interval
-                await asyncio.sleep(self.scheduler_interval)
+                # Clear before the pass so a wake-up during the pass is not lost
+                self._scheduler_event.clear()
+                delay = await self._run_scheduler_pass()
+                timer = asyncio.get_running_loop().call_later(delay, self._wake_scheduler)
+                try:
+                    await self._scheduler_event.wait()
+                finally:
+                    timer.cancel()
             except asyncio.CancelledError:
                 break
             except Exception as e:
@@ -601,6 +1291,275 @@ class TaskExecutionEngine:
                 logger.error(traceback.format_exc())
                 await asyncio.sleep(self.scheduler_interval)
     
+    async def _run_scheduler_pass(self) -> float:
+        """
+        Handle timeouts and start the due executions that fit in the free slots.
+        
+        Returns:
+            Seconds until the scheduler should run again if nothing wakes it
+        """
+        # Handle the runs whose deadline has passed
+        now = datetime.now()
+        while self.timeout_deadlines and self.timeout_deadlines[0][0] <= now:
+            deadline, execution_id = heapq.heappop(self.timeout_deadlines)
+            if self._deadlines.get(execution_id) == deadline:
+                await self._handle_timeout(execution_id)
+        
+        # Move the delayed executions that are now due to the priority queue
+        while self.delayed_queue and self.delayed_queue[0][0] <= now:
+            due_time, _, execution_id = heapq.heappop(self.delayed_queue)
+            execution = self.executions.get(execution_id)
+            if execution and execution.can_execute():
+                self._push_ready(execution, due_time)
+        
+        # Raise the priority of the executions that have waited long enough
+        while self._aging_queue and self._aging_queue[0][0] <= now:
+            _, execution_id = heapq.heappop(self._aging_queue)
+            self._age(execution_id, now)
+        
+        # With a shared queue, the local queues stay empty, and the free slots
+        # are filled with the executions claimed from the shared queue instead
+        if self.shared_queue is not None:
+            await self._sync_shared_queue(now)
+        
+        # Start the highest priority executions while there are free slots
+        while self.execution_queue and len(self.running_executions) < self.max_concurrent_executions:
+            entry = heapq.heappop(self.execution_queue)
+            priority, tag, _, execution_id = entry
+            queued = self._queued.get(execution_id)
+            if queued is None or queued[:2] != (-priority, tag):
+                continue
+            if self._critical_queues:
+                entry = self._take_critical_path(entry)
+                execution_id = entry[3]
+                queued = self._queued[execution_id]
+            
+            # Park the entry under a key at its limit, leaving it queued
+            execution = self.executions.get(execution_id)
+            blocked_key = self._blocked_key(execution) if execution and self.concurrency_limits else None
+            if blocked_key is not None:
+                self._park(blocked_key, entry)
+                continue
+            
+            del self._queued[execution_id]
+            self._virtual_time = max(self._virtual_time, tag)
+            
+            # Check if execution exists and can be executed
+            if not execution or not execution.can_execute():
+                continue
+            
+            # Park the execution until its remaining dependencies complete
+            remaining = self._remaining_dependencies(execution)
+            if remaining:
+                self.waiting_executions[execution_id] = remaining
+                continue
+            
+            self._start_execution(execution, now, queued[2])
+        
+        # Sleep until the next delayed execution, deadline, promotion or heartbeat is due
+        delay = self.scheduler_interval
+        now = datetime.now()
+        for queue in (self.delayed_queue, self.timeout_deadlines, self._aging_queue):
+            if queue:
+                delay = min(delay, max(0.0, (queue[0][0] - now).total_seconds()))
+        if self.shared_queue is not None and self.running_executions:
+            delay = min(delay, max(0.0, (self._next_heartbeat - now).total_seconds()))
+        return delay
+    
+    def _start_execution(self, execution: TaskExecution, now: datetime, ready_at: datetime) -> None:
+        """
+        Start running an execution in a free slot.
+        
+        Args:
+            execution: Execution to run
+            now: Current time
+            ready_at: Time the execution became due
+        """
+        # Take the slot now, since the task only starts after this pass
+        execution_id = execution.execution_id
+        self.wait_times[execution.priority.name.lower()].append((now - ready_at).total_seconds())
+        self.running_executions.add(execution_id)
+        self._take_keys(execution)
+        self.running_tasks[execution_id] = asyncio.create_task(self._execute_task(execution_id))
+        self._set_deadline(execution_id, now + timedelta(seconds=execution.timeout))
+    
+    def _concurrency_keys(self, execution: TaskExecution) -> List[Tuple[str, str]]:
+        """Get the keys concurrency limits can apply to an execution by."""
+        keys = [("workflow_type", execution.workflow_type)]
+        if execution.workflow_params.get("image") is not None:
+            keys.append(("image", str(execution.workflow_params["image"])))
+        if execution.assignee_id is not None:
+            keys.append(("agent", str(execution.assignee_id)))
+        return keys
+    
+    def _blocked_key(self, execution: TaskExecution) -> Optional[Tuple[str, str]]:
+        """Get a key of an execution whose concurrency limit is reached, if there is one."""
+        for key in self._concurrency_keys(execution):
+            limit = self.concurrency_limits.get(key)
+            if limit is not None and self._key_running.get(key, 0) >= limit:
+                return key
+        return None
+    
+    def _take_keys(self, execution: TaskExecution) -> None:
+        """Count a starting run against the concurrency limits of its keys."""
+        keys = self._concurrency_keys(execution)
+        self._run_keys[execution.execution_id] = keys
+        for key in keys:
+            self._key_running[key] = self._key_running.get(key, 0) + 1
+    
+    def _release_keys(self, execution_id: str) -> None:
+        """Free the keys of a finished run, queueing the entries parked under them again."""
+        for key in self._run_keys.pop(execution_id, []):
+            running = self._key_running[key] - 1
+            if running:
+                self._key_running[key] = running
+            else:
+                del self._key_running[key]
+            self._unpark(key)
+    
+    def _park(self, key: Tuple[str, str], entry: Tuple[int, float, float, str]) -> None:
+        """Park a queue entry under a key at its limit, replacing the execution's parked entry."""
+        execution_id = entry[3]
+        self._drop_parked(execution_id)
+        self._parked.setdefault(key, {})[execution_id] = entry
+        self._parked_keys[execution_id] = key
+    
+    def _drop_parked(self, execution_id: str) -> None:
+        """Remove the parked entry of an execution, if it has one."""
+        key = self._parked_keys.pop(execution_id, None)
+        if key is not None:
+            parked = self._parked[key]
+            del parked[execution_id]
+            if not parked:
+                del self._parked[key]
+    
+    def _unpark(self, key: Tuple[str, str]) -> None:
+        """Push the queue entries parked under a key back onto the queue."""
+        for execution_id, entry in self._parked.pop(key, {}).items():
+            del self._parked_keys[execution_id]
+            heapq.heappush(self.execution_queue, entry)
+    
+    def set_concurrency_limit(self, kind: str, key: str, limit: Optional[int]) -> None:
+        """
+        Set the maximum number of running executions with a key.
+        
+        The limit applies to the executions started from now on; runs already
+        started are not stopped.
+        
+        Args:
+            kind: Kind of key: "workflow_type", "image" (workflow_params["image"])
+                or "agent" (the task's assignee)
+            key: Value of the key, such as a workflow type or image name
+            limit: Maximum number of running executions, or None to remove the limit
+            
+        Raises:
+            ValueError: If the kind of key is not known
+        """
+        if kind not in CONCURRENCY_KEY_KINDS:
+            raise ValueError(f"Unknown concurrency key kind: {kind}")
+        
+        if limit is None:
+            self.concurrency_limits.pop((kind, key), None)
+        else:
+            self.concurrency_limits[(kind, key)] = limit
+        
+        # Let the parked entries try again under the new limit
+        self._unpark((kind, key))
+        self._wake_scheduler()
+    
+    def get_concurrency_limits(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Get the concurrency limits and their usage.
+        
+        Returns:
+            Dictionary mapping each kind of key to its keys, with their limit,
+            running executions and parked queue entries
+        """
+        limits: Dict[str, Dict[str, Dict[str, int]]] = {kind: {} for kind in CONCURRENCY_KEY_KINDS}
+        for (kind, key), limit in self.concurrency_limits.items():
+            limits[kind][key] = {
+                "limit": limit,
+                "running": self._key_running.get((kind, key), 0),
+                "parked": len(self._parked.get((kind, key), {})),
+            }
+        return limits
+    
+    async def _sync_shared_queue(self, now: datetime, claim: bool = True) -> None:
+        """
+        Publish the outbox to the shared queue, renew the leases of the
+        running executions when a heartbeat is due, and start the executions
+        claimed for the free slots.
+        
+        Args:
+            now: Current time
+            claim: Claim executions for the free slots
+        """
+        outbox, self._shared_outbox = self._shared_outbox, {}
+        entries = []
+        for execution_id, due_time in outbox.items():
+            execution = self.executions.get(execution_id)
+            if execution is None:
+                continue
+            if execution.can_execute():
+                entries.append((execution.to_dict(), (due_time or now).timestamp()))
+            elif execution.status in FINISHED_STATUSES:
+                entries.append((execution.to_dict(), None))
+        
+        heartbeat = bool(self.running_executions) and now >= self._next_heartbeat
+        running = list(self.running_executions) if heartbeat else []
+        limit = self.max_concurrent_executions - len(self.running_executions) if claim else 0
+        
+        def sync() -> Tuple[List[str], List[Tuple[Dict[str, Any], float, int]]]:
+            if entries:
+                self.shared_queue.publish(self.node_id, entries)
+            lost = self.shared_queue.renew(self.node_id, running, self.lease_ttl, now.timestamp())
+            claimed = self.shared_queue.claim(self.node_id, limit, self.lease_ttl, now.timestamp())
+            return lost, claimed
+        
+        try:
+            lost, claimed = await asyncio.to_thread(sync)
+        except Exception as e:
+            logger.error(f"Error syncing with the shared queue: {e}")
+            
+            # Publish them with the next pass
+            outbox.update(self._shared_outbox)
+            self._shared_outbox = outbox
+            return
+        
+        if heartbeat:
+            self._next_heartbeat = now + timedelta(seconds=self.lease_ttl / 3)
+        
+        # Another engine claimed these after their lease expired
+        for execution_id in lost:
+            if execution_id in self.running_executions:
+                logger.warning(f"Lost the lease of execution {execution_id}; stopping its run")
+                self.shared_queue_stats["lost_leases"] += 1
+                self._stop_run(execution_id)
+        
+        for data, due_at, claims in claimed:
+            execution_id = data["execution_id"]
+            if execution_id in self.running_executions:
+                # Its lease expired while it was running here, and this engine claimed it back
+                continue
+            
+            # Take over the published state, keeping the local object if there is one
+            claimed_execution = TaskExecution.from_dict(data)
+            execution = self.executions.get(execution_id)
+            if execution is None:
+                self._register_execution(claimed_execution)
+                execution = claimed_execution
+            else:
+                previous_status = execution.status
+                execution.__dict__.update(
+                    {name: value for name, value in claimed_execution.__dict__.items() if name != "status_listener"}
+                )
+                self._on_status_change(execution, previous_status)
+            
+            self.shared_queue_stats["claimed"] += 1
+            if claims > 1:
+                self.shared_queue_stats["reclaimed"] += 1
+            self._start_execution(execution, now, datetime.fromtimestamp(due_at))
+    
     async def _execute_task(self, execution_id: str) -> None:
         """
         Execute a task.
@@ -610,6 +1569,9 @@ class TaskExecutionEngine:
         """
         if execution_id not in self.executions:
             logger.warning(f"Execution {execution_id} not found")
+            self.running_executions.discard(execution_id)
+            self._release_keys(execution_id)
+            self._wake_scheduler()
             return
         
         execution = self.executions[execution_id]
@@ -652,16 +1614,25 @@ class TaskExecutionEngine:
             execution.update_status(TaskExecutionStatus.RUNNING)
             await self._save_execution(execution_id)
             
-            # Execute the workflow
-            result = await self.workflow_integration.execute_task_workflow(
-                task_id=execution.task_id,
-                workflow_type=execution.workflow_type,
-                workflow_params={
-                    **execution.workflow_params,
-                    "execution_id": execution.execution_id,
-                },
-                skip_cache=execution.metadata.get("skip_cache", False),
-            )
+            # Execute the workflow, in its backend if one runs its type
+            workflow_params = {
+                **execution.workflow_params,
+                "execution_id": execution.execution_id,
+            }
+            executor = self.workflow_executors.get(execution.workflow_type)
+            if executor is not None:
+                result = await executor.execute(
+                    task_id=execution.task_id,
+                    workflow_type=execution.workflow_type,
+                    workflow_params=workflow_params,
+                )
+            else:
+                result = await self.workflow_integration.execute_task_workflow(
+                    task_id=execution.task_id,
+                    workflow_type=execution.workflow_type,
+                    workflow_params=workflow_params,
+                    skip_cache=execution.metadata.get("skip_cache", False),
+                )
             
             # Process the result
             processed_result = await self.result_processor.process_result(
@@ -685,10 +1656,7 @@ class TaskExecutionEngine:
                     execution.prepare_for_retry()
                     
                     # Add to queue with next retry time
-                    heapq.heappush(
-                        self.execution_queue,
-                        (-execution.priority.value, execution.next_retry_at, execution_id)
-                    )
+                    self._enqueue(execution, execution.next_retry_at)
                     
                     self.stats["retried_executions"] += 1
             
@@ -720,10 +1688,7 @@ class TaskExecutionEngine:
                 execution.prepare_for_retry()
                 
                 # Add to queue with next retry time
-                heapq.heappush(
-                    self.execution_queue,
-                    (-execution.priority.value, execution.next_retry_at, execution_id)
-                )
+                self._enqueue(execution, execution.next_retry_at)
                 
                 self.stats["retried_executions"] += 1
             else:
@@ -734,8 +1699,14 @@ class TaskExecutionEngine:
                     error=str(e),
                 )
         finally:
-            # Remove from running executions
-            self.running_executions.discard(execution_id)
+            # Remove from running executions, freeing the slot, unless a
+            # timeout already did and a retry of the execution has started
+            if self.running_tasks.get(execution_id) in (None, asyncio.current_task()):
+                self.running_tasks.pop(execution_id, None)
+                self._deadlines.pop(execution_id, None)
+                self.running_executions.discard(execution_id)
+                self._release_keys(execution_id)
+            self._wake_scheduler()
             
             # Run post-execution hooks
             for hook in self.post_execution_hooks:
@@ -766,18 +1737,15 @@ class TaskExecutionEngine:
         execution.update_status(TaskExecutionStatus.TIMEOUT)
         self.stats["timed_out_executions"] += 1
         
-        # Remove from running executions
-        self.running_executions.discard(execution_id)
+        # Stop the run and remove it from running executions
+        self._stop_run(execution_id)
         
         # Check if we should retry
         if execution.should_retry():
             execution.prepare_for_retry()
             
             # Add to queue with next retry time
-            heapq.heappush(
-                self.execution_queue,
-                (-execution.priority.value, execution.next_retry_at, execution_id)
-            )
+            self._enqueue(execution, execution.next_retry_at)
             
             self.stats["retried_executions"] += 1
         else:
@@ -811,26 +1779,111 @@ class TaskExecutionEngine:
         if execution.status != TaskExecutionStatus.COMPLETED:
             return
         
-        # Check each dependent execution
+        # Count the completion against each parked dependent execution.
+        # Dependents that are still queued count their dependencies when they
+        # are taken off the queue.
         for dependent_id in self.dependency_graph.get(execution_id, set()):
-            dependent = self.executions.get(dependent_id)
-            if not dependent or not dependent.can_execute():
+            remaining = self.waiting_executions.get(dependent_id)
+            if remaining is None:
+                continue
+            if remaining > 1:
+                self.waiting_executions[dependent_id] = remaining - 1
                 continue
             
-            # Check if all dependencies are satisfied
-            dependencies_satisfied = True
-            for dep_id in dependent.dependencies:
-                dep_execution = self.executions.get(dep_id)
-                if not dep_execution or dep_execution.status != TaskExecutionStatus.COMPLETED:
-                    dependencies_satisfied = False
-                    break
-            
-            if dependencies_satisfied:
+            del self.waiting_executions[dependent_id]
+            dependent = self.executions.get(dependent_id)
+            if dependent and dependent.can_execute():
                 # Add to queue with current time and priority
-                heapq.heappush(
-                    self.execution_queue,
-                    (-dependent.priority.value, datetime.now(), dependent_id)
-                )
+                self._enqueue(dependent)
+    
+    def _queue_depth(self) -> int:
+        """Get the number of executions admitted but not started."""
+        return sum(self._status_counts.get(status, 0) for status in QUEUED_STATUSES)
+    
+    def _memory_usage(self) -> Optional[int]:
+        """Get the resident memory of the process in bytes, or None if psutil is not installed."""
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().rss
+    
+    def _admission_limit_hit(self, count: int) -> Optional[Dict[str, Any]]:
+        """
+        Check whether admitting executions would pass a limit.
+        
+        Args:
+            count: Number of executions to admit
+            
+        Returns:
+            Details of the limit hit, or None if there is room
+        """
+        if self.max_queue_depth is not None:
+            depth = self._queue_depth()
+            if depth + count > self.max_queue_depth:
+                return {"limit": "queue_depth", "queue_depth": depth, "max_queue_depth": self.max_queue_depth}
+        if self.max_memory_bytes is not None:
+            memory = self._memory_usage()
+            if memory is not None and memory > self.max_memory_bytes:
+                return {"limit": "memory", "memory_bytes": memory, "max_memory_bytes": self.max_memory_bytes}
+        return None
+    
+    def _retry_after(self, priority: TaskExecutionPriority) -> int:
+        """Estimate the seconds until there is room, from the recent queue waits of a priority."""
+        samples = self.wait_times[priority.name.lower()]
+        if not samples:
+            return max(1, math.ceil(self.scheduler_interval))
+        return max(1, math.ceil(sum(samples) / len(samples)))
+    
+    async def _admit(self, count: int, priority: Union[TaskExecutionPriority, int]) -> None:
+        """
+        Admit executions into the queue, or shed them if a limit is hit.
+        
+        Executions below admission_block_priority are rejected at once; the
+        others wait up to admission_timeout for executions to leave the queue.
+        
+        Args:
+            count: Number of executions to admit
+            priority: Priority of the executions
+            
+        Raises:
+            AdmissionRejectedError: If a limit is hit, with the seconds to wait
+                before retrying
+        """
+        priority = TaskExecutionPriority(priority)
+        start = time.monotonic()
+        limit = self._admission_limit_hit(count)
+        
+        if limit is not None and self.max_queue_depth is not None and count > self.max_queue_depth:
+            self.admission_stats["rejected"] += 1
+            raise AdmissionRejectedError(
+                f"Cannot admit {count} executions at once; the queue holds at most {self.max_queue_depth}",
+                retry_after=self._retry_after(priority),
+                details=limit,
+            )
+        
+        if limit is not None and priority >= self.admission_block_priority:
+            # Wait for executions to leave the queue, checking the memory
+            # limit at least every second
+            self.admission_stats["blocked"] += 1
+            deadline = start + self.admission_timeout
+            while limit is not None and time.monotonic() < deadline:
+                try:
+                    await asyncio.wait_for(self._queue_left.wait(), min(1.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+                limit = self._admission_limit_hit(count)
+        
+        if limit is not None:
+            self.admission_stats["rejected"] += 1
+            raise AdmissionRejectedError(
+                f"Execution queue is at its {limit['limit'].replace('_', ' ')} limit",
+                retry_after=self._retry_after(priority),
+                details=limit,
+            )
+        
+        self.admission_stats["admitted"] += count
+        self.admission_latencies.append(time.monotonic() - start)
     
     async def schedule_task(
         self,
@@ -864,7 +1917,41 @@ class TaskExecutionEngine:
             
         Returns:
             Dictionary with execution information
+            
+        Raises:
+            AdmissionRejectedError: If the queue is at a limit
         """
+        await self._admit(1, priority)
+        return await self._schedule_task(
+            task_id=task_id,
+            workflow_type=workflow_type,
+            priority=priority,
+            workflow_params=workflow_params,
+            retry_strategy=retry_strategy,
+            max_retries=max_retries,
+            retry_delay=retry_delay,
+            timeout=timeout,
+            dependencies=dependencies,
+            scheduled_time=scheduled_time,
+            metadata=metadata,
+        )
+    
+    async def _schedule_task(
+        self,
+        task_id: str,
+        workflow_type: str,
+        priority: Union[TaskExecutionPriority, int],
+        workflow_params: Optional[Dict[str, Any]],
+        retry_strategy: Union[RetryStrategy, str],
+        max_retries: int,
+        retry_delay: int,
+        timeout: int,
+        dependencies: Optional[List[str]],
+        scheduled_time: Optional[datetime],
+        metadata: Optional[Dict[str, Any]],
+        critical_path: float = 0.0,
+    ) -> Dict[str, Any]:
+        """Create and queue an execution that was admitted; see schedule_task."""
         # Check if the task exists
         task = self.task_manager.get_task(task_id)
         if not task:
@@ -886,10 +1973,13 @@ class TaskExecutionEngine:
             timeout=timeout,
             dependencies=dependencies or [],
             metadata=metadata or {},
+            project_id=task.project_id,
+            assignee_id=task.assignee_id,
+            critical_path=critical_path,
         )
         
         # Add to registry
-        self.executions[execution_id] = execution
+        self._register_execution(execution)
         
         # Update dependency graph
         for dep_id in execution.dependencies:
@@ -906,10 +1996,7 @@ class TaskExecutionEngine:
             execution.update_status(TaskExecutionStatus.PENDING)
         
         # Add to queue
-        heapq.heappush(
-            self.execution_queue,
-            (-execution.priority.value, scheduled_time, execution_id)
-        )
+        self._enqueue(execution, scheduled_time)
         
         # Update statistics
         self.stats["total_executions"] += 1
@@ -957,7 +2044,12 @@ class TaskExecutionEngine:
             
         Returns:
             Dictionary with execution information for each task
+            
+        Raises:
+            AdmissionRejectedError: If the queue has no room for the whole batch
         """
+        await self._admit(len(task_ids), priority)
+        
         results = {
             "successful": [],
             "failed": []
@@ -965,7 +2057,7 @@ class TaskExecutionEngine:
         
         for task_id in task_ids:
             try:
-                result = await self.schedule_task(
+                result = await self._schedule_task(
                     task_id=task_id,
                     workflow_type=workflow_type,
                     priority=priority,
@@ -1003,8 +2095,15 @@ class TaskExecutionEngine:
         """
         Schedule a graph of tasks for execution.
         
+        Each execution is given the estimated length of the longest chain of
+        executions from its start to the end of the graph, from the mean run
+        time of the workflow type or a task's "estimated_duration" metadata.
+        Fair share decides which project or tenant starts an execution next,
+        and that project's queued execution of the priority with the longest
+        chain takes the turn, so long chains do not stretch the graph's run.
+        
         Args:
-            task_graph: Dictionary mapping task IDs to lists of dependent task IDs
+            task_graph: Dictionary mapping task IDs to lists of the task IDs they depend on
             workflow_type: Type of workflow to execute
             priority: Priority of the executions
             workflow_params: Parameters for the workflows, keyed by task ID
@@ -1017,6 +2116,9 @@ class TaskExecutionEngine:
             
         Returns:
             Dictionary with execution information for each task
+            
+        Raises:
+            AdmissionRejectedError: If the queue has no room for the whole graph
         """
         # Validate the task graph
         for task_id, dependencies in task_graph.items():
@@ -1028,9 +2130,19 @@ class TaskExecutionEngine:
                 if dep_id not in task_graph:
                     raise ValueError(f"Dependency task not in graph: {dep_id}")
         
+        await self._admit(len(task_graph), priority)
+        
         # Topologically sort the task graph
         sorted_tasks = self._topological_sort(task_graph)
         
+        # Estimate the critical path of each task
+        default_duration = self._estimate_duration(workflow_type)
+        durations = {
+            task_id: max(float((metadata or {}).get(task_id, {}).get("estimated_duration", default_duration)), 0.0)
+            for task_id in task_graph
+        }
+        critical_paths = critical_path_lengths(task_graph, durations)
+        
         # Schedule tasks in topological order
         execution_map = {}  # task_id -> execution_id
         results = {
@@ -1048,7 +2160,7 @@ class TaskExecutionEngine:
             task_metadata = metadata.get(task_id, {}) if metadata else {}
             
             # Schedule the task
-            result = await self.schedule_task(
+            result = await self._schedule_task(
                 task_id=task_id,
                 workflow_type=workflow_type,
                 priority=priority,
@@ -1060,6 +2172,7 @@ class TaskExecutionEngine:
                 dependencies=execution_deps,
                 scheduled_time=scheduled_time,
                 metadata=task_metadata,
+                critical_path=critical_paths[task_id],
             )
             
             # Add to results
@@ -1073,11 +2186,14 @@ class TaskExecutionEngine:
         Topologically sort a directed acyclic graph.
         
         Args:
-            graph: Dictionary mapping nodes to lists of dependent nodes
+            graph: Dictionary mapping nodes to lists of the nodes they depend on
             
         Returns:
             List of nodes in topological order
         """
+        # Work on a copy, as the graph's dependency lists are used afterwards
+        graph = {node: list(deps) for node, deps in graph.items()}
+        
         # Create a reversed graph (dependencies -> node)
         reversed_graph = {}
         for node, deps in graph.items():
@@ -1135,9 +2251,10 @@ class TaskExecutionEngine:
             }
         
         # Cancel the execution
-        if execution.status == TaskExecutionStatus.RUNNING:
-            # Remove from running executions
-            self.running_executions.discard(execution_id)
+        if execution_id in self.running_executions:
+            # Stop the task running it, which also covers an execution that has
+            # been taken off the queue but not marked as running yet
+            self._stop_run(execution_id)
             
             # Cancel the workflow if it has one
             if execution.workflow_id:
@@ -1153,12 +2270,23 @@ class TaskExecutionEngine:
                         )
                 except Exception as e:
                     logger.warning(f"Error cancelling workflow: {e}")
-        elif execution.status in (TaskExecutionStatus.PENDING, TaskExecutionStatus.SCHEDULED, TaskExecutionStatus.RETRYING):
-            # Remove from queue
-            self.execution_queue = [
-                (p, t, e) for p, t, e in self.execution_queue if e != execution_id
-            ]
-            heapq.heapify(self.execution_queue)
+        else:
+            # Leave its queue entries behind; they no longer match _queued, or
+            # the execution can no longer run, so they are skipped when popped
+            self._queued.pop(execution_id, None)
+            self._drop_parked(execution_id)
+            self.waiting_executions.pop(execution_id, None)
+            
+            # Drop the dead entries once they outnumber the queued executions
+            if len(self.execution_queue) > 2 * len(self._queued) + 64:
+                self.execution_queue = [
+                    (-priority, tag, -self.executions[queued_id].critical_path, queued_id)
+                    for queued_id, (priority, tag, _) in self._queued.items()
+                ]
+                heapq.heapify(self.execution_queue)
+                self._critical_queues = {}
+                for queued_id, (priority, tag, _) in self._queued.items():
+                    self._push_critical(self.executions[queued_id], priority, tag)
         
         # Update status
         execution.update_status(TaskExecutionStatus.CANCELLED)
@@ -1176,6 +2304,66 @@ class TaskExecutionEngine:
             "message": "Execution cancelled successfully"
         }
     
+    async def cancel_executions(
+        self,
+        execution_ids: Optional[List[str]] = None,
+        task_id: Optional[str] = None,
+        project_id: Optional[str] = None,
+        include_dependents: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Cancel every unfinished execution matching all of the given filters.
+        
+        Args:
+            execution_ids: Only cancel these executions
+            task_id: Only cancel executions of this task
+            project_id: Only cancel executions of tasks in this project
+            include_dependents: Also cancel the executions that depend on a
+                cancelled execution, directly or indirectly, such as the rest
+                of a task graph
+                
+        Returns:
+            Dictionary with the IDs of the cancelled executions
+        """
+        if execution_ids is None and task_id is None and project_id is None:
+            raise ValueError("At least one filter is required")
+        
+        candidates = self.executions if execution_ids is None else {
+            execution_id: self.executions[execution_id]
+            for execution_id in execution_ids
+            if execution_id in self.executions
+        }
+        matched = [
+            execution_id
+            for execution_id, execution in candidates.items()
+            if not execution.is_complete()
+            and (task_id is None or execution.task_id == task_id)
+            and (project_id is None or execution.project_id == project_id)
+        ]
+        
+        # Walk the dependency graph from the matched executions
+        if include_dependents:
+            seen = set(matched)
+            stack = list(matched)
+            while stack:
+                for dependent_id in self.dependency_graph.get(stack.pop(), ()):
+                    if dependent_id not in seen:
+                        seen.add(dependent_id)
+                        stack.append(dependent_id)
+                        matched.append(dependent_id)
+        
+        cancelled = []
+        for execution_id in matched:
+            execution = self.executions.get(execution_id)
+            if execution and not execution.is_complete():
+                await self.cancel_execution(execution_id)
+                cancelled.append(execution_id)
+        
+        return {
+            "cancelled": cancelled,
+            "count": len(cancelled)
+        }
+    
     async def get_execution(self, execution_id: str) -> Optional[Dict[str, Any]]:
         """
         Get information about a task execution.
@@ -1211,12 +2399,44 @@ class TaskExecutionEngine:
             "workflow_status": workflow_status
         }
     
+    async def get_execution_history(self, execution_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the full status history of a task execution, including the
+        entries compacted out of it.
+        
+        Args:
+            execution_id: ID of the execution
+            
+        Returns:
+            List of status history entries, oldest first, or None if not found
+        """
+        if execution_id not in self.executions:
+            return None
+        
+        # Hold the persist lock so no archive write is half done
+        async with self._persist_lock:
+            path = self._history_path(execution_id)
+            archived = await asyncio.to_thread(self._read_archived_history, path)
+            return (
+                archived
+                + self._unarchived_history.get(execution_id, [])
+                + list(self.executions[execution_id].status_history)
+            )
+    
+    def _read_archived_history(self, path: str) -> List[Dict[str, Any]]:
+        """Read the entries of a status history archive, if there is one."""
+        if not os.path.exists(path):
+            return []
+        with open(path, "r") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    
     async def list_executions(
         self,
         status: Optional[Union[TaskExecutionStatus, str]] = None,
         task_id: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
+        include_history: bool = True,
     ) -> Dict[str, Any]:
         """
         List task executions.
@@ -1226,37 +2446,38 @@ class TaskExecutionEngine:
             task_id: Filter by task ID
             limit: Maximum number of executions to return
             offset: Number of executions to skip
+            include_history: Include the recent status history of each execution
             
         Returns:
             Dictionary with execution information
         """
-        # Filter executions
-        filtered_executions = []
-        for execution_id, execution in self.executions.items():
-            # Filter by status
-            if status:
-                status_value = status.value if isinstance(status, TaskExecutionStatus) else status
-                if execution.status != status_value:
-                    continue
-            
-            # Filter by task ID
-            if task_id and execution.task_id != task_id:
-                continue
-            
-            filtered_executions.append(execution)
-        
-        # Sort by creation time (newest first)
-        filtered_executions.sort(key=lambda e: e.created_at, reverse=True)
+        # Start from the index of the filter with the fewest executions
+        orders = [self._execution_order.get(("all", ""), [])]
+        if status:
+            status_value = status.value if isinstance(status, TaskExecutionStatus) else status
+            orders.append(self._execution_order.get(("status", status_value), []))
+        if task_id:
+            orders.append(self._execution_order.get(("task", task_id), []))
+        order = min(orders, key=len)
+        
+        # Filter by the other condition only when both are given
+        if status and task_id:
+            order = [
+                entry for entry in order
+                if self.executions[entry[1]].status == status_value and self.executions[entry[1]].task_id == task_id
+            ]
         
-        # Apply pagination
-        paginated_executions = filtered_executions[offset:offset + limit]
+        # Page through from the newest execution
+        end = max(len(order) - offset, 0)
+        start = max(end - limit, 0)
+        paginated_executions = [self.executions[execution_id] for _, execution_id in reversed(order[start:end])]
         
         # Convert to dictionaries
-        execution_dicts = [execution.to_dict() for execution in paginated_executions]
+        execution_dicts = [execution.to_dict(include_history) for execution in paginated_executions]
         
         return {
             "executions": execution_dicts,
-            "total": len(filtered_executions),
+            "total": len(order),
             "limit": limit,
             "offset": offset
         }
@@ -1269,26 +2490,56 @@ class TaskExecutionEngine:
             Dictionary with execution statistics
         """
         # Count executions by status
-        status_counts = {}
-        for execution in self.executions.values():
-            status = execution.status
-            if status not in status_counts:
-                status_counts[status] = 0
-            status_counts[status] += 1
+        status_counts = {status: count for status, count in self._status_counts.items() if count}
         
         # Get queue length
-        queue_length = len(self.execution_queue)
+        queue_length = len(self._queued) + len(self.delayed_queue)
+        
+        # Summarize the queue wait of the recently started executions of each priority
+        wait_times = {priority: self._summarize_seconds(samples) for priority, samples in self.wait_times.items()}
         
         # Get running count
         running_count = len(self.running_executions)
         
-        return {
+        stats = {
             **self.stats,
             "status_counts": status_counts,
             "queue_length": queue_length,
+            "waiting_count": len(self.waiting_executions),
+            "wait_times": wait_times,
             "running_count": running_count,
             "total_count": len(self.executions)
         }
+        stats["workflow_durations"] = {
+            workflow_type: {"count": count, "mean_seconds": mean}
+            for workflow_type, (count, mean) in self._workflow_durations.items()
+        }
+        stats["concurrency_limits"] = self.get_concurrency_limits()
+        stats["admission"] = {
+            **self.admission_stats,
+            "queue_depth": self._queue_depth(),
+            "max_queue_depth": self.max_queue_depth,
+            "memory_bytes": self._memory_usage(),
+            "max_memory_bytes": self.max_memory_bytes,
+            "latency": self._summarize_seconds(self.admission_latencies),
+        }
+        if self.shared_queue is not None:
+            stats["shared_queue"] = {
+                "node_id": self.node_id,
+                **self.shared_queue_stats,
+                **await asyncio.to_thread(self.shared_queue.counts),
+            }
+        return stats
+    
+    def _summarize_seconds(self, samples: deque) -> Dict[str, float]:
+        """Summarize a window of durations in seconds."""
+        ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "mean_seconds": sum(ordered) / len(ordered) if ordered else 0.0,
+            "p95_seconds": ordered[int(0.95 * (len(ordered) - 1))] if ordered else 0.0,
+            "max_seconds": ordered[-1] if ordered else 0.0,
+        }
     
     def add_pre_execution_hook(self, hook: Callable[[TaskExecution], None]) -> None:
         """
@@ -1319,6 +2570,20 @@ def get_task_execution_engine(
     data_dir: Optional[str] = None,
     dagger_config_path: Optional[str] = None,
     templates_dir: Optional[str] = None,
+    aging_interval: int = 300,
+    fair_share_weights: Optional[Dict[str, float]] = None,
+    persist_interval: float = 1.0,
+    max_status_history: int = 100,
+    workflow_executors: Optional[List[WorkflowExecutor]] = None,
+    shared_queue: Optional[SharedExecutionQueue] = None,
+    node_id: Optional[str] = None,
+    lease_ttl: float = 30.0,
+    max_queue_depth: Optional[int] = None,
+    max_memory_bytes: Optional[int] = None,
+    admission_block_priority: Union[TaskExecutionPriority, int] = TaskExecutionPriority.HIGH,
+    admission_timeout: float = 30.0,
+    concurrency_limits: Optional[Dict[str, Dict[str, int]]] = None,
+    default_task_duration: float = 60.0,
 ) -> TaskExecutionEngine:
     """
     Get the singleton instance of the task execution engine.
@@ -1329,6 +2594,21 @@ def get_task_execution_engine(
         data_dir: Directory for storing task execution data
         dagger_config_path: Path to the Dagger configuration file
         templates_dir: Directory containing pipeline templates
+        aging_interval: Seconds a queued execution waits before its priority is raised
+        fair_share_weights: Share of the queue of each project or tenant
+        persist_interval: Seconds execution changes are collected before they are written
+        max_status_history: Number of status history entries kept with an execution
+        workflow_executors: Backends running selected workflow types; defaults to
+            the executors configured in config/default.yaml
+        shared_queue: Work queue shared with other engines
+        node_id: ID of this engine in the shared queue
+        lease_ttl: Seconds a claimed execution stays leased without a heartbeat
+        max_queue_depth: Maximum number of executions admitted but not started
+        max_memory_bytes: Resident memory above which new executions are not admitted
+        admission_block_priority: Priority from which scheduling waits for room instead of being rejected
+        admission_timeout: Seconds scheduling waits for room before it is rejected
+        concurrency_limits: Maximum number of running executions per workflow type, image or agent
+        default_task_duration: Estimated seconds of a workflow type no execution has completed yet
         
     Returns:
         TaskExecutionEngine instance
@@ -1341,6 +2621,20 @@ def get_task_execution_engine(
             data_dir=data_dir,
             dagger_config_path=dagger_config_path,
             templates_dir=templates_dir,
+            aging_interval=aging_interval,
+            fair_share_weights=fair_share_weights,
+            persist_interval=persist_interval,
+            max_status_history=max_status_history,
+            workflow_executors=workflow_executors if workflow_executors is not None else load_workflow_executors(),
+            shared_queue=shared_queue,
+            node_id=node_id,
+            lease_ttl=lease_ttl,
+            max_queue_depth=max_queue_depth,
+            max_memory_bytes=max_memory_bytes,
+            admission_block_priority=admission_block_priority,
+            admission_timeout=admission_timeout,
+            concurrency_limits=concurrency_limits,
+            default_task_duration=default_task_duration,
         )
         
         # Initialize the engine
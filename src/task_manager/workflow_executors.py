@@ -0,0 +1,280 @@
+"""
+Workflow Executors for the Task Execution Engine.
+
+This module provides backends the task execution engine can hand selected
+workflow types to, instead of running them on its event loop. CPU-bound
+local workflows run in a pool of worker processes, so they neither hold the
+GIL nor stall the scheduler.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "config",
+    "default.yaml",
+)
+
+
+class SharedBytes(NamedTuple):
+    """Reference to a bytes value passed to a worker process in shared memory."""
+    name: str
+    size: int
+
+
+class WorkflowExecutor:
+    """
+    Base class of the backends that run workflows for the task execution engine.
+
+    A backend runs the workflow types it lists; the engine runs every other
+    type through its workflow integration.
+    """
+
+    def __init__(self, workflow_types: List[str]):
+        """
+        Initialize a WorkflowExecutor.
+
+        Args:
+            workflow_types: Workflow types this backend runs
+        """
+        self.workflow_types = list(workflow_types)
+
+    async def start(self) -> None:
+        """Start the backend."""
+
+    async def shutdown(self) -> None:
+        """Stop the backend."""
+
+    async def execute(
+        self,
+        task_id: str,
+        workflow_type: str,
+        workflow_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Run a workflow.
+
+        Args:
+            task_id: Task ID
+            workflow_type: Workflow type
+            workflow_params: Workflow parameters
+
+        Returns:
+            Workflow execution result, with a "success" field
+        """
+        raise NotImplementedError
+
+
+# Functions of the workflow types, resolved once per worker process
+_worker_functions: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def _resolve_function(path: str) -> Callable[[Dict[str, Any]], Any]:
+    """Import a function from a "module:attribute" path."""
+    function = _worker_functions.get(path)
+    if function is None:
+        module_name, _, attribute = path.partition(":")
+        function = getattr(importlib.import_module(module_name), attribute)
+        _worker_functions[path] = function
+    return function
+
+
+def _init_worker(paths: List[str]) -> None:
+    """Import the workflow functions when a worker process starts."""
+    for path in paths:
+        _resolve_function(path)
+
+
+def _warm_up() -> int:
+    """Run in each worker at start, so the pool is spawned before it is needed."""
+    return os.getpid()
+
+
+def _unshare(value: Any) -> Any:
+    """Replace the shared memory references in a value with their bytes."""
+    if isinstance(value, SharedBytes):
+        block = SharedMemory(name=value.name)
+        try:
+            return bytes(block.buf[:value.size])
+        finally:
+            block.close()
+    if isinstance(value, dict):
+        return {key: _unshare(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_unshare(item) for item in value]
+    return value
+
+
+def _run_workflow(path: str, workflow_params: Dict[str, Any]) -> Any:
+    """Run a workflow function in a worker process."""
+    return _resolve_function(path)(_unshare(workflow_params))
+
+
+class ProcessPoolWorkflowExecutor(WorkflowExecutor):
+    """
+    Workflow executor running workflow functions in a pool of worker processes.
+
+    Each workflow type maps to a function, given as "module:attribute", that
+    takes the workflow parameters and returns the workflow output. The workers
+    are started and import the functions when the executor starts. Bytes
+    values of at least shared_memory_threshold bytes in the parameters are
+    passed in shared memory rather than through the pool's pipe.
+
+    A cancelled run, for example after a timeout, frees its slot at once, but
+    its worker finishes the function call before taking new work.
+    """
+
+    def __init__(
+        self,
+        workflows: Dict[str, Dict[str, Any]],
+        max_workers: Optional[int] = None,
+        shared_memory_threshold: int = 65536
+    ):
+        """
+        Initialize a ProcessPoolWorkflowExecutor.
+
+        Args:
+            workflows: Workflow type -> {"function": "module:attribute",
+                "max_concurrent": runs of the type at a time, optional}
+            max_workers: Number of worker processes; defaults to the CPU count
+            shared_memory_threshold: Size in bytes from which bytes values are
+                passed in shared memory
+        """
+        super().__init__(list(workflows))
+        self.functions = {workflow_type: spec["function"] for workflow_type, spec in workflows.items()}
+        self.limits = {
+            workflow_type: spec["max_concurrent"]
+            for workflow_type, spec in workflows.items()
+            if spec.get("max_concurrent")
+        }
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shared_memory_threshold = shared_memory_threshold
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def start(self) -> None:
+        """Start the worker processes and wait until they are ready."""
+        if self._pool is not None:
+            return
+
+        # Spawned rather than forked workers, as the engine process has
+        # threads and an event loop that a fork would copy mid-flight
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(sorted(set(self.functions.values())),),
+        )
+        self._semaphores = {
+            workflow_type: asyncio.Semaphore(limit) for workflow_type, limit in self.limits.items()
+        }
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up) for _ in range(self.max_workers)))
+        logger.info(f"Started {self.max_workers} workflow worker processes for {', '.join(self.workflow_types)}")
+
+    async def shutdown(self) -> None:
+        """Stop the worker processes, dropping the runs not started yet."""
+        if self._pool is None:
+            return
+
+        pool, self._pool = self._pool, None
+        await asyncio.to_thread(pool.shutdown, True, cancel_futures=True)
+
+    async def execute(
+        self,
+        task_id: str,
+        workflow_type: str,
+        workflow_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Run a workflow function in a worker process.
+
+        Args:
+            task_id: Task ID
+            workflow_type: Workflow type
+            workflow_params: Workflow parameters
+
+        Returns:
+            Workflow execution result, with the function's output as "result"
+        """
+        if self._pool is None:
+            await self.start()
+
+        semaphore = self._semaphores.get(workflow_type)
+        if semaphore is not None:
+            await semaphore.acquire()
+        blocks: List[SharedMemory] = []
+        try:
+            params = self._share(workflow_params, blocks)
+            output = await asyncio.get_running_loop().run_in_executor(
+                self._pool, _run_workflow, self.functions[workflow_type], params
+            )
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            if semaphore is not None:
+                semaphore.release()
+
+        return {
+            "task_id": task_id,
+            "workflow_type": workflow_type,
+            "status": "completed",
+            "success": True,
+            "result": output,
+        }
+
+    def _share(self, value: Any, blocks: List[SharedMemory]) -> Any:
+        """Move large bytes values into shared memory, collecting the blocks created."""
+        if isinstance(value, (bytes, bytearray, memoryview)) and len(value) >= self.shared_memory_threshold:
+            data = memoryview(value).cast("B")
+            block = SharedMemory(create=True, size=data.nbytes)
+            blocks.append(block)
+            block.buf[:data.nbytes] = data
+            return SharedBytes(block.name, data.nbytes)
+        if isinstance(value, dict):
+            return {key: self._share(item, blocks) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._share(item, blocks) for item in value]
+        return value
+
+
+def load_workflow_executors(config_path: Optional[str] = None) -> List[WorkflowExecutor]:
+    """
+    Create the workflow executors configured in the task_execution section of
+    a configuration file.
+
+    Args:
+        config_path: Path to the configuration file; defaults to config/default.yaml
+
+    Returns:
+        List of workflow executors, empty if none are configured
+    """
+    config_path = config_path or DEFAULT_CONFIG_PATH
+    try:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        return []
+
+    executors: List[WorkflowExecutor] = []
+    pool_config = ((config.get("task_execution") or {}).get("executors") or {}).get("process_pool") or {}
+    if pool_config.get("workflows"):
+        executors.append(ProcessPoolWorkflowExecutor(
+            workflows=pool_config["workflows"],
+            max_workers=pool_config.get("max_workers"),
+            shared_memory_threshold=pool_config.get("shared_memory_threshold", 65536),
+        ))
+    return executors
@@ -0,0 +1,135 @@
+"""
+Tests for the shared execution queue.
+
+This module contains tests for the SQLiteExecutionQueue class.
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.shared_queue import SQLiteExecutionQueue
+
+
+def execution(execution_id, priority=1, status="pending", dependencies=None):
+    """Build the published data of an execution."""
+    return {
+        "execution_id": execution_id,
+        "priority": priority,
+        "status": status,
+        "dependencies": dependencies or [],
+    }
+
+
+def claim_all(db_path, node_id, results):
+    """Claim executions one at a time until none are left, reporting their IDs."""
+    queue = SQLiteExecutionQueue(db_path)
+    claimed = []
+    while True:
+        entries = queue.claim(node_id, 1, lease_ttl=60)
+        if not entries:
+            break
+        claimed.extend(data["execution_id"] for data, _, _ in entries)
+    queue.close()
+    results.put(claimed)
+
+
+class TestSQLiteExecutionQueue(unittest.TestCase):
+    """Tests for the SQLiteExecutionQueue class."""
+
+    def setUp(self):
+        """Open the queue database from two nodes."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "queue.db")
+        self.node_a = SQLiteExecutionQueue(self.db_path)
+        self.node_b = SQLiteExecutionQueue(self.db_path)
+
+    def tearDown(self):
+        self.node_a.close()
+        self.node_b.close()
+        self.temp_dir.cleanup()
+
+    def test_claim_and_lease_expiry(self):
+        """Test that leases are exclusive until they expire."""
+        self.node_a.publish("a", [
+            (execution("exec_low", priority=0), 100.0),
+            (execution("exec_high", priority=2), 100.0),
+            (execution("exec_medium", priority=1), 100.0),
+            (execution("exec_later", priority=3), 500.0),
+        ])
+
+        claimed = self.node_a.claim("a", 2, lease_ttl=30, now=200.0)
+        self.assertEqual([data["execution_id"] for data, _, _ in claimed], ["exec_high", "exec_medium"])
+        self.assertEqual([data["execution_id"] for data, _, _ in self.node_b.claim("b", 5, 30, now=200.0)], ["exec_low"])
+        self.assertEqual(self.node_b.claim("b", 5, 30, now=200.0), [])
+        self.assertEqual(self.node_a.counts(), {"queued": 1, "leased": 3, "done": 0})
+
+        # A heartbeat keeps the leases; node b cannot renew node a's
+        self.assertEqual(self.node_a.renew("a", ["exec_high", "exec_medium"], 30, now=220.0), [])
+        self.assertEqual(self.node_b.renew("b", ["exec_high"], 30, now=220.0), ["exec_high"])
+        self.assertEqual(self.node_b.renew("b", ["exec_low"], 30, now=240.0), [])
+
+        # Without heartbeats, the leases expire and another node claims them
+        reclaimed = self.node_b.claim("b", 5, 30, now=260.0)
+        self.assertEqual([(data["execution_id"], claims) for data, _, claims in reclaimed], [
+            ("exec_high", 2), ("exec_medium", 2),
+        ])
+        self.assertEqual(self.node_a.renew("a", ["exec_high"], 30, now=261.0), ["exec_high"])
+
+        # Node a's results are ignored, node b's are kept
+        self.node_a.publish("a", [(execution("exec_high", priority=2, status="completed"), None)])
+        self.node_b.publish("b", [(execution("exec_medium", priority=1, status="failed"), None)])
+        self.assertEqual(self.node_a.counts(), {"queued": 1, "leased": 2, "done": 1})
+
+    def test_dependencies_and_done(self):
+        """Test that executions are claimed once their dependencies completed, and done ones stay done."""
+        self.node_a.publish("a", [
+            (execution("exec_first"), 100.0),
+            (execution("exec_second", priority=3, dependencies=["exec_first"]), 100.0),
+        ])
+
+        self.assertEqual([data["execution_id"] for data, _, _ in self.node_a.claim("a", 5, 30, now=100.0)], ["exec_first"])
+        self.node_a.publish("a", [(execution("exec_first", status="completed"), None)])
+        self.assertEqual([data["execution_id"] for data, _, _ in self.node_b.claim("b", 5, 30, now=100.0)], ["exec_second"])
+
+        self.node_a.publish("a", [(execution("exec_first"), 100.0)])
+        self.assertEqual(self.node_a.claim("a", 5, 30, now=100.0), [])
+
+    def test_published_executions(self):
+        """Test that executions published from TaskExecution.to_dict() are claimed once their dependencies completed."""
+        from src.task_manager.task_execution_engine import TaskExecution, TaskExecutionStatus
+
+        first = TaskExecution(task_id="task_1", execution_id="exec_first")
+        second = TaskExecution(task_id="task_2", execution_id="exec_second", dependencies=["exec_first"])
+        self.node_a.publish("a", [(first.to_dict(), 100.0), (second.to_dict(), 100.0)])
+        self.assertEqual([data["execution_id"] for data, _, _ in self.node_a.claim("a", 5, 30, now=100.0)], ["exec_first"])
+
+        first.update_status(TaskExecutionStatus.COMPLETED)
+        self.node_a.publish("a", [(first.to_dict(), None)])
+        self.assertEqual([data["execution_id"] for data, _, _ in self.node_b.claim("b", 5, 30, now=100.0)], ["exec_second"])
+
+    def test_claims_from_several_processes(self):
+        """Test that every execution is claimed exactly once by competing processes."""
+        self.node_a.publish("a", [(execution(f"exec_{i}"), 0.0) for i in range(60)])
+
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        processes = [
+            context.Process(target=claim_all, args=(self.db_path, f"node_{i}", results)) for i in range(3)
+        ]
+        for process in processes:
+            process.start()
+        claimed = [execution_id for _ in processes for execution_id in results.get(timeout=30)]
+        for process in processes:
+            process.join(timeout=30)
+
+        self.assertEqual(sorted(claimed), sorted(f"exec_{i}" for i in range(60)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+"""
+Tests for the SQLite Task Manager.
+
+This module contains tests for the SQLiteTaskManager class.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.manager import TaskManager, TaskStatus, get_task_manager
+from src.task_manager.sqlite_manager import SQLiteTaskManager
+
+
+class TestSQLiteTaskManager(unittest.TestCase):
+    """Tests for the SQLiteTaskManager class."""
+
+    def setUp(self):
+        """Create a task manager with a project, a phase and a few tasks."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = SQLiteTaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project", {"owner": "team"})
+        self.phase = self.task_manager.create_phase(self.project.id, "Phase", "", 0)
+        self.tasks = [
+            self.task_manager.create_task(
+                name=f"Task {i}",
+                description="",
+                project_id=self.project.id,
+                status=TaskStatus.PLANNED.value,
+                phase_id=self.phase.id,
+                assignee_id="agent-1",
+                assignee_type="agent" if i % 2 else "user",
+                metadata={"index": i},
+            )
+            for i in range(4)
+        ]
+
+    def tearDown(self):
+        self.task_manager.close()
+        self.temp_dir.cleanup()
+
+    def test_crud_round_trip(self):
+        """Test that created and updated rows read back as model objects."""
+        task = self.task_manager.get_task(self.tasks[0].id)
+        self.assertEqual(task.to_dict(), self.tasks[0].to_dict())
+
+        updated = self.task_manager.update_task(
+            self.tasks[0].id,
+            status=TaskStatus.COMPLETED,
+            progress=100.0,
+            result={"output": "done"},
+        )
+        self.assertEqual(updated.status, TaskStatus.COMPLETED.value)
+        self.assertEqual(updated.result, {"output": "done"})
+        self.assertEqual(updated.metadata, {"index": 0})
+
+        project = self.task_manager.projects[self.project.id]
+        self.assertEqual(project.metadata, {"owner": "team"})
+        self.assertEqual(list(project.tasks), [task.id for task in self.tasks])
+        self.assertEqual(list(project.phases), [self.phase.id])
+
+        self.assertIsNone(self.task_manager.update_task("task-missing", name="Missing"))
+        self.assertIsNone(self.task_manager.create_task("Orphan", "", "project-missing", "planned"))
+
+    def test_delete_project_cascades(self):
+        """Test that deleting a project removes its phases and tasks."""
+        self.assertTrue(self.task_manager.delete_task(self.tasks[0].id))
+        self.assertFalse(self.task_manager.delete_task(self.tasks[0].id))
+        self.assertTrue(self.task_manager.delete_project(self.project.id))
+
+        self.assertEqual(len(self.task_manager.projects), 0)
+        self.assertIsNone(self.task_manager.get_phase(self.phase.id))
+        self.assertIsNone(self.task_manager.get_task(self.tasks[1].id))
+
+    def test_queries(self):
+        """Test the indexed queries and SQL pagination."""
+        self.task_manager.update_task(self.tasks[1].id, status=TaskStatus.IN_PROGRESS.value)
+
+        self.assertEqual(
+            [task.id for task in self.task_manager.get_tasks_by_status(self.project.id, TaskStatus.PLANNED)],
+            [self.tasks[0].id, self.tasks[2].id, self.tasks[3].id],
+        )
+        self.assertEqual(len(self.task_manager.get_tasks_by_phase(self.project.id, self.phase.id)), 4)
+        self.assertEqual(len(self.task_manager.get_tasks_by_assignee("agent-1")), 4)
+        self.assertEqual(len(self.task_manager.get_tasks_by_assignee("agent-1", "agent")), 2)
+
+        counts = self.task_manager.count_tasks_by_status(self.project.id)
+        self.assertEqual(counts[TaskStatus.PLANNED.value], 3)
+        self.assertEqual(counts[TaskStatus.COMPLETED.value], 0)
+
+        # Most recently updated first
+        first_page = self.task_manager.query_tasks(project_id=self.project.id, limit=2)
+        second_page = self.task_manager.query_tasks(project_id=self.project.id, limit=2, offset=2)
+        self.assertEqual(first_page[0].id, self.tasks[1].id)
+        self.assertEqual(len({task.id for task in first_page + second_page}), 4)
+        self.assertEqual(self.task_manager.count_tasks(assignee_id="agent-1", assignee_type="user"), 2)
+        self.assertEqual(
+            self.task_manager.query_tasks(updated_since=datetime(2100, 1, 1)),
+            [],
+        )
+
+    def test_bulk_operations(self):
+        """Test that bulk operations apply whole batches or nothing."""
+        specs = [
+            {"name": f"Bulk {i}", "description": "", "project_id": self.project.id, "status": "planned"}
+            for i in range(5)
+        ]
+        created = self.task_manager.create_tasks_bulk(specs)
+        self.assertEqual(self.task_manager.count_tasks(project_id=self.project.id), 9)
+
+        updated = self.task_manager.update_tasks_bulk([
+            {"task_id": task.id, "status": TaskStatus.COMPLETED, "metadata": {"bulk": True}} for task in created
+        ])
+        self.assertEqual({task.status for task in updated}, {TaskStatus.COMPLETED.value})
+        self.assertEqual(updated[0].metadata, {"bulk": True})
+
+        with self.assertRaises(ValueError):
+            self.task_manager.delete_tasks_bulk([created[0].id, "task-missing"])
+        self.assertEqual(self.task_manager.count_tasks(project_id=self.project.id), 9)
+        self.assertEqual(self.task_manager.delete_tasks_bulk([task.id for task in created]), 5)
+        self.assertEqual(self.task_manager.count_tasks(project_id=self.project.id), 4)
+
+    def test_subtree_rollup(self):
+        """Test the recursive subtree query and its rollup."""
+        root = self.tasks[0]
+        self.task_manager.update_task(self.tasks[1].id, parent_id=root.id)
+        self.task_manager.update_task(self.tasks[2].id, parent_id=self.tasks[1].id, progress=100.0)
+        self.task_manager.update_task_status(self.tasks[2].id, TaskStatus.COMPLETED.value)
+
+        self.assertEqual(
+            [task.id for task in self.task_manager.get_subtree(root.id)],
+            [root.id, self.tasks[1].id, self.tasks[2].id],
+        )
+        rollup = self.task_manager.get_task_rollup(root.id)
+        self.assertEqual(rollup["task_count"], 3)
+        self.assertAlmostEqual(rollup["progress"], 100.0 / 3)
+        self.assertEqual(rollup["status_counts"][TaskStatus.COMPLETED.value], 1)
+        self.assertEqual(rollup["latest_updated_at"], self.task_manager.get_task(self.tasks[2].id).updated_at)
+        self.assertIsNone(self.task_manager.get_task_rollup("task-missing"))
+
+        self.assertAlmostEqual(self.task_manager.calculate_project_progress(self.project.id), 25.0)
+        self.task_manager.update_task_progress(self.tasks[3].id, 100.0)
+        self.assertAlmostEqual(self.task_manager.calculate_phase_progress(self.project.id, self.phase.id), 50.0)
+        self.assertEqual(self.task_manager.calculate_phase_progress(self.project.id, "phase-missing"), 0.0)
+
+    def test_tasks_page(self):
+        """Test keyset pagination in (updated_at, id) order."""
+        self.task_manager.update_task(self.tasks[0].id, name="Updated")
+        expected = [task.id for task in self.tasks[1:]] + [self.tasks[0].id]
+
+        tasks, after = self.task_manager.get_tasks_page(project_id=self.project.id, limit=3)
+        self.assertEqual([task.id for task in tasks], expected[:3])
+        tasks, after = self.task_manager.get_tasks_page(project_id=self.project.id, after=after, limit=3)
+        self.assertEqual([task.id for task in tasks], expected[3:])
+        self.assertIsNone(after)
+
+        tasks, _ = self.task_manager.get_tasks_page(
+            assignee_id="agent-1", assignee_type="agent", limit=5, descending=True
+        )
+        self.assertEqual([task.id for task in tasks], [self.tasks[3].id, self.tasks[1].id])
+
+    def test_search_tasks(self):
+        """Test that the FTS5 index follows inserts, updates and deletes."""
+        self.task_manager.update_task(self.tasks[0].id, name="Deploy database migration")
+        self.task_manager.update_task(self.tasks[1].id, description="Nightly database backup")
+
+        results = self.task_manager.search_tasks("datab")
+        self.assertEqual({task.id for task, _ in results}, {self.tasks[0].id, self.tasks[1].id})
+        self.assertEqual(
+            [task.id for task, _ in self.task_manager.search_tasks("database migration")],
+            [self.tasks[0].id],
+        )
+        self.assertEqual(self.task_manager.search_tasks("database", project_id="project-missing"), [])
+
+        self.task_manager.delete_task(self.tasks[0].id)
+        self.assertEqual(
+            [task.id for task, _ in self.task_manager.search_tasks("database")],
+            [self.tasks[1].id],
+        )
+
+    def test_concurrent_reads(self):
+        """Test that queries return whole results while other threads write."""
+        other = self.task_manager.create_project("Other", "Other")
+        errors = []
+
+        def read():
+            try:
+                for _ in range(50):
+                    tasks = self.task_manager.query_tasks(project_id=self.project.id)
+                    self.assertEqual(len(tasks), 4)
+            except Exception as e:
+                errors.append(e)
+
+        def write():
+            try:
+                for i in range(50):
+                    task = self.task_manager.create_task(f"Other {i}", "", other.id, TaskStatus.PLANNED.value)
+                    self.task_manager.delete_task(task.id)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(4)] + [threading.Thread(target=write)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_import_json(self):
+        """Test that an existing tasks.json is imported on first open."""
+        json_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(json_dir.cleanup)
+        json_manager = TaskManager(json_dir.name)
+        project = json_manager.create_project("Imported", "Imported")
+        task = json_manager.create_task("Task", "", project.id, TaskStatus.BLOCKED.value)
+        json_manager.save_data()
+
+        sqlite_manager = get_task_manager(json_dir.name, storage_mode="sqlite")
+        self.addCleanup(sqlite_manager.close)
+        self.assertIsInstance(sqlite_manager, SQLiteTaskManager)
+        self.assertEqual(sqlite_manager.get_task(task.id).to_dict(), task.to_dict())
+        self.assertEqual([found.id for found, _ in sqlite_manager.search_tasks("task")], [task.id])
+
+        # Reopening does not import again
+        sqlite_manager.delete_task(task.id)
+        reopened = SQLiteTaskManager(json_dir.name)
+        self.addCleanup(reopened.close)
+        self.assertIsNone(reopened.get_task(task.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
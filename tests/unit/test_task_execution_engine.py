@@ -6,6 +6,7 @@ This module contains tests for the TaskExecutionEngine class and related functio
 
 import asyncio
 import os
+import pickle
 import sys
 import unittest
 import uuid
@@ -17,6 +18,7 @@ import pytest
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.task_manager.task_execution_engine import (
+    AdmissionRejectedError,
     TaskExecutionEngine,
     TaskExecution,
     TaskExecutionStatus,
@@ -25,6 +27,8 @@ from src.task_manager.task_execution_engine import (
     get_task_execution_engine,
 )
 from src.task_manager.manager import Task, TaskStatus
+from src.task_manager.shared_queue import SQLiteExecutionQueue
+from src.task_manager.workflow_executors import ProcessPoolWorkflowExecutor
 
 
 class TestTaskExecution(unittest.TestCase):
@@ -141,6 +145,29 @@ class TestTaskExecution(unittest.TestCase):
         self.assertEqual(new_execution.result, {"output": "test_output"})
         self.assertEqual(len(new_execution.status_history), 3)
     
+    def test_compact_history(self):
+        """Test that compacted history entries are summarized."""
+        execution = TaskExecution(task_id="task_123", execution_id="exec_123")
+        execution.update_status(TaskExecutionStatus.RUNNING)
+        execution.update_status(TaskExecutionStatus.FAILED)
+        execution.update_status(TaskExecutionStatus.RETRYING)
+        execution.update_status(TaskExecutionStatus.RUNNING)
+        
+        self.assertEqual(execution.compact_history(5), [])
+        dropped = execution.compact_history(2)
+        self.assertEqual([entry["status"] for entry in dropped], [
+            TaskExecutionStatus.PENDING, TaskExecutionStatus.RUNNING, TaskExecutionStatus.FAILED,
+        ])
+        self.assertEqual(len(execution.status_history), 2)
+        self.assertEqual(set(execution.status_summary), {"pending", "running", "failed"})
+        self.assertEqual(execution.status_summary["running"]["transitions"], 1)
+        self.assertGreaterEqual(execution.status_summary["running"]["seconds"], 0)
+        
+        # The summary is kept, the history can be left out
+        new_execution = TaskExecution.from_dict(execution.to_dict())
+        self.assertEqual(new_execution.status_summary, execution.status_summary)
+        self.assertNotIn("status_history", execution.to_dict(include_history=False))
+    
     def test_should_retry(self):
         """Test the should_retry method."""
         # Create execution with default retry strategy
@@ -319,7 +346,9 @@ class TestTaskExecutionEngine:
         # Initialize the engine
         await engine.initialize()
         
-        # Patch the _scheduler_loop method to prevent it from running
+        # Stop the scheduler loop started by initialize and patch the
+        # _scheduler_loop method to prevent it from running
+        engine._scheduler_task.cancel()
         engine._scheduler_loop = AsyncMock()
         engine._scheduler_task = asyncio.create_task(asyncio.sleep(0))
         
@@ -407,10 +436,294 @@ class TestTaskExecutionEngine:
         
         # Check that the execution was added to the queue
         assert len(engine.execution_queue) == 1
-        priority, _, queue_execution_id = engine.execution_queue[0]
+        priority, _, _, queue_execution_id = engine.execution_queue[0]
         assert queue_execution_id == execution_id
         assert priority == -TaskExecutionPriority.HIGH.value  # Negative for max-heap
     
+    async def test_scheduler_wakes_on_new_work(self, mock_dependencies, engine):
+        """Test that the scheduler starts work as it arrives or falls due, not on its interval."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine.scheduler_interval = 60
+        engine._execute_task = AsyncMock()
+        loop_task = asyncio.create_task(TaskExecutionEngine._scheduler_loop(engine))
+        try:
+            await asyncio.sleep(0.01)
+            result = await engine.schedule_task(task_id="task_1")
+            await asyncio.sleep(0.05)
+            engine._execute_task.assert_called_once_with(result["execution_id"])
+            
+            # A delayed execution waits in the delayed queue until it is due
+            delayed = await engine.schedule_task(
+                task_id="task_2", scheduled_time=datetime.now() + timedelta(seconds=0.2)
+            )
+            await asyncio.sleep(0.05)
+            assert engine.delayed_queue[0][2] == delayed["execution_id"]
+            assert engine._execute_task.call_count == 1
+            await asyncio.sleep(0.3)
+            engine._execute_task.assert_called_with(delayed["execution_id"])
+            assert not engine.delayed_queue
+        finally:
+            loop_task.cancel()
+            await asyncio.gather(loop_task, return_exceptions=True)
+    
+    async def test_blocked_executions_wait_for_dependencies(self, mock_dependencies, engine):
+        """Test that executions with unfinished dependencies are parked until they complete."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine._execute_task = AsyncMock()
+        first = (await engine.schedule_task(task_id="task_1"))["execution_id"]
+        second = (await engine.schedule_task(task_id="task_2"))["execution_id"]
+        joined = (await engine.schedule_task(task_id="task_3", dependencies=[first, second]))["execution_id"]
+        
+        await engine._run_scheduler_pass()
+        assert engine.waiting_executions == {joined: 2}
+        assert not engine.execution_queue and not engine.delayed_queue
+        
+        # Each completed dependency counts down; the last one releases the execution
+        for dep_id, remaining in ((first, {joined: 1}), (second, {})):
+            engine.executions[dep_id].update_status(TaskExecutionStatus.COMPLETED)
+            engine.running_executions.discard(dep_id)
+            await engine._check_dependent_executions(dep_id)
+            assert engine.waiting_executions == remaining
+        
+        await engine._run_scheduler_pass()
+        engine._execute_task.assert_called_with(joined)
+        assert engine._execute_task.call_count == 3
+    
+    async def test_fair_share_and_aging(self, mock_dependencies, engine):
+        """Test that projects share the queue by weight and that waiting raises priority."""
+        def get_task(task_id):
+            task = MagicMock(spec=Task)
+            task.project_id = task_id.split("/")[0]
+            return task
+        
+        mock_dependencies["task_manager"].get_task.side_effect = get_task
+        engine._execute_task = AsyncMock()
+        engine.max_concurrent_executions = 10
+        engine.fair_share_weights = {"b": 2}
+        for i in range(4):
+            await engine.schedule_task(task_id=f"a/{i}")
+        for i in range(4):
+            await engine.schedule_task(task_id=f"b/{i}")
+        
+        await engine._run_scheduler_pass()
+        order = [engine.executions[call.args[0]].task_id for call in engine._execute_task.call_args_list]
+        assert set(order[:3]) == {"a/0", "b/0", "b/1"}
+        assert set(order[3:6]) == {"a/1", "b/2", "b/3"}
+        assert order[6:] == ["a/2", "a/3"]
+        
+        # A low priority execution that has waited two aging intervals runs before a medium one
+        engine.running_executions = set(engine.executions)
+        engine._execute_task.reset_mock()
+        medium = (await engine.schedule_task(task_id="a/medium"))["execution_id"]
+        low = (await engine.schedule_task(task_id="a/low", priority=TaskExecutionPriority.LOW))["execution_id"]
+        engine._age(low, datetime.now() + timedelta(seconds=2 * engine.aging_interval))
+        engine.running_executions = set()
+        await engine._run_scheduler_pass()
+        assert [call.args[0] for call in engine._execute_task.call_args_list] == [low, medium]
+        
+        stats = await engine.get_execution_stats()
+        assert stats["queue_length"] == 0
+        assert stats["wait_times"]["low"]["count"] == 1
+        assert stats["wait_times"]["medium"]["count"] == 9
+    
+    async def test_timeout_cancels_running_task(self, mock_dependencies, engine):
+        """Test that a run is cancelled when its deadline passes."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        started = asyncio.Event()
+        
+        async def hang(execution_id):
+            started.set()
+            await asyncio.sleep(3600)
+        
+        engine._execute_task = hang
+        execution_id = (await engine.schedule_task(task_id="task_1", max_retries=0))["execution_id"]
+        await engine._run_scheduler_pass()
+        await started.wait()
+        task = engine.running_tasks[execution_id]
+        assert engine._deadlines[execution_id] > datetime.now() + timedelta(seconds=3500)
+        
+        # Move the deadline into the past; the original heap entry becomes stale
+        engine._set_deadline(execution_id, datetime.now())
+        await engine._run_scheduler_pass()
+        await asyncio.sleep(0)
+        
+        assert task.cancelled()
+        assert engine.executions[execution_id].status == TaskExecutionStatus.TIMEOUT
+        assert not engine.running_executions and not engine.running_tasks and not engine._deadlines
+        assert engine.stats["timed_out_executions"] == 1
+    
+    async def test_process_pool_workflow_executor(self, mock_dependencies, engine):
+        """Test that registered workflow types run in worker processes."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine.register_workflow_executor(ProcessPoolWorkflowExecutor(
+            {"local_transform": {"function": "pickle:dumps", "max_concurrent": 1}},
+            max_workers=1,
+            shared_memory_threshold=1024,
+        ))
+        payload = os.urandom(4096)
+        execution_id = (await engine.schedule_task(
+            task_id="task_1",
+            workflow_type="local_transform",
+            workflow_params={"payload": payload, "items": [b"small"]},
+        ))["execution_id"]
+        
+        await engine._execute_task(execution_id)
+        
+        mock_dependencies["workflow_integration"].execute_task_workflow.assert_not_called()
+        result = mock_dependencies["result_processor"].process_result.call_args.kwargs["result"]
+        assert result["success"]
+        assert pickle.loads(result["result"]) == {
+            "payload": payload,
+            "items": [b"small"],
+            "execution_id": execution_id,
+        }
+        assert engine.executions[execution_id].status == TaskExecutionStatus.COMPLETED
+    
+    async def test_shared_queue(self, mock_dependencies, tmp_path):
+        """Test that engines sharing a queue run each other's executions under leases."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        mock_dependencies["workflow_integration"].execute_task_workflow.return_value = {"success": True}
+        engines = [
+            TaskExecutionEngine(
+                data_dir=str(tmp_path / node_id),
+                shared_queue=SQLiteExecutionQueue(str(tmp_path / "queue.db")),
+                node_id=node_id,
+                lease_ttl=60,
+            )
+            for node_id in ("node_a", "node_b")
+        ]
+        node_a, node_b = engines
+        node_a.max_concurrent_executions = 0
+        
+        # Node a only publishes, node b claims and runs
+        execution_id = (await node_a.schedule_task(task_id="task_1"))["execution_id"]
+        assert not node_a._queued
+        await node_a._run_scheduler_pass()
+        await node_b._run_scheduler_pass()
+        assert node_b.executions[execution_id].task_id == "task_1"
+        await node_b.running_tasks[execution_id]
+        assert node_b.executions[execution_id].status == TaskExecutionStatus.COMPLETED
+        
+        # The result is published, so it is not claimed again
+        await node_b._run_scheduler_pass()
+        stats = await node_b.get_execution_stats()
+        assert stats["shared_queue"]["claimed"] == 1
+        assert stats["shared_queue"]["done"] == 1
+        
+        # A run whose lease another node took over is stopped at the next heartbeat
+        second_id = (await node_a.schedule_task(task_id="task_2"))["execution_id"]
+        await node_a._run_scheduler_pass()
+        started = asyncio.Event()
+        
+        async def hang(execution_id):
+            started.set()
+            await asyncio.sleep(3600)
+        
+        node_b._execute_task = hang
+        await node_b._run_scheduler_pass()
+        await started.wait()
+        task = node_b.running_tasks[second_id]
+        node_a.max_concurrent_executions = 1
+        node_a._execute_task = AsyncMock()
+        node_a.shared_queue.claim("node_a", 1, 60, datetime.now().timestamp() + 120)
+        node_b._next_heartbeat = datetime.now()
+        await node_b._run_scheduler_pass()
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        assert second_id not in node_b.running_executions
+        assert node_b.shared_queue_stats["lost_leases"] == 1
+        
+        for engine in engines:
+            engine.shared_queue.close()
+    
+    async def test_admission_control(self, mock_dependencies, engine):
+        """Test that scheduling past the queue limit is rejected, or waits for high priorities."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine.max_queue_depth = 2
+        engine.admission_timeout = 5
+        first = (await engine.schedule_task(task_id="task_1"))["execution_id"]
+        await engine.schedule_task(task_id="task_2")
+        
+        with pytest.raises(AdmissionRejectedError) as rejected:
+            await engine.schedule_task(task_id="task_3", priority=TaskExecutionPriority.MEDIUM)
+        assert rejected.value.http_status == 429
+        assert rejected.value.retry_after >= 1
+        assert rejected.value.details["limit"] == "queue_depth"
+        with pytest.raises(AdmissionRejectedError):
+            await engine.schedule_task_batch(task_ids=["task_3", "task_4", "task_5"])
+        
+        # A high priority call waits until an execution leaves the queue
+        waiting = asyncio.create_task(engine.schedule_task(task_id="task_3", priority=TaskExecutionPriority.HIGH))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        engine.executions[first].update_status(TaskExecutionStatus.RUNNING)
+        await asyncio.wait_for(waiting, 1)
+        
+        stats = (await engine.get_execution_stats())["admission"]
+        assert stats["admitted"] == 3 and stats["rejected"] == 2 and stats["blocked"] == 1
+        assert stats["queue_depth"] == 2
+        assert stats["latency"]["max_seconds"] >= 0.05
+    
+    async def test_concurrency_limits(self, mock_dependencies, engine):
+        """Test that executions whose key is at its limit are skipped until a run with the key finishes."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine._execute_task = AsyncMock()
+        engine.set_concurrency_limit("image", "gpu", 1)
+        with pytest.raises(ValueError):
+            engine.set_concurrency_limit("host", "a", 1)
+        
+        gpu_1 = (await engine.schedule_task(task_id="task_1", workflow_params={"image": "gpu"},
+                                            priority=TaskExecutionPriority.HIGH))["execution_id"]
+        gpu_2 = (await engine.schedule_task(task_id="task_2", workflow_params={"image": "gpu"},
+                                            priority=TaskExecutionPriority.HIGH))["execution_id"]
+        cpu = (await engine.schedule_task(task_id="task_3", workflow_params={"image": "cpu"}))["execution_id"]
+        
+        # The second gpu execution is parked, and the cpu one behind it still runs
+        await engine._run_scheduler_pass()
+        assert [call.args[0] for call in engine._execute_task.call_args_list] == [gpu_1, cpu]
+        limits = engine.get_concurrency_limits()["image"]
+        assert limits["gpu"] == {"limit": 1, "running": 1, "parked": 1}
+        
+        # Finishing the first gpu run queues the parked one again
+        engine._stop_run(gpu_1)
+        await engine._run_scheduler_pass()
+        assert engine._execute_task.call_args_list[-1].args[0] == gpu_2
+        assert engine.get_concurrency_limits()["image"]["gpu"] == {"limit": 1, "running": 1, "parked": 0}
+        
+        # Limits can be lifted at runtime
+        engine.set_concurrency_limit("image", "gpu", None)
+        stats = await engine.get_execution_stats()
+        assert stats["concurrency_limits"]["image"] == {}
+    
+    async def test_parked_entries_not_duplicated(self, mock_dependencies, engine):
+        """Test that an execution parked again after aging or a queue rebuild has one parked entry."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine._execute_task = AsyncMock()
+        engine.set_concurrency_limit("image", "gpu", 1)
+        gpu_1 = (await engine.schedule_task(task_id="task_1", workflow_params={"image": "gpu"}))["execution_id"]
+        gpu_2 = (await engine.schedule_task(task_id="task_2", workflow_params={"image": "gpu"}))["execution_id"]
+        await engine._run_scheduler_pass()
+        
+        # Aging pushes a new entry, which replaces the parked one when it is parked again
+        engine._age(gpu_2, datetime.now() + timedelta(seconds=engine.aging_interval))
+        await engine._run_scheduler_pass()
+        assert engine.get_concurrency_limits()["image"]["gpu"]["parked"] == 1
+        assert engine._parked[("image", "gpu")][gpu_2][0] == -engine._queued[gpu_2][0]
+        
+        # Rebuilding the queue after a cancel keeps the parked execution's live entry
+        gpu_3 = (await engine.schedule_task(task_id="task_3", workflow_params={"image": "gpu"}))["execution_id"]
+        await engine._run_scheduler_pass()
+        assert engine.get_concurrency_limits()["image"]["gpu"]["parked"] == 2
+        engine.execution_queue.extend([(0, 0.0, 0.0, "stale")] * 70)
+        await engine.cancel_execution(gpu_3)
+        await engine._run_scheduler_pass()
+        assert engine.get_concurrency_limits()["image"]["gpu"]["parked"] == 1
+        
+        engine._stop_run(gpu_1)
+        await engine._run_scheduler_pass()
+        assert [call.args[0] for call in engine._execute_task.call_args_list] == [gpu_1, gpu_2]
+        assert engine.get_concurrency_limits()["image"]["gpu"]["parked"] == 0
+    
     async def test_schedule_task_batch(self, mock_dependencies, engine):
         """Test scheduling multiple tasks for execution."""
         # Set up mock tasks
@@ -477,6 +790,57 @@ class TestTaskExecutionEngine:
         assert execution_map["task_1"] in task_3_execution.dependencies
         assert execution_map["task_2"] in task_3_execution.dependencies
     
+    async def test_schedule_task_graph_critical_path(self, mock_dependencies, engine):
+        """Test that the executions on the longest remaining path of a graph start first."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine._execute_task = AsyncMock()
+        engine.max_concurrent_executions = 1
+        
+        # Past runs of the workflow type replace the default duration
+        past = TaskExecution(task_id="task_0", execution_id="exec_past")
+        engine._register_execution(past)
+        past.update_status(TaskExecutionStatus.RUNNING)
+        past.started_at -= timedelta(seconds=30)
+        past.update_status(TaskExecutionStatus.COMPLETED)
+        assert engine._estimate_duration("containerized_workflow") == pytest.approx(30, abs=1)
+        
+        result = await engine.schedule_task_graph(
+            task_graph={"short": [], "long": [], "chain_1": [], "chain_2": ["chain_1"], "chain_3": ["chain_2"]},
+            metadata={"long": {"estimated_duration": 120}},
+        )
+        execution_map = {e["task_id"]: e["execution_id"] for e in result["executions"]}
+        paths = {task_id: engine.executions[execution_id].critical_path for task_id, execution_id in execution_map.items()}
+        assert paths["long"] == 120
+        assert paths["chain_1"] == pytest.approx(3 * paths["short"]) and paths["chain_3"] == pytest.approx(paths["short"])
+        
+        await engine._run_scheduler_pass()
+        assert engine._execute_task.call_args.args[0] == execution_map["long"]
+        engine.running_executions.clear()
+        await engine._run_scheduler_pass()
+        assert engine._execute_task.call_args.args[0] == execution_map["chain_1"]
+    
+    async def test_critical_path_keeps_fair_share(self, mock_dependencies, engine):
+        """Test that a project's task graph does not hold back another project's executions."""
+        def get_task(task_id):
+            task = MagicMock(spec=Task)
+            task.project_id = task_id.split("/")[0]
+            return task
+        
+        mock_dependencies["task_manager"].get_task.side_effect = get_task
+        engine._execute_task = AsyncMock()
+        engine.max_concurrent_executions = 4
+        graph = {f"a/chain_{i}": [f"a/chain_{i - 1}"] if i else [] for i in range(3)}
+        graph.update({f"a/single_{i}": [] for i in range(3)})
+        await engine.schedule_task_graph(task_graph=graph)
+        for i in range(3):
+            await engine.schedule_task(task_id=f"b/{i}")
+        
+        # The graph's longest chain starts first, but the projects take turns
+        await engine._run_scheduler_pass()
+        order = [engine.executions[call.args[0]].task_id for call in engine._execute_task.call_args_list]
+        assert order[0] == "a/chain_0"
+        assert order == ["a/chain_0", "b/0", "a/single_0", "b/1"]
+    
     async def test_cancel_execution(self, mock_dependencies, engine):
         """Test cancelling a task execution."""
         # Schedule a task
@@ -503,6 +867,91 @@ class TestTaskExecutionEngine:
             task_id, TaskStatus.CANCELLED
         )
     
+    async def test_cancel_executions(self, mock_dependencies, engine):
+        """Test cancelling a running execution together with its dependents."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        started = asyncio.Event()
+        
+        async def hang(execution_id):
+            started.set()
+            await asyncio.sleep(3600)
+        
+        engine._execute_task = hang
+        first = (await engine.schedule_task(task_id="task_1"))["execution_id"]
+        second = (await engine.schedule_task(task_id="task_2", dependencies=[first]))["execution_id"]
+        third = (await engine.schedule_task(task_id="task_3", dependencies=[second]))["execution_id"]
+        other = (await engine.schedule_task(task_id="task_4", priority=TaskExecutionPriority.LOW))["execution_id"]
+        engine.max_concurrent_executions = 1
+        await engine._run_scheduler_pass()
+        await started.wait()
+        task = engine.running_tasks[first]
+        
+        result = await engine.cancel_executions(execution_ids=[first], include_dependents=True)
+        await asyncio.sleep(0)
+        
+        assert result["cancelled"] == [first, second, third]
+        assert task.cancelled()
+        assert not engine.running_executions and not engine.running_tasks
+        assert list(engine._queued) == [other]
+        with pytest.raises(ValueError):
+            await engine.cancel_executions()
+    
+    async def test_executions_persist(self, mock_dependencies, engine):
+        """Test that batched saves and snapshots are loaded back on restart."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task, project_id="project_1",
+                                                                         assignee_id="agent_1")
+        first = (await engine.schedule_task(task_id="task_1"))["execution_id"]
+        await engine._save_executions()
+        second = (await engine.schedule_task(task_id="task_2", dependencies=[first]))["execution_id"]
+        engine.executions[first].update_status(TaskExecutionStatus.COMPLETED)
+        await engine._save_execution(first)
+        
+        # Both changes are written together, to the log after the snapshot
+        assert await engine._flush_executions() == 2
+        assert engine._journal.log_records == 2
+        assert await engine._flush_executions() == 0
+        
+        restarted = TaskExecutionEngine(data_dir=engine.data_dir)
+        await restarted._load_executions()
+        assert restarted.executions[first].status == TaskExecutionStatus.COMPLETED
+        assert restarted.executions[second].to_dict() == engine.executions[second].to_dict()
+        assert list(restarted._queued) == [second]
+        assert restarted.dependency_graph == {first: {second}}
+    
+    async def test_executions_persist_after_crash(self, mock_dependencies, engine):
+        """Test that changes made after a batch is encoded, or a log left by a crash, do not end up on disk."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        execution_id = (await engine.schedule_task(task_id="task_1"))["execution_id"]
+        execution = engine.executions[execution_id]
+        assert await engine._flush_executions() == 1
+        
+        # The batch is encoded before the worker thread runs
+        execution.update_status(TaskExecutionStatus.RUNNING)
+        await engine._save_execution(execution_id)
+        
+        def write_lines(lines, count):
+            execution.metadata["changed"] = True
+            assert '"changed"' not in lines
+            return count
+        
+        with patch.object(engine._journal, "write_lines", side_effect=write_lines):
+            assert await engine._flush_executions() == 1
+        
+        # Compacting crashes after the snapshot replaced the old one
+        execution.update_status(TaskExecutionStatus.COMPLETED)
+        replace = os.replace
+        
+        def replace_then_crash(src, dst):
+            replace(src, dst)
+            raise OSError("crashed before truncating the log")
+        
+        with patch("src.task_manager.journal.os.replace", side_effect=replace_then_crash):
+            await engine._save_executions()
+        
+        restarted = TaskExecutionEngine(data_dir=engine.data_dir)
+        await restarted._load_executions()
+        assert restarted.executions[execution_id].status == TaskExecutionStatus.COMPLETED
+    
     async def test_get_execution(self, mock_dependencies, engine):
         """Test getting information about a task execution."""
         # Schedule a task
@@ -551,6 +1000,52 @@ class TestTaskExecutionEngine:
         assert result["limit"] == 2
         assert result["offset"] == 1
     
+    async def test_list_executions_indexes(self, mock_dependencies, engine):
+        """Test that listings follow status changes, newest first."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        execution_ids = []
+        for i in range(5):
+            execution_ids.append((await engine.schedule_task(task_id=f"task_{i % 2}"))["execution_id"])
+        for execution_id in execution_ids[1:4]:
+            engine.executions[execution_id].update_status(TaskExecutionStatus.FAILED)
+        
+        result = await engine.list_executions(status=TaskExecutionStatus.FAILED, limit=2)
+        assert [e["execution_id"] for e in result["executions"]] == [execution_ids[3], execution_ids[2]]
+        assert result["total"] == 3
+        result = await engine.list_executions(status="failed", task_id="task_1", offset=1)
+        assert [e["execution_id"] for e in result["executions"]] == [execution_ids[1]]
+        assert result["total"] == 2
+        result = await engine.list_executions(status=TaskExecutionStatus.PENDING)
+        assert [e["execution_id"] for e in result["executions"]] == [execution_ids[4], execution_ids[0]]
+    
+    async def test_status_history_is_bounded(self, mock_dependencies, engine):
+        """Test that long histories are capped, archived and left out of listings on request."""
+        mock_dependencies["task_manager"].get_task.return_value = MagicMock(spec=Task)
+        engine.max_status_history = 3
+        execution_id = (await engine.schedule_task(task_id="task_1"))["execution_id"]
+        execution = engine.executions[execution_id]
+        for _ in range(3):
+            execution.update_status(TaskExecutionStatus.RUNNING)
+            execution.update_status(TaskExecutionStatus.RETRYING)
+        
+        assert len(execution.status_history) == 3
+        assert execution.status_summary["running"]["transitions"] == 2
+        history = await engine.get_execution_history(execution_id)
+        assert history[0]["status"] == "pending"
+        assert [entry["status"] for entry in history[-6:]] == ["running", "retrying"] * 3
+        
+        # Archived entries are read back after they are written
+        await engine._flush_executions()
+        assert engine._unarchived_history == {}
+        assert [entry["status"] for entry in await engine.get_execution_history(execution_id)] == [
+            entry["status"] for entry in history
+        ]
+        assert await engine.get_execution_history("exec_missing") is None
+        
+        result = await engine.list_executions(include_history=False)
+        assert "status_history" not in result["executions"][0]
+        assert result["executions"][0]["status_summary"] == execution.status_summary
+    
     async def test_get_execution_stats(self, mock_dependencies, engine):
         """Test getting statistics about task executions."""
         # Schedule multiple tasks with different statuses
@@ -0,0 +1,873 @@
+"""
+Tests for the Task Manager.
+
+This module contains tests for the TaskManager class and its indexes.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.manager import ChangeLogTruncatedError, Task, TaskManager, TaskStatus
+
+
+def _scan_task(task_manager, task_id):
+    """Find a task by scanning every project."""
+    for project in task_manager.projects.values():
+        if task_id in project.tasks:
+            return project.tasks[task_id]
+    return None
+
+
+def _scan_phase(task_manager, phase_id):
+    """Find a phase by scanning every project."""
+    for project in task_manager.projects.values():
+        if phase_id in project.phases:
+            return project.phases[phase_id]
+    return None
+
+
+class TestTaskModels(unittest.TestCase):
+    """Tests for the slotted task models."""
+
+    def test_timestamps_parsed_lazily(self):
+        """Test that loaded timestamps are parsed on access and round-trip unchanged."""
+        data = Task(
+            id="task-1",
+            project_id="project-1",
+            name="Task",
+            description="",
+            status=TaskStatus.PLANNED.value,
+            created_at=datetime(2024, 1, 2, 3, 4, 5),
+        ).to_dict()
+
+        task = Task.from_dict(data)
+        self.assertIsInstance(task._created_at, str)
+        self.assertEqual(task.to_dict(), data)
+        self.assertEqual(task.created_at, datetime(2024, 1, 2, 3, 4, 5))
+        self.assertIsInstance(task._created_at, datetime)
+        self.assertEqual(task.to_dict(), data)
+
+    def test_slots_and_interning(self):
+        """Test that models have no instance dict and share repeated strings."""
+        first, second = (
+            Task.from_dict(json.loads(json.dumps({
+                "id": f"task-{i}",
+                "project_id": "project-1",
+                "name": "Task",
+                "description": "",
+                "status": "in_progress",
+                "assignee_type": "agent",
+            })))
+            for i in range(2)
+        )
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first.project_id, second.project_id)
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.assignee_type, second.assignee_type)
+        with self.assertRaises(AttributeError):
+            first.unknown = True
+
+
+class TestTaskManagerIndexes(unittest.TestCase):
+    """Tests for the global task and phase ID indexes."""
+
+    def setUp(self):
+        """Create a task manager with a few projects, phases and tasks."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.task_ids = []
+        self.phase_ids = []
+
+        for i in range(3):
+            project = self.task_manager.create_project(f"Project {i}", f"Project {i}")
+            for j in range(2):
+                phase = self.task_manager.create_phase(project.id, f"Phase {j}", "", j)
+                self.phase_ids.append(phase.id)
+                for k in range(3):
+                    task = self.task_manager.create_task(
+                        name=f"Task {i}.{j}.{k}",
+                        description="",
+                        project_id=project.id,
+                        status=TaskStatus.PLANNED.value,
+                        phase_id=phase.id,
+                    )
+                    self.task_ids.append(task.id)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assertIndexesMatchScan(self, task_manager):
+        """Check every known ID resolves the same way as a linear scan."""
+        for task_id in self.task_ids + ["task-missing"]:
+            self.assertIs(task_manager.get_task(task_id), _scan_task(task_manager, task_id))
+        for phase_id in self.phase_ids + ["phase-missing"]:
+            self.assertIs(task_manager.get_phase(phase_id), _scan_phase(task_manager, phase_id))
+
+    def test_lookups_match_linear_scan(self):
+        """Test that indexed lookups agree with scanning every project."""
+        self.assertIndexesMatchScan(self.task_manager)
+
+    def test_delete_keeps_indexes_in_sync(self):
+        """Test that deletes remove entries from the indexes."""
+        self.assertTrue(self.task_manager.delete_task(self.task_ids[0]))
+        self.assertFalse(self.task_manager.delete_task(self.task_ids[0]))
+        self.assertTrue(self.task_manager.delete_phase(self.phase_ids[0]))
+        self.assertFalse(self.task_manager.delete_phase(self.phase_ids[0]))
+
+        project_id = self.task_manager.get_task(self.task_ids[-1]).project_id
+        self.assertTrue(self.task_manager.delete_project(project_id))
+
+        self.assertIsNone(self.task_manager.get_task(self.task_ids[0]))
+        self.assertIsNone(self.task_manager.get_task(self.task_ids[-1]))
+        self.assertIsNone(self.task_manager.get_phase(self.phase_ids[-1]))
+        self.assertIsNone(self.task_manager.update_task(self.task_ids[-1], name="Gone"))
+        self.assertIndexesMatchScan(self.task_manager)
+
+    def test_indexes_rebuilt_on_load(self):
+        """Test that the indexes are rebuilt when data is loaded from disk."""
+        self.task_manager.save_data()
+
+        reloaded = TaskManager(self.temp_dir.name)
+        self.assertEqual(len(reloaded.projects), 3)
+        self.assertIndexesMatchScan(reloaded)
+
+        updated = reloaded.update_task(self.task_ids[4], status=TaskStatus.COMPLETED.value)
+        self.assertEqual(updated.status, TaskStatus.COMPLETED.value)
+
+
+class TestTaskManagerQueries(unittest.TestCase):
+    """Tests for the status, phase, assignee and parent indexes."""
+
+    def setUp(self):
+        """Create a project with tasks spread over phases and assignees."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+        self.other_project = self.task_manager.create_project("Other", "Other")
+        self.phase = self.task_manager.create_phase(self.project.id, "Phase", "", 0)
+
+        self.parent = self.task_manager.create_task(
+            name="Parent",
+            description="",
+            project_id=self.project.id,
+            status=TaskStatus.IN_PROGRESS.value,
+        )
+        self.children = [
+            self.task_manager.create_task(
+                name=f"Child {i}",
+                description="",
+                project_id=self.project.id,
+                status=TaskStatus.PLANNED.value,
+                phase_id=self.phase.id,
+                parent_id=self.parent.id,
+                assignee_id="agent-1",
+                assignee_type="agent" if i % 2 else "user",
+            )
+            for i in range(4)
+        ]
+        self.other_task = self.task_manager.create_task(
+            name="Other",
+            description="",
+            project_id=self.other_project.id,
+            status=TaskStatus.PLANNED.value,
+            assignee_id="agent-1",
+            assignee_type="agent",
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def assertSameTasks(self, actual, expected):
+        self.assertEqual({task.id for task in actual}, {task.id for task in expected})
+
+    def assertQueriesMatchScan(self):
+        """Check every indexed query against a filter over all tasks."""
+        all_tasks = [task for p in self.task_manager.projects.values() for task in p.tasks.values()]
+        for project_id in self.task_manager.projects:
+            for status in TaskStatus:
+                self.assertSameTasks(
+                    self.task_manager.get_tasks_by_status(project_id, status),
+                    [t for t in all_tasks if t.project_id == project_id and t.status == status.value],
+                )
+            self.assertSameTasks(
+                self.task_manager.get_tasks_by_phase(project_id, self.phase.id),
+                [t for t in all_tasks if t.project_id == project_id and t.phase_id == self.phase.id],
+            )
+        for assignee_type in (None, "agent", "user"):
+            self.assertSameTasks(
+                self.task_manager.get_tasks_by_assignee("agent-1", assignee_type),
+                [
+                    t for t in all_tasks
+                    if t.assignee_id == "agent-1" and assignee_type in (None, t.assignee_type)
+                ],
+            )
+        self.assertSameTasks(
+            self.task_manager.get_child_tasks(self.parent.id),
+            [t for t in all_tasks if t.parent_id == self.parent.id],
+        )
+
+    def test_queries_after_create(self):
+        """Test that indexed queries match a scan after creating tasks."""
+        self.assertQueriesMatchScan()
+        self.assertEqual(len(self.task_manager.get_tasks_by_assignee("agent-1")), 5)
+        self.assertEqual(len(self.task_manager.get_tasks_by_assignee("agent-1", "agent")), 3)
+
+    def test_queries_after_update_and_delete(self):
+        """Test that updates move tasks between buckets and deletes remove them."""
+        self.task_manager.update_task(self.children[0].id, status=TaskStatus.COMPLETED)
+        self.task_manager.update_task(self.children[1].id, assignee_id="agent-2")
+        self.task_manager.update_task(self.children[2].id, parent_id=self.other_task.id)
+        self.task_manager.delete_task(self.children[3].id)
+
+        self.assertQueriesMatchScan()
+        self.assertEqual(
+            [t.id for t in self.task_manager.get_tasks_by_status(self.project.id, TaskStatus.COMPLETED.value)],
+            [self.children[0].id],
+        )
+        self.assertEqual(
+            [t.id for t in self.task_manager.get_tasks_by_assignee("agent-2")],
+            [self.children[1].id],
+        )
+
+    def assertCountsMatchScan(self):
+        """Check the status histograms against counting every task."""
+        all_tasks = [task for p in self.task_manager.projects.values() for task in p.tasks.values()]
+
+        def scan(tasks):
+            counts = {status.value: 0 for status in TaskStatus}
+            for task in tasks:
+                counts[task.status] += 1
+            return counts
+
+        self.assertEqual(self.task_manager.count_tasks_by_status(), scan(all_tasks))
+        for project_id in self.task_manager.projects:
+            self.assertEqual(
+                self.task_manager.count_tasks_by_status(project_id),
+                scan(t for t in all_tasks if t.project_id == project_id),
+            )
+        self.assertEqual(
+            self.task_manager.count_tasks_by_status(phase_id=self.phase.id),
+            scan(t for t in all_tasks if t.project_id == self.project.id and t.phase_id == self.phase.id),
+        )
+
+    def test_status_counts_follow_mutations(self):
+        """Test that the status histograms stay in sync with every mutation."""
+        self.assertCountsMatchScan()
+        self.task_manager.update_task(self.children[0].id, status=TaskStatus.COMPLETED.value)
+        self.task_manager.update_task(self.children[1].id, status=TaskStatus.COMPLETED)
+        self.task_manager.update_task(self.other_task.id, phase_id=self.phase.id)
+        self.task_manager.delete_task(self.children[2].id)
+        self.assertCountsMatchScan()
+        self.assertEqual(
+            self.task_manager.count_tasks_by_status(self.project.id, self.phase.id)[TaskStatus.COMPLETED.value],
+            2,
+        )
+
+        self.task_manager.delete_project(self.project.id)
+        self.assertCountsMatchScan()
+        self.assertEqual(sum(self.task_manager.count_tasks_by_status(self.project.id).values()), 0)
+
+    def test_queries_after_delete_project(self):
+        """Test that deleting a project empties its buckets."""
+        self.task_manager.delete_project(self.project.id)
+
+        self.assertQueriesMatchScan()
+        self.assertEqual(self.task_manager.get_child_tasks(self.parent.id), [])
+        self.assertEqual(self.task_manager.count_tasks_by_status()[TaskStatus.PLANNED.value], 1)
+
+
+class TestTaskManagerRollups(unittest.TestCase):
+    """Tests for subtree rollups and progress calculation."""
+
+    def setUp(self):
+        """Create a project with a root task, two children and a grandchild."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+        self.phase = self.task_manager.create_phase(self.project.id, "Phase", "", 0)
+        self.root = self._create_task("Root", progress=10.0)
+        self.left = self._create_task("Left", self.root.id, progress=50.0, phase_id=self.phase.id)
+        self.right = self._create_task("Right", self.root.id, progress=0.0)
+        self.leaf = self._create_task("Leaf", self.left.id, progress=100.0, phase_id=self.phase.id)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _create_task(self, name, parent_id=None, **kwargs):
+        return self.task_manager.create_task(
+            name, "", self.project.id, TaskStatus.PLANNED.value, parent_id=parent_id, **kwargs
+        )
+
+    def assertRollupMatchesScan(self, task_id):
+        """Check a rollup against aggregating the subtree directly."""
+        subtree = self.task_manager.get_subtree(task_id)
+        rollup = self.task_manager.get_task_rollup(task_id)
+        self.assertEqual(rollup["task_count"], len(subtree))
+        self.assertAlmostEqual(rollup["progress"], sum(t.progress for t in subtree) / len(subtree))
+        self.assertEqual(rollup["status_counts"], self.scan_counts(subtree))
+        self.assertEqual(rollup["earliest_created_at"], min(t.created_at for t in subtree))
+        self.assertEqual(rollup["latest_updated_at"], max(t.updated_at for t in subtree))
+
+    @staticmethod
+    def scan_counts(tasks):
+        counts = {status.value: 0 for status in TaskStatus}
+        for task in tasks:
+            counts[task.status] += 1
+        return counts
+
+    def test_subtree(self):
+        """Test that a subtree is returned depth first."""
+        self.assertEqual(
+            [task.id for task in self.task_manager.get_subtree(self.root.id)],
+            [self.root.id, self.left.id, self.leaf.id, self.right.id],
+        )
+        self.assertEqual(self.task_manager.get_subtree("task-missing"), [])
+        self.assertIsNone(self.task_manager.get_task_rollup("task-missing"))
+
+    def test_rollups_follow_mutations(self):
+        """Test that rollups are cached and updated when a descendant changes."""
+        rollup = self.task_manager.get_task_rollup(self.root.id)
+        self.assertEqual(rollup["task_count"], 4)
+        self.assertAlmostEqual(rollup["progress"], 40.0)
+
+        # Cached rollups are not recomputed
+        with patch.object(self.task_manager, "get_child_tasks") as get_child_tasks:
+            self.task_manager.get_task_rollup(self.root.id)
+            get_child_tasks.assert_not_called()
+
+        self.task_manager.update_task_status(self.leaf.id, TaskStatus.COMPLETED.value)
+        self.assertRollupMatchesScan(self.root.id)
+        self.assertEqual(self.task_manager.get_task_rollup(self.root.id)["status_counts"][TaskStatus.COMPLETED.value], 1)
+
+        # Reparenting and deleting invalidate the old and new ancestors
+        self.task_manager.update_task(self.leaf.id, parent_id=self.right.id)
+        self._create_task("New", self.leaf.id, progress=20.0)
+        self.assertRollupMatchesScan(self.left.id)
+        self.assertRollupMatchesScan(self.right.id)
+        self.assertRollupMatchesScan(self.root.id)
+        self.task_manager.delete_task(self.right.id)
+        self.assertRollupMatchesScan(self.root.id)
+
+    def test_deep_tree(self):
+        """Test that rollups of very deep trees do not recurse."""
+        parent_id = self.leaf.id
+        for i in range(3000):
+            parent_id = self._create_task(f"Deep {i}", parent_id, progress=100.0).id
+        self.assertEqual(self.task_manager.get_task_rollup(self.root.id)["task_count"], 3004)
+
+        self.task_manager.update_task_progress(parent_id, 0.0)
+        self.assertRollupMatchesScan(self.root.id)
+
+    def test_progress(self):
+        """Test that project and phase progress average their tasks."""
+        self.assertAlmostEqual(self.task_manager.calculate_project_progress(self.project.id), 40.0)
+        self.assertAlmostEqual(self.task_manager.calculate_phase_progress(self.project.id, self.phase.id), 75.0)
+
+        self.task_manager.update_task_progress(self.left.id, 100.0)
+        self.task_manager.delete_task(self.right.id)
+        self.assertAlmostEqual(self.task_manager.calculate_project_progress(self.project.id), 70.0)
+        self.assertAlmostEqual(self.task_manager.calculate_phase_progress(self.project.id, self.phase.id), 100.0)
+
+        self.task_manager.delete_project(self.project.id)
+        self.assertEqual(self.task_manager.calculate_project_progress(self.project.id), 0.0)
+        self.assertEqual(self.task_manager.calculate_phase_progress(self.project.id, self.phase.id), 0.0)
+
+
+class TestTaskManagerPagination(unittest.TestCase):
+    """Tests for cursor pagination over the (updated_at, id) ordered index."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+        self.tasks = [
+            self.task_manager.create_task(
+                f"Task {i}", "", self.project.id, TaskStatus.PLANNED.value,
+                assignee_id="agent-1", assignee_type="agent" if i % 2 else "human",
+            )
+            for i in range(7)
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_all(self, limit=3, **filters):
+        """Read every page and return the task IDs in order."""
+        task_ids = []
+        after = None
+        while True:
+            tasks, after = self.task_manager.get_tasks_page(after=after, limit=limit, **filters)
+            self.assertLessEqual(len(tasks), limit)
+            task_ids.extend(task.id for task in tasks)
+            if after is None:
+                return task_ids
+
+    def expected(self, tasks, descending=False):
+        return [task.id for task in sorted(tasks, key=lambda t: (t.updated_at, t.id), reverse=descending)]
+
+    def test_pages_cover_tasks_in_order(self):
+        """Test that pages return every task once in (updated_at, id) order."""
+        self.assertIsNone(self.task_manager._update_order)
+        self.assertEqual(self.read_all(project_id=self.project.id), self.expected(self.tasks))
+        self.assertEqual(
+            self.read_all(project_id=self.project.id, descending=True),
+            self.expected(self.tasks, descending=True),
+        )
+        self.assertEqual(
+            self.read_all(assignee_id="agent-1", assignee_type="agent"),
+            self.expected([task for task in self.tasks if task.assignee_type == "agent"]),
+        )
+        tasks, after = self.task_manager.get_tasks_page(project_id=self.project.id, limit=7)
+        self.assertEqual(len(tasks), 7)
+        self.assertIsNone(after)
+        with self.assertRaises(ValueError):
+            self.task_manager.get_tasks_page()
+
+    def test_index_follows_mutations(self):
+        """Test that updated tasks move to the end and deleted tasks disappear."""
+        first_page, after = self.task_manager.get_tasks_page(project_id=self.project.id, limit=3)
+        moved = self.task_manager.update_task(self.tasks[5].id, status=TaskStatus.COMPLETED.value)
+        self.task_manager.delete_task(self.tasks[6].id)
+
+        rest = []
+        while after is not None:
+            tasks, after = self.task_manager.get_tasks_page(project_id=self.project.id, after=after, limit=3)
+            rest.extend(task.id for task in tasks)
+        self.assertEqual([task.id for task in first_page] + rest, [task.id for task in self.tasks[:5]] + [moved.id])
+
+        self.assertEqual(self.read_all(project_id=self.project.id, status=TaskStatus.COMPLETED.value), [moved.id])
+        self.assertEqual(
+            self.read_all(project_id=self.project.id, status=TaskStatus.PLANNED.value),
+            [task.id for task in self.tasks[:5]],
+        )
+        self.assertEqual(len(self.read_all(assignee_id="agent-1")), 6)
+
+
+class TestTaskManagerBulk(unittest.TestCase):
+    """Tests for the bulk create, update and delete methods."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _specs(self, count):
+        return [
+            {
+                "name": f"Task {i}",
+                "description": "",
+                "project_id": self.project.id,
+                "status": TaskStatus.PLANNED.value,
+                "assignee_id": "agent-1",
+            }
+            for i in range(count)
+        ]
+
+    def test_bulk_round_trip_saves_once(self):
+        """Test that each bulk call applies the whole batch and saves once."""
+        with patch.object(self.task_manager, "save_data", wraps=self.task_manager.save_data) as save:
+            tasks = self.task_manager.create_tasks_bulk(self._specs(50))
+            self.assertEqual(save.call_count, 1)
+
+            self.task_manager.update_tasks_bulk([
+                {"task_id": task.id, "status": TaskStatus.COMPLETED.value} for task in tasks[:10]
+            ])
+            self.assertEqual(save.call_count, 2)
+
+            self.assertEqual(self.task_manager.delete_tasks_bulk([task.id for task in tasks[40:]]), 10)
+            self.assertEqual(save.call_count, 3)
+
+        self.assertEqual([task.name for task in tasks[:3]], ["Task 0", "Task 1", "Task 2"])
+        self.assertEqual(self.task_manager.count_tasks_by_status(self.project.id)[TaskStatus.COMPLETED.value], 10)
+        self.assertEqual(len(self.task_manager.get_tasks_by_assignee("agent-1")), 40)
+
+        reloaded = TaskManager(self.temp_dir.name)
+        self.assertEqual(len(reloaded.get_project(self.project.id).tasks), 40)
+
+    def test_invalid_batch_is_not_applied(self):
+        """Test that one invalid item rejects the whole batch."""
+        specs = self._specs(3)
+        specs[1]["project_id"] = "project-missing"
+        specs[2]["unknown"] = True
+        with self.assertRaises(ValueError) as context:
+            self.task_manager.create_tasks_bulk(specs)
+        self.assertIn("Item 1", str(context.exception))
+        self.assertIn("Item 2", str(context.exception))
+        self.assertEqual(self.task_manager.get_project(self.project.id).tasks, {})
+
+        tasks = self.task_manager.create_tasks_bulk(self._specs(2))
+        with self.assertRaises(ValueError):
+            self.task_manager.update_tasks_bulk([
+                {"task_id": tasks[0].id, "name": "Renamed"},
+                {"task_id": "task-missing", "name": "Missing"},
+            ])
+        self.assertEqual(tasks[0].name, "Task 0")
+
+        with self.assertRaises(ValueError):
+            self.task_manager.delete_tasks_bulk([tasks[0].id, "task-missing"])
+        with self.assertRaises(ValueError):
+            self.task_manager.delete_tasks_bulk([tasks[0].id, tasks[0].id])
+        self.assertIsNotNone(self.task_manager.get_task(tasks[0].id))
+
+
+class TestTaskManagerChanges(unittest.TestCase):
+    """Tests for the versioned change feed."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name, max_changes=5)
+        self.project = self.task_manager.create_project("Project", "Project")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _create_task(self, name, project_id=None):
+        return self.task_manager.create_task(name, "", project_id or self.project.id, TaskStatus.PLANNED.value)
+
+    def test_changes_since(self):
+        """Test that every mutation gets the next version and can be replayed."""
+        self.assertEqual(self.task_manager.version, 1)
+        task = self._create_task("Task")
+        self.task_manager.update_task(task.id, status=TaskStatus.COMPLETED.value)
+        other = self.task_manager.create_project("Other", "Other")
+        self.task_manager.delete_task(task.id)
+
+        changes = self.task_manager.get_changes_since(1)
+        self.assertEqual([c["version"] for c in changes], [2, 3, 4, 5])
+        self.assertEqual([(c["op"], c["kind"]) for c in changes], [
+            ("put", "task"), ("put", "task"), ("put", "project"), ("delete", "task"),
+        ])
+        self.assertEqual(changes[1]["data"]["status"], TaskStatus.COMPLETED.value)
+        self.assertEqual(changes[3]["data"], {"id": task.id, "project_id": self.project.id})
+
+        self.assertEqual([c["id"] for c in self.task_manager.get_changes_since(3, other.id)], [other.id])
+        self.assertEqual(self.task_manager.get_changes_since(5), [])
+
+    def test_truncated_change_log(self):
+        """Test that asking for dropped or unknown versions raises."""
+        for i in range(6):
+            self._create_task(f"Task {i}")
+
+        self.assertEqual(len(self.task_manager.get_changes_since(2)), 5)
+        with self.assertRaises(ChangeLogTruncatedError):
+            self.task_manager.get_changes_since(1)
+        with self.assertRaises(ChangeLogTruncatedError):
+            self.task_manager.get_changes_since(100)
+
+    def test_subscribe(self):
+        """Test that subscribers get the backlog and then new changes for their project."""
+        other = self.task_manager.create_project("Other", "Other")
+        first = self._create_task("First")
+
+        async def collect():
+            stream = self.task_manager.subscribe(since=1, project_id=self.project.id)
+            received = [await stream.__anext__()]
+            self._create_task("Ignored", other.id)
+            second = self._create_task("Second")
+            received.append(await asyncio.wait_for(stream.__anext__(), 1))
+            await stream.aclose()
+            return received, second
+
+        received, second = asyncio.run(collect())
+        self.assertEqual([change["id"] for change in received], [first.id, second.id])
+        self.assertEqual(self.task_manager._changes._subscribers, [])
+
+
+class TestTaskManagerFlusher(unittest.TestCase):
+    """Tests for the background flusher."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, "tasks.json")
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _create_tasks(self, task_manager, count):
+        return [
+            task_manager.create_task(f"Task {i}", "", self.project.id, TaskStatus.PLANNED.value)
+            for i in range(count)
+        ]
+
+    def _saved_task_count(self):
+        with open(self.snapshot_path) as f:
+            return len(json.load(f)["tasks"])
+
+    def test_burst_is_coalesced(self):
+        """Test that a burst of mutations is saved in one write."""
+        async def burst():
+            self.task_manager.start_flusher(interval=0.05, max_latency=1.0)
+            self._create_tasks(self.task_manager, 20)
+            await asyncio.sleep(0.3)
+            metrics = self.task_manager.get_flush_metrics()
+            await self.task_manager.stop_flusher()
+            return metrics
+
+        metrics = asyncio.run(burst())
+        self.assertEqual(metrics["flushes"], 1)
+        self.assertEqual(metrics["mutations_flushed"], 21)
+        self.assertEqual(metrics["projects_flushed"], 1)
+        self.assertEqual(metrics["records_written"], 21)
+        self.assertEqual(metrics["dirty_mutations"], 0)
+        self.assertTrue(metrics["flusher_running"])
+        self.assertGreater(metrics["last_flush_seconds"], 0)
+        self.assertEqual(self._saved_task_count(), 20)
+
+    def test_stop_flushes_remaining_changes(self):
+        """Test that stopping the flusher saves the changes it was waiting on."""
+        async def stop():
+            self.task_manager.start_flusher(interval=60.0, max_latency=60.0)
+            with self.assertRaises(RuntimeError):
+                self.task_manager.start_flusher()
+            self._create_tasks(self.task_manager, 3)
+            await asyncio.sleep(0)
+            self.assertFalse(os.path.exists(self.snapshot_path))
+            return await self.task_manager.stop_flusher()
+
+        self.assertEqual(asyncio.run(stop()), 4)
+        self.assertEqual(self._saved_task_count(), 3)
+        self.assertFalse(self.task_manager.get_flush_metrics()["flusher_running"])
+
+    def test_failed_write_is_retried(self):
+        """Test that changes from a failed journal write stay unsaved and are written later."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.project = task_manager.create_project("Project", "Project")
+        self._create_tasks(task_manager, 2)
+
+        with patch.object(task_manager._journal, "write_records", side_effect=OSError("disk full")):
+            self.assertEqual(asyncio.run(task_manager.flush()), 0)
+        metrics = task_manager.get_flush_metrics()
+        self.assertEqual(metrics["errors"], 1)
+        self.assertEqual(metrics["dirty_mutations"], 3)
+        self.assertEqual(len(task_manager._journal.pending), 3)
+
+        self._create_tasks(task_manager, 1)
+        self.assertEqual(asyncio.run(task_manager.flush()), 4)
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertEqual(len(reloaded.get_project(self.project.id).tasks), 3)
+
+
+    def test_crash_during_threshold_compaction(self):
+        """Test that a crash while a flush compacts the journal does not bring back deleted tasks."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal", compact_threshold=6)
+        self.project = task_manager.create_project("Project", "Project")
+        task = self._create_tasks(task_manager, 1)[0]
+        self.assertEqual(asyncio.run(task_manager.flush()), 2)
+
+        # The update and delete are only pending when the flush compacts
+        task_manager.update_task(task.id, progress=50.0)
+        task_manager.delete_task(task.id)
+        self._create_tasks(task_manager, 2)
+        replace = os.replace
+
+        def replace_then_crash(src, dst):
+            replace(src, dst)
+            raise OSError("crashed before truncating the log")
+
+        with patch("src.task_manager.journal.os.replace", side_effect=replace_then_crash):
+            asyncio.run(task_manager.flush())
+
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal", compact_threshold=6)
+        self.assertIsNone(reloaded.get_task(task.id))
+        self.assertEqual(len(reloaded.get_project(self.project.id).tasks), 2)
+
+
+class TestTaskManagerJournal(unittest.TestCase):
+    """Tests for the journal storage mode."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_path = os.path.join(self.temp_dir.name, "tasks.json")
+        self.log_path = os.path.join(self.temp_dir.name, "tasks.journal")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _populate(self, task_manager):
+        """Create a project with a phase and a few tasks, then change some of them."""
+        project = task_manager.create_project("Project", "Project")
+        phase = task_manager.create_phase(project.id, "Phase", "", 0)
+        tasks = [
+            task_manager.create_task(
+                name=f"Task {i}",
+                description="",
+                project_id=project.id,
+                status=TaskStatus.PLANNED.value,
+                phase_id=phase.id,
+            )
+            for i in range(3)
+        ]
+        task_manager.update_task(tasks[0].id, status=TaskStatus.COMPLETED.value, progress=100.0)
+        task_manager.delete_task(tasks[1].id)
+        return project, phase, tasks
+
+    def _read_snapshot(self, task_manager):
+        """Return the full task data a task manager would snapshot."""
+        return json.loads(json.dumps(task_manager._snapshot_data()))
+
+    def test_save_appends_to_log(self):
+        """Test that saving appends only the new records to the log."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self._populate(task_manager)
+        task_manager.save_data()
+
+        self.assertFalse(os.path.exists(self.snapshot_path))
+        with open(self.log_path) as f:
+            self.assertEqual(len(f.readlines()), 7)
+
+        task_manager.create_project("Second", "Second")
+        task_manager.save_data()
+        with open(self.log_path) as f:
+            self.assertEqual(len(f.readlines()), 8)
+
+    def test_replay_restores_state(self):
+        """Test that loading replays the log over the snapshot."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        project, phase, tasks = self._populate(task_manager)
+        task_manager.save_data()
+
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertEqual(self._read_snapshot(reloaded), self._read_snapshot(task_manager))
+        self.assertIsNone(reloaded.get_task(tasks[1].id))
+        self.assertEqual(reloaded.get_task(tasks[0].id).status, TaskStatus.COMPLETED.value)
+        self.assertEqual(reloaded.get_phase(phase.id).project_id, project.id)
+
+    def test_compaction_writes_snapshot(self):
+        """Test that the log is compacted into a snapshot past the threshold."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal", compact_threshold=5)
+        project, _, _ = self._populate(task_manager)
+        task_manager.save_data()
+
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        self.assertEqual(os.path.getsize(self.log_path), 0)
+
+        task_manager.delete_project(project.id)
+        task_manager.save_data()
+
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal", compact_threshold=5)
+        self.assertEqual(reloaded.projects, {})
+
+    def test_crash_before_log_truncation(self):
+        """Test that a log left behind by a crash during compaction is not replayed over the snapshot."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        project, _, tasks = self._populate(task_manager)
+        task_manager.save_data()
+        task_manager.update_task(tasks[2].id, progress=50.0)
+        task_manager.delete_task(tasks[2].id)
+
+        replace = os.replace
+
+        def replace_then_crash(src, dst):
+            replace(src, dst)
+            raise OSError("crashed before truncating the log")
+
+        with patch("src.task_manager.journal.os.replace", side_effect=replace_then_crash):
+            task_manager.compact()
+        with open(self.log_path) as f:
+            self.assertEqual(len(f.readlines()), 7)
+
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertIsNone(reloaded.get_task(tasks[1].id))
+        self.assertIsNone(reloaded.get_task(tasks[2].id))
+        self.assertEqual(len(reloaded.get_project(project.id).tasks), 1)
+
+        # Records made after the reload are numbered past the snapshot
+        reloaded.delete_task(tasks[0].id)
+        reloaded.save_data()
+        again = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertEqual(again.get_project(project.id).tasks, {})
+
+    def test_mutations_wait_for_lock(self):
+        """Test that a mutation and its change record wait while a flush holds the lock."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        project = task_manager.create_project("Project", "Project")
+        version = task_manager.version
+
+        with task_manager._lock:
+            thread = threading.Thread(
+                target=task_manager.create_task,
+                args=("Task", "", project.id, TaskStatus.PLANNED.value),
+            )
+            thread.start()
+            thread.join(0.2)
+            self.assertTrue(thread.is_alive())
+            self.assertEqual(project.tasks, {})
+            self.assertEqual(task_manager.version, version)
+        thread.join()
+        self.assertEqual(len(project.tasks), 1)
+        self.assertEqual(task_manager.version, version + 1)
+
+    def test_concurrent_mutations_and_saves(self):
+        """Test that saves made during concurrent mutations reload to the final state."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        project = task_manager.create_project("Project", "Project")
+        done = threading.Event()
+
+        def mutate():
+            for i in range(25):
+                task = task_manager.create_task(f"Task {i}", "", project.id, TaskStatus.PLANNED.value)
+                task_manager.update_task(task.id, progress=50.0)
+                if i % 2:
+                    task_manager.delete_task(task.id)
+
+        def save():
+            while not done.is_set():
+                task_manager.save_data()
+                task_manager.compact()
+
+        saver = threading.Thread(target=save)
+        saver.start()
+        threads = [threading.Thread(target=mutate) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        saver.join()
+        task_manager.save_data()
+
+        self.assertEqual(len(project.tasks), 52)
+        self.assertEqual(len(task_manager.get_changes_since(0)), 1 + 4 * (25 * 2 + 12))
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertEqual(self._read_snapshot(reloaded), self._read_snapshot(task_manager))
+
+    def test_torn_record_is_discarded(self):
+        """Test that a partially written record does not break loading."""
+        task_manager = TaskManager(self.temp_dir.name, storage_mode="journal")
+        project, _, _ = self._populate(task_manager)
+        task_manager.save_data()
+        with open(self.log_path, "a") as f:
+            f.write('{"op":"delete","kind":"project","data":{"id":')
+
+        reloaded = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertIsNotNone(reloaded.get_project(project.id))
+        self.assertEqual(len(reloaded.get_project(project.id).tasks), 2)
+
+        reloaded.create_project("Second", "Second")
+        reloaded.save_data()
+        again = TaskManager(self.temp_dir.name, storage_mode="journal")
+        self.assertEqual(len(again.projects), 2)
+
+    def test_unknown_storage_mode(self):
+        """Test that an unknown storage mode is rejected."""
+        with self.assertRaises(ValueError):
+            TaskManager(self.temp_dir.name, storage_mode="xml")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Tests for the Task Management API routes.
+
+This module contains tests for the batch task endpoints and their broadcasts,
+and for the change feed over REST and the websocket.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.api.routes.task_routes import ConnectionManager, get_manager, router
+from src.task_manager.manager import TaskManager, TaskStatus, get_task_manager
+
+
+class RecordingConnectionManager(ConnectionManager):
+    """Connection manager that records broadcasts as the JSON a websocket would send."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    async def broadcast(self, project_id, message):
+        self.messages.append((project_id, json.loads(json.dumps(message))))
+
+
+class TestTaskBatchRoutes(unittest.TestCase):
+    """Tests for the batch task endpoints."""
+
+    def setUp(self):
+        """Create a client whose routes use a task manager with one project."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+
+        app = FastAPI()
+        app.include_router(router)
+        self.connection_manager = RecordingConnectionManager()
+        app.dependency_overrides[get_task_manager] = lambda: self.task_manager
+        app.dependency_overrides[get_manager] = lambda: self.connection_manager
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_batch_round_trip(self):
+        """Test that batches are created, updated and deleted through the API."""
+        response = self.client.post("/tasks/tasks/batch", json={
+            "tasks": [
+                {"name": f"Task {i}", "description": "", "project_id": self.project.id}
+                for i in range(3)
+            ],
+        })
+        self.assertEqual(response.status_code, 201)
+        created = response.json()
+        self.assertEqual([task["name"] for task in created], ["Task 0", "Task 1", "Task 2"])
+        self.assertEqual({task["status"] for task in created}, {TaskStatus.PLANNED.value})
+        task_ids = [task["id"] for task in created]
+        self.assertEqual(self.connection_manager.messages, [
+            (self.project.id, {"type": "tasks_created", "data": created}),
+        ])
+
+        response = self.client.put("/tasks/tasks/batch", json={
+            "updates": [
+                {"task_id": task_id, "status": TaskStatus.COMPLETED.value, "progress": 100.0}
+                for task_id in task_ids
+            ],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({task["status"] for task in response.json()}, {TaskStatus.COMPLETED.value})
+        self.assertEqual(self.connection_manager.messages[-1][1]["type"], "tasks_updated")
+        self.assertEqual(self.task_manager.get_task(task_ids[0]).progress, 100.0)
+
+        response = self.client.post("/tasks/tasks/batch/delete", json={"task_ids": task_ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"deleted": 3})
+        self.assertEqual(
+            self.connection_manager.messages[-1],
+            (self.project.id, {"type": "tasks_deleted", "data": [{"task_id": task_id} for task_id in task_ids]}),
+        )
+        self.assertIsNone(self.task_manager.get_task(task_ids[0]))
+
+    def test_invalid_batch(self):
+        """Test that a batch with a bad item changes nothing and returns 400."""
+        response = self.client.post("/tasks/tasks/batch", json={
+            "tasks": [
+                {"name": "Task", "description": "", "project_id": self.project.id},
+                {"name": "Orphan", "description": "", "project_id": "project-missing"},
+            ],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.project.tasks, {})
+        self.assertEqual(self.connection_manager.messages, [])
+
+        response = self.client.post("/tasks/tasks/batch/delete", json={"task_ids": ["task-missing"]})
+        self.assertEqual(response.status_code, 400)
+
+
+
+class TestTaskChangeRoutes(unittest.TestCase):
+    """Tests for the change feed, with the routes' own task manager dependency."""
+
+    def setUp(self):
+        """Create a client for the routes without dependency overrides."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.params = {"data_path": self.temp_dir.name}
+
+        app = FastAPI()
+        app.include_router(router)
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _create_task(self, project_id, name):
+        response = self.client.post("/tasks/tasks", params=self.params, json={
+            "name": name, "description": "", "project_id": project_id,
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_changes_across_requests(self):
+        """Test that changes made by one request are listed by the next."""
+        response = self.client.post("/tasks/projects", params=self.params, json={"name": "Project", "description": ""})
+        self.assertEqual(response.status_code, 201)
+        project_id = response.json()["id"]
+        task = self._create_task(project_id, "Task")
+
+        response = self.client.get("/tasks/changes", params={**self.params, "since": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["version"], 2)
+        self.assertEqual(
+            [(change["kind"], change["id"]) for change in response.json()["changes"]],
+            [("task", task["id"])],
+        )
+
+    def test_websocket_sync(self):
+        """Test that a websocket receives edits from other requests and syncs from a version."""
+        response = self.client.post("/tasks/projects", params=self.params, json={"name": "Project", "description": ""})
+        project_id = response.json()["id"]
+
+        with self.client.websocket_connect(f"/tasks/ws/{project_id}?data_path={self.temp_dir.name}") as websocket:
+            message = websocket.receive_json()
+            self.assertEqual((message["type"], message["version"]), ("initial_data", 1))
+
+            task = self._create_task(project_id, "Task")
+            message = websocket.receive_json()
+            self.assertEqual((message["type"], message["data"]["id"]), ("task_created", task["id"]))
+
+            websocket.send_text(json.dumps({"type": "sync", "since": 1}))
+            message = websocket.receive_json()
+            self.assertEqual((message["type"], message["version"]), ("changes", 2))
+            self.assertEqual([change["id"] for change in message["data"]], [task["id"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests for the Task Search Index.
+
+This module contains tests for the TaskSearchIndex class and task search in the
+TaskManager.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.task_manager.manager import TaskManager, TaskStatus
+from src.task_manager.search import TaskSearchIndex, tokenize
+
+
+class TestTaskSearchIndex(unittest.TestCase):
+    """Tests for the TaskSearchIndex class."""
+
+    def setUp(self):
+        self.index = TaskSearchIndex()
+        self.index.add("task-1", "project-1", "Deploy database migration", "Run the schema migration on staging")
+        self.index.add("task-2", "project-1", "Write docs", "Document the deployment process")
+        self.index.add("task-3", "project-2", "Database backup", "Nightly backup of the database")
+
+    def ids(self, query, **kwargs):
+        return [task_id for task_id, _ in self.index.search(query, **kwargs)]
+
+    def test_tokenize(self):
+        """Test that text is split into lowercase alphanumeric tokens."""
+        self.assertEqual(tokenize("Fix API-v2 login, ASAP!"), ["fix", "api", "v2", "login", "asap"])
+        self.assertEqual(tokenize(None), [])
+
+    def test_ranking(self):
+        """Test that every token must match and more relevant tasks rank first."""
+        # Two mentions of "database" outrank one in a longer text
+        self.assertEqual(self.ids("database"), ["task-3", "task-1"])
+        self.assertEqual(self.ids("database migration"), ["task-1"])
+        self.assertEqual(self.ids("database docs"), [])
+        self.assertEqual(self.ids("unknown"), [])
+        self.assertEqual(self.ids(""), [])
+        self.assertEqual(self.ids("database", project_id="project-2"), ["task-3"])
+        self.assertEqual(self.ids("database", limit=1), ["task-3"])
+
+    def test_prefix_matching(self):
+        """Test that the last token also matches as a prefix."""
+        self.assertEqual(set(self.ids("deploy")), {"task-1", "task-2"})
+        self.assertEqual(self.ids("migr"), ["task-1"])
+        self.assertEqual(self.ids("migr database"), [])
+        # Single characters are not expanded
+        self.assertEqual(self.ids("d"), [])
+
+    def test_incremental_updates(self):
+        """Test that replacing and removing tasks updates the postings and vocabulary."""
+        self.index.add("task-3", "project-2", "Restore drill", "Restore last night's snapshot")
+        self.assertEqual(self.ids("database"), ["task-1"])
+        self.assertEqual(self.ids("restore"), ["task-3"])
+        self.assertNotIn("backup", self.index._terms)
+
+        self.assertTrue(self.index.remove("task-1"))
+        self.assertFalse(self.index.remove("task-1"))
+        self.assertEqual(self.ids("database"), [])
+        self.assertEqual(self.index._terms, sorted(self.index._postings))
+        self.assertEqual(len(self.index), 2)
+
+        # Unchanged text only moves the task between projects
+        self.index.add("task-2", "project-2", "Write docs", "Document the deployment process")
+        self.assertEqual(self.ids("docs", project_id="project-2"), ["task-2"])
+
+
+class TestTaskManagerSearch(unittest.TestCase):
+    """Tests for task search in the TaskManager."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.task_manager = TaskManager(self.temp_dir.name)
+        self.project = self.task_manager.create_project("Project", "Project")
+        self.task = self.task_manager.create_task(
+            "Deploy database migration", "", self.project.id, TaskStatus.PLANNED.value
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def names(self, query):
+        return [task.name for task, _ in self.task_manager.search_tasks(query)]
+
+    def test_index_follows_mutations(self):
+        """Test that the index is built on the first search and then kept up to date."""
+        self.assertIsNone(self.task_manager._search)
+        self.assertEqual(self.names("database"), ["Deploy database migration"])
+
+        other = self.task_manager.create_task("Database backup", "", self.project.id, TaskStatus.PLANNED.value)
+        self.task_manager.update_task(self.task.id, name="Write docs")
+        self.assertEqual(self.names("datab"), ["Database backup"])
+        self.assertEqual(self.names("docs"), ["Write docs"])
+
+        self.task_manager.delete_task(other.id)
+        self.assertEqual(self.names("database"), [])
+        self.task_manager.delete_project(self.project.id)
+        self.assertEqual(self.names("docs"), [])
+        self.assertEqual(len(self.task_manager._search), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()